@@ -0,0 +1,181 @@
+"""
+End-to-end benchmark: WeatherDocumentAgent turns against local stand-ins, without network.
+
+Runs concurrent conversations through the full graph with the scripted chat model, fake
+embeddings, an in-memory Qdrant and a local weather server (see benchmarks/stubs.py), and
+reports throughput, p50/p95/p99 turn latency and memory. With --metrics the per-node,
+per-tool, embedding and Qdrant timings are printed too (p50/p95 are bucket estimates), and
+--metrics-out writes them as Prometheus text or, for a .jsonl path, JSON lines. With --max-p95-ms or
+--min-throughput the exit code is non-zero on a regression, so it can gate CI.
+
+Conversations run on a thread pool through the sync graph; the async path needs a Qdrant
+server, since a local async client does not share the in-memory store.
+
+Usage:
+    uv run python -m benchmarks.agent_e2e --conversations 50 --turns 4 --concurrency 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import resource
+import sys
+import time
+import tracemalloc
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+# Credentials are validated at import but never used: every service is stubbed
+for name, value in (
+    ("ANTHROPIC_API_KEY", "benchmark"),
+    ("OPENWEATHER_API_KEY", "benchmark"),
+    ("COHERE_API_KEY", "benchmark"),
+    ("QDRANT_URL", "http://localhost:6333"),
+    ("QDRANT_API_KEY", "benchmark"),
+    ("LANGSMITH_API_KEY", "benchmark"),
+    ("LANGSMITH_TRACING", "false"),
+):
+    os.environ.setdefault(name, value)
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.stubs import ScriptedChatModel, WeatherStub, in_memory_database
+from src.graphs.checkpointer import create_checkpointer
+from src.tools.metrics import metrics
+
+CITIES = ["London", "Paris", "Tokyo", "Berlin", "Madrid", "Rome", "Oslo", "Lisbon", "Vienna", "Prague"]
+COLLECTION = "benchmark"
+
+
+def turn_prompt(conversation: int, turn: int) -> str:
+    """The question of a turn: weather, document and small-talk turns in rotation."""
+    kind = (conversation + turn) % 3
+    if kind == 0:
+        return f"What's the weather in {CITIES[(conversation * 7 + turn) % len(CITIES)]}?"
+    if kind == 1:
+        return f"What does the report say about fact{turn}-{conversation}? [Collection: {COLLECTION}]"
+    return "Hello, what can you do?"
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_conversation(agent, conversation: int, turns: int):
+    """Run the turns of one conversation and return the latency of each turn."""
+    config = {"configurable": {"thread_id": f"conversation-{conversation}"}}
+    latencies = []
+    for turn in range(turns):
+        start = time.perf_counter()
+        agent.graph.invoke({"messages": [HumanMessage(turn_prompt(conversation, turn))]}, config)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def print_breakdown():
+    """Print the recorded timing histograms and counters."""
+    print(f"\n{'series':<60}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for record in metrics.snapshot():
+        labels = ",".join(f"{k}={v}" for k, v in record["labels"].items())
+        series = f"{record['name']}{{{labels}}}"
+        if record["type"] == "counter":
+            print(f"{series:<60}{record['value']:>8g}")
+        elif record["name"].endswith("_seconds"):
+            mean = record["sum"] / record["count"] * 1e3
+            print(f"{series:<60}{record['count']:>8}{mean:>10.1f}{record['p50'] * 1e3:>10.1f}{record['p95'] * 1e3:>10.1f}")
+        else:
+            print(f"{series:<60}{record['count']:>8}{record['sum'] / record['count']:>10.0f}  (mean {record['name'].rsplit('_', 1)[-1]})")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per main model call")
+    parser.add_argument("--router-latency", type=float, default=0.02, help="Seconds per router model call")
+    parser.add_argument("--weather-latency", type=float, default=0.02, help="Seconds per weather request")
+    parser.add_argument("--checkpointer", default="memory", choices=["memory", "sqlite", "none"])
+    parser.add_argument("--trace-memory", action="store_true", help="Report Python heap with tracemalloc (slower)")
+    parser.add_argument("--metrics", action="store_true", help="Record and print where the time goes")
+    parser.add_argument("--metrics-out", help="Write the metrics as Prometheus text, or JSON lines for a .jsonl path")
+    parser.add_argument("--verbose", action="store_true", help="Show the agent's per-call log lines")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail if the p95 turn latency exceeds this")
+    parser.add_argument("--min-throughput", type=float, help="Fail if fewer turns per second are served")
+    args = parser.parse_args()
+    metrics.enabled = args.metrics or bool(args.metrics_out)
+
+    from src.graphs.agent_flow import WeatherDocumentAgent
+    from src.tools import weather
+
+    # The agent logs every LLM and tool call; keep the report readable unless asked
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    warnings.filterwarnings("ignore", message="Payload indexes have no effect in the local Qdrant")
+
+    with WeatherStub(latency=args.weather_latency) as stub, quiet:
+        weather.OPENWEATHER_URL = stub.url
+        db = in_memory_database(COLLECTION)
+        agent = WeatherDocumentAgent(
+            model_name=ScriptedChatModel(latency=args.llm_latency),
+            router_model=ScriptedChatModel(latency=args.router_latency),
+            use_memory=args.checkpointer != "none",
+            checkpointer=create_checkpointer(args.checkpointer) if args.checkpointer != "none" else None,
+        )
+
+        # Setup (ingestion, collection lookups) is not part of the measured turns
+        metrics.clear()
+        if args.trace_memory:
+            tracemalloc.start()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = pool.map(lambda c: run_conversation(agent, c, args.turns), range(args.conversations))
+            latencies = [latency for conversation in results for latency in conversation]
+        elapsed = time.perf_counter() - start
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if args.trace_memory:
+            heap, heap_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    throughput = len(latencies) / elapsed
+    p95 = percentile(latencies, 0.95) * 1e3
+    print(
+        f"Conversations: {args.conversations}, turns: {len(latencies)}, concurrency: {args.concurrency}, "
+        f"LLM latency: {args.llm_latency * 1e3:.0f} ms"
+    )
+    print(f"throughput:    {throughput:10.1f} turns/s")
+    print(f"latency p50:   {percentile(latencies, 0.50) * 1e3:10.1f} ms")
+    print(f"latency p95:   {p95:10.1f} ms")
+    print(f"latency p99:   {percentile(latencies, 0.99) * 1e3:10.1f} ms")
+    # ru_maxrss is reported in kilobytes on Linux
+    print(f"peak RSS:      {rss_after / 1024:10.1f} MB (+{(rss_after - rss_before) / 1024:.1f} MB during the run)")
+    if args.trace_memory:
+        print(f"python heap:   {heap / 2**20:10.1f} MB retained, {heap_peak / 2**20:.1f} MB peak")
+    print(f"router:        {agent.router.stats() if agent.router else 'disabled'}")
+    print(f"weather cache: {weather.weather_cache.stats()}")
+    print(f"embeddings:    {db.embeddings.stats()}")
+    if metrics.enabled:
+        print_breakdown()
+    if args.metrics_out:
+        if args.metrics_out.endswith(".jsonl"):
+            metrics.write_jsonl(args.metrics_out)
+        else:
+            with open(args.metrics_out, "w", encoding="utf-8") as f:
+                f.write(metrics.to_prometheus())
+        print(f"metrics written to {args.metrics_out}")
+
+    failed = False
+    if args.max_p95_ms is not None and p95 > args.max_p95_ms:
+        print(f"FAIL: p95 latency {p95:.1f} ms exceeds {args.max_p95_ms:.1f} ms")
+        failed = True
+    if args.min_throughput is not None and throughput < args.min_throughput:
+        print(f"FAIL: throughput {throughput:.1f} turns/s is below {args.min_throughput:.1f}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Microbenchmark: per-turn cost of binding tools to the LLM.
+
+Compares calling llm.bind_tools on every turn (the old query_or_respond) with reusing
+the runnable pre-bound by ToolRegistry. No network calls are made.
+
+Usage:
+    uv run python -m benchmarks.bind_tools --iterations 2000
+"""
+import argparse
+import os
+import time
+
+# Tool modules validate credentials at import; binding never uses them
+for name in ("OPENWEATHER_API_KEY", "ANTHROPIC_API_KEY", "COHERE_API_KEY", "QDRANT_URL", "QDRANT_API_KEY"):
+    os.environ.setdefault(name, "benchmark")
+
+from langchain_anthropic import ChatAnthropic
+
+from src.graphs.tool_registry import DEFAULT_TOOL_SET, ToolRegistry
+from src.tools import tools
+
+
+def time_per_call(func, iterations: int) -> float:
+    """Average seconds per call of func."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--model", default="claude-3-7-sonnet-latest")
+    args = parser.parse_args()
+
+    llm = ChatAnthropic(model=args.model)
+    registry = ToolRegistry(llm)
+    registry.register(DEFAULT_TOOL_SET, tools, activate=True)
+
+    per_turn = time_per_call(lambda: llm.bind_tools(tools), args.iterations)
+    prebound = time_per_call(lambda: registry.active.llm, args.iterations)
+
+    print(f"Tools: {len(tools)}, iterations: {args.iterations}")
+    print(f"bind_tools per turn: {per_turn * 1e6:10.1f} us")
+    print(f"pre-bound registry:  {prebound * 1e6:10.1f} us")
+    print(f"saved per turn:      {(per_turn - prebound) * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
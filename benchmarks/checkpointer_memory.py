@@ -0,0 +1,77 @@
+"""
+Memory benchmark: resident checkpoint size as the number of conversation threads grows.
+
+Runs a one-node echo graph (no LLM or network) for an increasing number of threads and
+reports the Python heap held by each checkpointer, measured with tracemalloc.
+
+Usage:
+    uv run python -m benchmarks.checkpointer_memory --threads 2000 --turns 3
+"""
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from src.graphs.checkpointer import BoundedMemorySaver, SQLiteSaver
+
+
+def echo(state: MessagesState):
+    return {"messages": [AIMessage("Sunny, 21 degrees. " * 10)]}
+
+
+def build_graph(checkpointer):
+    builder = StateGraph(MessagesState)
+    builder.add_node("echo", echo)
+    builder.add_edge(START, "echo")
+    builder.add_edge("echo", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def measure(name, checkpointer, threads, turns, checkpoints):
+    """Print the heap held after each checkpoint count of threads."""
+    graph = build_graph(checkpointer)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    row = []
+    for thread in range(1, threads + 1):
+        config = {"configurable": {"thread_id": f"thread-{thread}"}}
+        for turn in range(turns):
+            graph.invoke({"messages": [HumanMessage(f"What's the weather in city {turn}?")]}, config)
+        if thread in checkpoints:
+            gc.collect()
+            row.append((tracemalloc.get_traced_memory()[0] - baseline) / 2**20)
+    tracemalloc.stop()
+    print(f"{name:<26}" + "".join(f"{mb:>10.1f}" for mb in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--max-threads", type=int, default=500)
+    args = parser.parse_args()
+
+    checkpoints = sorted({max(1, args.threads * i // 5) for i in range(1, 6)})
+    print(f"Heap in MiB after N threads ({args.turns} turns each)")
+    print(f"{'checkpointer':<26}" + "".join(f"{n:>10}" for n in checkpoints))
+
+    measure("MemorySaver", MemorySaver(), args.threads, args.turns, checkpoints)
+    measure(
+        f"BoundedMemorySaver({args.max_threads})",
+        BoundedMemorySaver(max_threads=args.max_threads),
+        args.threads, args.turns, checkpoints,
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        saver = SQLiteSaver(os.path.join(directory, "checkpoints.sqlite"))
+        measure("SQLiteSaver", saver, args.threads, args.turns, checkpoints)
+        saver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Import-time benchmark: how long importing a module takes and which imports dominate.
+
+Imports the module in a fresh interpreter under `python -X importtime`, a few times, and
+reports the fastest total along with the slowest imports of that run. The heavy client
+libraries (Qdrant, Cohere, Anthropic, PDF parsing) are expected to load with the first
+agent or tool call, not with the module. If one of them shows up, or the total exceeds
+--max-ms, the exit code is non-zero, so it can gate CI.
+
+Usage:
+    uv run python -m benchmarks.import_time --module src.graphs.agent_flow --max-ms 1500
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Modules that must not be imported by `import <module>` alone
+HEAVY_MODULES = (
+    "qdrant_client",
+    "langchain_qdrant",
+    "langchain_cohere",
+    "langchain_voyageai",
+    "langchain_anthropic",
+    "langchain_community",
+    "langchain_text_splitters",
+    "pypdf",
+)
+
+# Placeholder credentials so the imported modules take their fully configured path
+PLACEHOLDER_ENV = {
+    "ANTHROPIC_API_KEY": "benchmark",
+    "OPENWEATHER_API_KEY": "benchmark",
+    "COHERE_API_KEY": "benchmark",
+    "QDRANT_URL": "http://localhost:6333",
+    "QDRANT_API_KEY": "benchmark",
+    "LANGSMITH_API_KEY": "benchmark",
+    "LANGSMITH_TRACING": "false",
+}
+
+
+def measure(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Import module in a fresh interpreter.
+
+    Args:
+        module: The dotted module name
+
+    Returns:
+        (total_ms, cumulative_ms) where cumulative_ms maps every imported module to its
+        cumulative import time in milliseconds
+    """
+    env = {**PLACEHOLDER_ENV, **os.environ}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, total, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(total) / 1e3
+    return cumulative.get(module, 0.0), cumulative
+
+
+def heavy_imports(cumulative: Dict[str, float]) -> List[str]:
+    """Return the heavy modules (top-level packages) that were imported."""
+    return sorted({name for name in cumulative if name.split(".")[0] in HEAVY_MODULES and "." not in name})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="src.graphs.agent_flow")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh imports; the fastest is reported")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--max-ms", type=float, help="Fail if the import takes longer than this")
+    args = parser.parse_args()
+
+    total, cumulative = min((measure(args.module) for _ in range(args.runs)), key=lambda run: run[0])
+
+    print(f"import {args.module}: {total:.0f} ms (fastest of {args.runs})")
+    print(f"\n{'module':<60}{'cumulative ms':>14}")
+    for name, ms in sorted(cumulative.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<60}{ms:>14.1f}")
+    print()
+
+    failed = False
+    heavy = heavy_imports(cumulative)
+    if heavy:
+        print(f"FAIL: imported at module import: {', '.join(heavy)}")
+        failed = True
+    if args.max_ms is not None and total > args.max_ms:
+        print(f"FAIL: import took {total:.0f} ms, more than {args.max_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
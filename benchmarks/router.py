@@ -0,0 +1,155 @@
+"""
+Benchmark: routing accuracy and latency of the tool-selection step.
+
+Runs a labelled prompt set through the keyword classifier (offline) and, with --live,
+through the main model, the router model and the ModelRouter with escalation, reporting
+the share of prompts sent to the expected tool and the latency of each strategy.
+
+Usage:
+    uv run python -m benchmarks.router
+    uv run python -m benchmarks.router --live   # needs ANTHROPIC_API_KEY
+"""
+import argparse
+import os
+import statistics
+import time
+
+# Tool modules validate credentials at import; routing never calls the tools
+for name in ("OPENWEATHER_API_KEY", "COHERE_API_KEY", "QDRANT_URL", "QDRANT_API_KEY"):
+    os.environ.setdefault(name, "benchmark")
+
+from langchain_core.messages import HumanMessage
+
+from src.graphs.router import NO_TOOL, ROUTER_CONFIDENCE, ROUTER_MODEL, KeywordClassifier, ModelRouter, called_route
+from src.graphs.tool_registry import DEFAULT_TOOL_SET, ToolRegistry
+from src.tools import tools
+
+# (prompt, expected route)
+LABELLED_PROMPTS = [
+    ("What's the weather like in London?", "weather_tool"),
+    ("Is it raining in Seattle right now?", "weather_tool"),
+    ("How hot is it in Dubai today?", "weather_tool"),
+    ("What's the temperature in Oslo?", "weather_tool"),
+    ("Will it snow in Denver?", "weather_tool"),
+    ("How windy is it in Chicago?", "weather_tool"),
+    ("What's the humidity in Singapore?", "weather_tool"),
+    ("Tell me the current weather conditions in Mumbai", "weather_tool"),
+    ("Should I bring an umbrella in Paris today?", "weather_tool"),
+    ("Is it cold in Moscow?", "weather_tool"),
+    ("Is it raining in Oslo? [Collection: reports]", "weather_tool"),
+    ("Which collections are available?", "list_collections"),
+    ("List all document collections", "list_collections"),
+    ("What collections do I have?", "list_collections"),
+    ("Show me the collections", "list_collections"),
+    ("What documents are available to search?", "list_collections"),
+    ("How many chunks are in the manuals collection?", "collection_stats"),
+    ("Show the statistics of the reports collection", "collection_stats"),
+    ("How big is the contracts collection?", "collection_stats"),
+    ("What is the size of this collection?", "collection_stats"),
+    ("Create a collection from /data/annual_report.pdf", "create_document_collection"),
+    ("Ingest /tmp/manual.pdf into a collection called manuals", "create_document_collection"),
+    ("Make a new collection named contracts from contracts.pdf", "create_document_collection"),
+    ("Index the file /docs/paper.pdf", "create_document_collection"),
+    ("Upload /home/me/notes.pdf", "create_document_collection"),
+    ("What does the report say about revenue? [Collection: reports]", "document_query"),
+    ("Summarize the main findings of the paper", "document_query"),
+    ("According to the manual, how do I reset the device?", "document_query"),
+    ("What is on page 3 of the document?", "document_query"),
+    ("Who are the authors? [Collection: papers]", "document_query"),
+    ("What does section 2 of the contract cover?", "document_query"),
+    ("Give me a summary of the document", "document_query"),
+    ("What are the key risks mentioned in the report?", "document_query"),
+    ("Explain the methodology used in the PDF", "document_query"),
+    ("What warranty terms are in the file?", "document_query"),
+    ("Hello!", NO_TOOL),
+    ("Hi, what can you do?", NO_TOOL),
+    ("Thanks, that was helpful", NO_TOOL),
+    ("Who are you?", NO_TOOL),
+    ("Good morning", NO_TOOL),
+    ("What is 2 + 2?", NO_TOOL),
+    ("Tell me a joke", NO_TOOL),
+    ("Translate 'good night' into French", NO_TOOL),
+    ("What's the capital of Australia?", NO_TOOL),
+    ("Hey there", NO_TOOL),
+]
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def report(name: str, correct: int, latencies):
+    """Print the accuracy and latency of a routing strategy."""
+    print(
+        f"{name:<22} accuracy {correct / len(LABELLED_PROMPTS):6.1%}   "
+        f"mean {statistics.mean(latencies) * 1e3:9.2f} ms   p95 {percentile(latencies, 0.95) * 1e3:9.2f} ms"
+    )
+
+
+def benchmark_classifier(confidence: float):
+    """Accuracy of the keyword classifier on its own and on the prompts it is confident about."""
+    classifier = KeywordClassifier()
+    latencies, correct, confident, confident_correct = [], 0, 0, 0
+    for prompt, expected in LABELLED_PROMPTS:
+        start = time.perf_counter()
+        decision = classifier.classify(prompt)
+        latencies.append(time.perf_counter() - start)
+        correct += decision.route == expected
+        if decision.route is not None and decision.confidence >= confidence:
+            confident += 1
+            confident_correct += decision.route == expected
+    report("keyword classifier", correct, latencies)
+    print(
+        f"{'':<22} confident on {confident}/{len(LABELLED_PROMPTS)} prompts "
+        f"(threshold {confidence}), {confident_correct} of them correct"
+    )
+
+
+def benchmark_live(main_model: str, router_model: str, confidence: float):
+    """Accuracy and latency of the main model, the router model and the router with escalation."""
+    from langchain_anthropic import ChatAnthropic
+
+    main = ToolRegistry(ChatAnthropic(model=main_model))
+    main.register(DEFAULT_TOOL_SET, tools, activate=True)
+    small = ToolRegistry(ChatAnthropic(model=router_model))
+    small.register(DEFAULT_TOOL_SET, tools, activate=True)
+    router = ModelRouter(small, confidence=confidence)
+
+    def main_only(prompt, messages):
+        return main.active.llm.invoke(messages)
+
+    def small_only(prompt, messages):
+        return small.active.llm.invoke(messages)
+
+    def routed(prompt, messages):
+        return router.route(prompt, messages) or main.active.llm.invoke(messages)
+
+    for name, strategy in ((main_model, main_only), (router_model, small_only), ("router", routed)):
+        latencies, correct = [], 0
+        for prompt, expected in LABELLED_PROMPTS:
+            start = time.perf_counter()
+            response = strategy(prompt, [HumanMessage(prompt)])
+            latencies.append(time.perf_counter() - start)
+            correct += called_route(response) == expected
+        report(name, correct, latencies)
+    print(f"{'':<22} router stats: {router.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--live", action="store_true", help="Also call the Anthropic models")
+    parser.add_argument("--model", default="claude-3-7-sonnet-latest")
+    parser.add_argument("--router-model", default=ROUTER_MODEL or "claude-3-5-haiku-latest")
+    parser.add_argument("--confidence", type=float, default=ROUTER_CONFIDENCE)
+    args = parser.parse_args()
+
+    print(f"Prompts: {len(LABELLED_PROMPTS)}")
+    benchmark_classifier(args.confidence)
+    if args.live:
+        benchmark_live(args.model, args.router_model, args.confidence)
+
+
+if __name__ == "__main__":
+    main()
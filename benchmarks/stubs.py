@@ -0,0 +1,206 @@
+"""
+Local stand-ins for the agent's external services, for offline benchmarks.
+
+- ScriptedChatModel replaces Anthropic: a chat model with a fixed latency that calls the
+  weather or document tools when the question asks for them and answers otherwise.
+- fake_embeddings replaces Cohere with deterministic hash-based vectors.
+- in_memory_database replaces Qdrant Cloud with a QdrantDatabase on QdrantClient(":memory:").
+- WeatherStub replaces OpenWeatherMap with a local HTTP server.
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+WEATHER_QUESTION = re.compile(r"weather in ([A-Za-z][\w\- ]*)", re.IGNORECASE)
+COLLECTION_TAG = re.compile(r"\[Collection:\s*([^\]]+)\]")
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Deterministic chat model with a fixed per-call latency.
+
+    Tool selection: "weather in <city>" calls weather_tool and a "[Collection: name]" tag
+    calls document_query; anything else is answered directly. Prompts ending in retrieved
+    context or a summary request get a short answer. Token usage is approximated from the
+    prompt and answer lengths so prompt-cache and instrumentation code sees realistic data.
+    """
+
+    latency: float = 0.05
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        # The script decides which tools to call, so the schemas are not needed
+        return self
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        last = messages[-1]
+        text = last.text()
+        tool_calls = []
+        if last.type == "human" and text.startswith("Retrieved context"):
+            content = f"Based on the retrieved context: {text[19:119].strip()}"
+        elif last.type == "human" and text.startswith("Extend the running summary"):
+            content = "The user asked about the weather and their documents."
+        elif match := WEATHER_QUESTION.search(text):
+            content = ""
+            tool_calls.append({"name": "weather_tool", "args": {"location": match.group(1).strip(" ?")}})
+        elif match := COLLECTION_TAG.search(text):
+            content = ""
+            tool_calls.append({
+                "name": "document_query",
+                "args": {"query": COLLECTION_TAG.sub("", text).strip(), "collection_name": match.group(1).strip()},
+            })
+        else:
+            content = "Hello! Ask me about the weather or your documents."
+        input_tokens = sum(len(message.text()) for message in messages) // 4
+        output_tokens = max(len(content) // 4, 1)
+        return AIMessage(
+            content,
+            tool_calls=[{**call, "id": f"call_{uuid.uuid4().hex[:12]}"} for call in tool_calls],
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+
+def fake_embeddings(size: int = 256):
+    """Deterministic embeddings wrapped in the same query cache as the Cohere embeddings."""
+    from src.tools.embedding_cache import CachedEmbeddings
+
+    return CachedEmbeddings(DeterministicFakeEmbedding(size=size), model="fake")
+
+
+class LockedClient:
+    """Serializes calls to a local Qdrant client, which unlike a server is not thread-safe."""
+
+    def __init__(self, client):
+        self._client = client
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def locked(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+        return locked
+
+
+def in_memory_database(collection_name: str = "benchmark", pages: int = 20, embeddings=None):
+    """
+    Create a QdrantDatabase on an in-memory Qdrant with one ingested collection.
+
+    Only the sync document path is served: the async client of a local Qdrant would be a
+    separate, empty store.
+
+    Args:
+        collection_name: The collection to create
+        pages: Number of synthetic pages to ingest
+        embeddings: The embeddings to use, defaults to fake_embeddings()
+
+    Returns:
+        The database, also installed as the document tools' shared instance
+    """
+    from qdrant_client import QdrantClient
+
+    from src.tools import document
+
+    db = document.QdrantDatabase(
+        qdrant_client=LockedClient(QdrantClient(":memory:")),
+        embeddings=embeddings or fake_embeddings(),
+    )
+    db.ingestion.run(collection_name, [
+        Document(
+            page_content=f"Page {page} of the benchmark report. " + " ".join(f"fact{page}-{i}" for i in range(150)),
+            metadata={"source": "benchmark.pdf", "page": page},
+        )
+        for page in range(pages)
+    ])
+    document.qdrant_db = db
+    return db
+
+
+class WeatherStub:
+    """
+    A local OpenWeatherMap stand-in serving /data/2.5/weather on a background thread.
+
+    Usage:
+        with WeatherStub(latency=0.02) as stub:
+            os.environ["OPENWEATHER_URL"] = stub.url
+    """
+
+    def __init__(self, latency: float = 0.02, host: str = "127.0.0.1", port: int = 0):
+        latency_seconds = latency
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                time.sleep(latency_seconds)
+                city = parse_qs(urlparse(self.path).query).get("q", ["Nowhere"])[0]
+                body = json.dumps({
+                    "name": city,
+                    "sys": {"country": "GB"},
+                    "weather": [{"description": "light rain"}],
+                    "main": {"temp": 14.2, "feels_like": 13.5, "humidity": 81},
+                    "wind": {"speed": 4.1},
+                    "dt": int(time.time()),
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/data/2.5/weather"
+
+    def start(self) -> "WeatherStub":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "WeatherStub":
+        return self.start()
+
+    def __exit__(self, *exc: Any):
+        self.stop()
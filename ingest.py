@@ -0,0 +1,45 @@
+"""
+Command-line entrypoint for bulk PDF ingestion.
+
+Example:
+    python ingest.py ./manuals --collection manuals --processes 8
+"""
+import argparse
+
+
+def main():
+    """Ingest a directory or glob of PDFs into a single document collection."""
+    parser = argparse.ArgumentParser(description="Bulk-ingest PDF files into a Qdrant collection.")
+    parser.add_argument("path", help="Directory (searched recursively), PDF file or glob pattern")
+    parser.add_argument("--collection", required=True, help="Collection to create or append to")
+    parser.add_argument("--processes", type=int, default=None, help="PDF parser processes (default: CPU count)")
+    parser.add_argument("--manifest", default=None, help="Manifest file used to resume interrupted runs")
+    parser.add_argument("--no-resume", action="store_true", help="Re-ingest files already listed in the manifest")
+    args = parser.parse_args()
+
+    # Imported here so that --help works without credentials
+    from src.tools.document import get_qdrant_db
+
+    def show_progress(stats):
+        print(f"\r📄 {stats['pages']} pages, {stats['chunks']} chunks", end="", flush=True)
+
+    db = get_qdrant_db()
+    result = db.ingest_files(
+        args.path,
+        args.collection,
+        processes=args.processes,
+        manifest_path=args.manifest,
+        resume=not args.no_resume,
+        progress_callback=show_progress,
+    )
+    print()
+    if "error" in result:
+        print(f"❌ {result['error']}")
+        raise SystemExit(1)
+    print(f"✅ {result['message']}")
+    for failure in result["stats"].get("failed", []):
+        print(f"   ⚠️ {failure['file']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
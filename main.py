@@ -1,7 +1,9 @@
 from typing import Dict, List
 import uuid
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
-from src.graphs.agent_flow import graph
+from src.graphs.agent_flow import get_graph
+from src.graphs.streaming import stream_text
+from src.tools.metrics import METRICS_JSONL_PATH, metrics
 
 def display_message(message):
     """Display a single message."""
@@ -17,6 +19,9 @@ def main():
     print("🌟 Welcome to the Weather & Document Assistant! 🌟")
     print("(Type 'exit' to quit)")
     
+    # Build the agent once, after the banner is up
+    graph = get_graph()
+    
     # Create a thread ID for this session
     thread_id = str(uuid.uuid4())
     print(f"Using conversation thread: {thread_id}")
@@ -32,6 +37,8 @@ def main():
         # Check if user wants to exit
         if user_input.lower() in ["exit", "quit", "bye"]:
             print("\n🤖 AI: Goodbye! Have a great day!")
+            if metrics.enabled and METRICS_JSONL_PATH:
+                metrics.write_jsonl(METRICS_JSONL_PATH)
             break
         
         # Create human message
@@ -40,16 +47,9 @@ def main():
         # Stream the response with memory persistence
         print("\n🤖 AI: ", end="", flush=True)
         
-        for step in graph.stream(
-            {"messages": [human_message]},
-            stream_mode="values",
-            config=config,
-        ):
-            if "messages" in step and len(step["messages"]) > 1:
-                latest_message = step["messages"][-1]
-                # Only print AI message content, not tool calls
-                if latest_message.type == "ai" and not getattr(latest_message, "tool_calls", None):
-                    print(latest_message.content, end="", flush=True)
+        # Print the answer token by token; tool calls and tool results are not shown
+        for text in stream_text(graph, {"messages": [human_message]}, config=config):
+            print(text, end="", flush=True)
         
         print()  # Add newline after streaming completes
 
@@ -1,24 +1,62 @@
 from typing import Annotated, List, Dict, Any, Optional
+import functools
 import os
 from typing_extensions import TypedDict
-from langchain_core.messages import SystemMessage
-from langgraph.prebuilt import ToolNode, tools_condition
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.graph import MessagesState, StateGraph
-from langgraph.checkpoint.memory import MemorySaver
 from dotenv import load_dotenv
-from langchain_anthropic import ChatAnthropic
 
-from src.tools import tools as available_tools
+from src.tools import DOCUMENT_TOOLS_AVAILABLE, get_tools
+from src.tools.metrics import metrics
+from src.graphs.answer_cache import (
+    ANSWER_CACHE_ENABLED, SemanticAnswerCache, answered_collection, is_standalone, split_question
+)
+from src.graphs.checkpointer import create_checkpointer
+from src.graphs.formatters import ToolResultFormatter
+from src.graphs.history import AgentState, HistoryManager
+from src.graphs.prompt_cache import CACHE_CONTROL, PROMPT_CACHING, PromptCacheStats, mark_history, system_prompt
+from src.graphs.router import GENERATION_MODEL, ROUTER_MODEL, SUMMARY_MODEL, ModelRouter
+from src.graphs.tool_node import ConcurrentToolNode
+from src.graphs.tool_registry import DEFAULT_TOOL_SET, BoundToolSet, ToolRegistry
 
 load_dotenv()
 # Load environment variables from .env file
 langsmith_api_key = os.getenv("LANGSMITH_API_KEY")
 langsmith_tracing = os.getenv("LANGSMITH_TRACING")
 # Set environment variables for LangSmith tracing and API key
-os.environ["LANGSMITH_TRACING"]= langsmith_tracing
-os.environ["LANGSMITH_API_KEY"]= langsmith_api_key
+if langsmith_tracing is not None:
+    os.environ["LANGSMITH_TRACING"]= langsmith_tracing
+if langsmith_api_key is not None:
+    os.environ["LANGSMITH_API_KEY"]= langsmith_api_key
+
+GENERATION_INSTRUCTIONS = (
+    "You are an assistant for question-answering tasks. "
+    "Use the retrieved context that follows the question to answer "
+    "it. If you don't know the answer, say that you "
+    "don't know. Use three sentences maximum and keep the "
+    "answer concise."
+)
+
+def chat_model(model) -> BaseChatModel:
+    """Return model if it is already a chat model, else the Anthropic model of that name."""
+    if isinstance(model, BaseChatModel):
+        return model
+    # Imported here so the Anthropic client loads with the first agent, not with this module
+    from langchain_anthropic import ChatAnthropic
+    return ChatAnthropic(model=model)
+
+def load_document_tools():
+    """Return the document tools module, or None when its credentials are not set."""
+    if not DOCUMENT_TOOLS_AVAILABLE:
+        return None
+    try:
+        from src.tools import document
+    except (ImportError, ValueError):
+        return None
+    return document
 
 class WeatherDocumentAgent:
     """
@@ -26,25 +64,77 @@ class WeatherDocumentAgent:
     Uses LangGraph for orchestration and LangChain tools for functionality.
     """
     
-    def __init__(self, model_name="claude-3-7-sonnet-latest", use_memory=True):
+    def __init__(self, model_name="claude-3-7-sonnet-latest", use_memory=True, checkpointer=None,
+                 answer_cache=None, router_model=ROUTER_MODEL, generation_model=GENERATION_MODEL,
+                 summary_model=SUMMARY_MODEL):
         """
         Initialize the agent with the specified LLM model.
         
         Args:
-            model_name: The name of the LLM model to use
+            model_name: The name of the LLM model to use, or a chat model, and the default for every node
             use_memory: Whether to use memory persistence
+            checkpointer: The checkpointer to use, defaults to the one selected by CHECKPOINTER
+            answer_cache: The semantic answer cache, defaults to one over the document
+                embeddings when ANSWER_CACHE_ENABLED is set and the document tools are available
+            router_model: Small model (name or chat model) that selects tools when the question
+                is clearly classified, None to always select tools with model_name
+            generation_model: Model (name or chat model) that writes answers from tool results,
+                defaults to model_name
+            summary_model: Model (name or chat model) that summarizes older turns, defaults to model_name
         """
+        # Import the tools now rather than with this module; Qdrant and Cohere load here
+        available_tools = get_tools()
+        self.documents = load_document_tools()
+        
         # Initialize the LLM
-        self.llm = ChatAnthropic(model=model_name)
+        self.llm = chat_model(model_name)
+        self.generation_llm = chat_model(generation_model) if generation_model else self.llm
+        
+        # Bind the tools once; query_or_respond reuses the bound runnable on every turn
+        self.tool_sets = ToolRegistry(self.llm)
+        self.tool_sets.register(
+            DEFAULT_TOOL_SET,
+            available_tools,
+            activate=True,
+            cache_control=CACHE_CONTROL if PROMPT_CACHING else None,
+        )
+        
+        # Tool selection runs on the small model unless the question needs the main one
+        self.router = None
+        if router_model:
+            self.router = ModelRouter(ToolRegistry(chat_model(router_model)))
+            self.router.tool_sets.register(
+                DEFAULT_TOOL_SET,
+                available_tools,
+                activate=True,
+                cache_control=CACHE_CONTROL if PROMPT_CACHING else None,
+            )
+        self.prompt_cache = PromptCacheStats()
+        
+        # Renders structured tool results directly for the tools listed in FAST_PATH_TOOLS
+        self.formatter = ToolResultFormatter()
+        
+        # Bounds the history sent to the LLM by summarizing older turns
+        self.history = HistoryManager(chat_model(summary_model) if summary_model else self.llm)
+        
+        # Answers repeated document questions without running the graph's LLM calls
+        # Without the document tools there are no document answers to cache
+        documents = self.documents
+        if answer_cache is None and ANSWER_CACHE_ENABLED and documents is not None:
+            answer_cache = SemanticAnswerCache(lambda: documents.get_qdrant_db().embeddings)
+        self.answer_cache = answer_cache
+        if self.answer_cache is not None and documents is not None:
+            # Re-ingesting a collection makes its cached answers stale
+            documents.on_collection_changed(self.answer_cache.invalidate)
         
         # Initialize the graph
-        self.graph_builder = StateGraph(MessagesState)
+        self.graph_builder = StateGraph(AgentState)
         
-        # Create the tool node
-        self.tool_node = ToolNode(available_tools)
+        # Create the tool node; independent tool calls in one turn run concurrently
+        self.tool_node = ConcurrentToolNode(available_tools)
         
-        # Initialize memory saver if requested
-        self.memory = MemorySaver() if use_memory else None
+        # Initialize the checkpointer if requested (bounded in-memory by default, SQLite to persist)
+        self.memory = (checkpointer or create_checkpointer()) if use_memory else None
         
         # Build the graph
         self._build_graph()
@@ -52,72 +142,350 @@ class WeatherDocumentAgent:
         # Compile the graph
         self.graph = self.graph_builder.compile(checkpointer=self.memory)
     
-    def query_or_respond(self, state: MessagesState) -> Dict[str, List[Any]]:
+    def _cache_query(self, state: AgentState) -> Optional[tuple]:
+        """
+        Return the question of the current turn and the collection it is about.
+        
+        Args:
+            state: The current agent state
+            
+        Returns:
+            (question, collection), or None when there is no collection to look in or the
+            question is a follow-up
+        """
+        message = state["messages"][-1]
+        if message.type != "human" or not is_standalone(state):
+            return None
+        question, collection = split_question(message.text())
+        if not collection and self.documents is not None:
+            collection = self.documents.active_collection
+        return (question, collection) if question and collection else None
+
+    def _cache_hit(self, answer: Optional[str]) -> Dict[str, Any]:
+        """Turn an answer cache lookup into a node update."""
+        if answer is None:
+            return {}
+        print("Answered from the semantic answer cache")
+        return {"messages": [AIMessage(answer)]}
+
+    def check_answer_cache(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Answer the question from the semantic answer cache when a similar one was answered.
+        
+        Args:
+            state: The current agent state
+            
+        Returns:
+            The cached answer, or no update on a miss
+        """
+        query = self._cache_query(state) if self.answer_cache else None
+        if query is None:
+            return {}
+        question, collection = query
+        try:
+            vector = self.answer_cache.embed(question)
+        except Exception as e:
+            print(f"Answer cache lookup failed: {str(e)}")
+            return {}
+        return self._cache_hit(self.answer_cache.lookup(collection, vector))
+
+    async def acheck_answer_cache(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Async version of check_answer_cache, used when the graph runs with ainvoke/astream.
+        
+        Args:
+            state: The current agent state
+            
+        Returns:
+            The cached answer, or no update on a miss
+        """
+        query = self._cache_query(state) if self.answer_cache else None
+        if query is None:
+            return {}
+        question, collection = query
+        try:
+            vector = await self.answer_cache.aembed(question)
+        except Exception as e:
+            print(f"Answer cache lookup failed: {str(e)}")
+            return {}
+        return self._cache_hit(self.answer_cache.lookup(collection, vector))
+
+    @staticmethod
+    def route_answer_cache(state: AgentState) -> str:
+        """End the turn on a cache hit, otherwise run the agent."""
+        return END if state["messages"][-1].type == "ai" else "manage_history"
+
+    def _answer_to_cache(self, state: AgentState, response: Any) -> Optional[tuple]:
+        """
+        Return what to cache for a generated answer.
+        
+        Args:
+            state: The message state the answer was generated from
+            response: The generated answer
+            
+        Returns:
+            (collection, question, answer), or None if the answer is not cacheable
+        """
+        if self.answer_cache is None or not response.text() or not is_standalone(state):
+            return None
+        collection = answered_collection(self._recent_tool_messages(state))
+        question = next((m for m in reversed(state["messages"]) if m.type == "human"), None)
+        if not collection or question is None:
+            return None
+        return collection, split_question(question.text())[0], response.text()
+
+    def _store_answer(self, state: AgentState, response: Any):
+        """Cache an answer grounded in a single collection; the question embedding is usually cached."""
+        entry = self._answer_to_cache(state, response)
+        if entry is None:
+            return
+        collection, question, answer = entry
+        try:
+            self.answer_cache.store(collection, question, self.answer_cache.embed(question), answer)
+        except Exception as e:
+            print(f"Answer cache store failed: {str(e)}")
+
+    async def _astore_answer(self, state: AgentState, response: Any):
+        """Async version of _store_answer."""
+        entry = self._answer_to_cache(state, response)
+        if entry is None:
+            return
+        collection, question, answer = entry
+        try:
+            self.answer_cache.store(collection, question, await self.answer_cache.aembed(question), answer)
+        except Exception as e:
+            print(f"Answer cache store failed: {str(e)}")
+
+    def manage_history(self, state: AgentState, config: RunnableConfig = None) -> Dict[str, Any]:
+        """
+        Drop spent tool messages and fold older turns into the rolling summary.
+        
+        Args:
+            state: The current agent state
+            config: The run config, forwarded to the LLM so callbacks and streaming reach it
+            
+        Returns:
+            Messages to remove and, when turns were folded, the new summary
+        """
+        return self.history.update(state, config)
+
+    async def amanage_history(self, state: AgentState, config: RunnableConfig = None) -> Dict[str, Any]:
+        """
+        Async version of manage_history, used when the graph runs with ainvoke/astream.
+        
+        Args:
+            state: The current agent state
+            config: The run config, forwarded to the LLM so callbacks and streaming reach it
+            
+        Returns:
+            Messages to remove and, when turns were folded, the new summary
+        """
+        return await self.history.aupdate(state, config)
+    
+    def query_or_respond(self, state: AgentState, config: RunnableConfig = None) -> Dict[str, List[Any]]:
         """
         Generate tool call for retrieval or respond directly.
         
         Args:
             state: The current message state
+            config: The run config, forwarded to the LLM so callbacks and streaming reach it
+            
+        Returns:
+            Updated state with new messages
+        """
+        prompt = self._routing_prompt(state)
+        response = self.router.route(self._question(state), prompt, config) if self.router else None
+        if response is None:
+            response = self.tool_sets.active.llm.invoke(prompt, config)
+        self.prompt_cache.record("query_or_respond", response)
+        # The messages reducer of AgentState appends messages to state instead of overwriting
+        return {"messages": [response]}
+
+    async def aquery_or_respond(self, state: AgentState, config: RunnableConfig = None) -> Dict[str, List[Any]]:
+        """
+        Async version of query_or_respond, used when the graph runs with ainvoke/astream.
+        
+        Args:
+            state: The current message state
+            config: The run config, forwarded to the LLM so callbacks and streaming reach it
             
         Returns:
             Updated state with new messages
         """
-        llm_with_tools = self.llm.bind_tools(available_tools)
-        response = llm_with_tools.invoke(state["messages"])
-        # MessagesState appends messages to state instead of overwriting
+        prompt = self._routing_prompt(state)
+        response = await self.router.aroute(self._question(state), prompt, config) if self.router else None
+        if response is None:
+            response = await self.tool_sets.active.llm.ainvoke(prompt, config)
+        self.prompt_cache.record("query_or_respond", response)
         return {"messages": [response]}
+
+    @staticmethod
+    def _question(state: AgentState) -> str:
+        """Return the text of the latest human message."""
+        return next((m.text() for m in reversed(state["messages"]) if m.type == "human"), "")
+
+    def _routing_prompt(self, state: AgentState) -> List[Any]:
+        """
+        Build the prompt for query_or_respond.
+        
+        The bound tool definitions, the summary and the history before the current turn form
+        a prefix that stays the same from one turn to the next, so it is served from the
+        prompt cache.
+        
+        Args:
+            state: The current message state
+            
+        Returns:
+            The list of messages to send to the LLM
+        """
+        return self.history.with_summary(state, mark_history(state["messages"]))
+    
+    def use_tool_set(self, name: str) -> BoundToolSet:
+        """
+        Switch the agent to another registered tool set without rebuilding the graph.
+        
+        Args:
+            name: The name of a tool set registered in self.tool_sets
+            
+        Returns:
+            The newly active tool set
+        """
+        tool_set = self.tool_sets.activate(name)
+        self.tool_node.set_tools(tool_set.tools)
+        if self.router:
+            if name in self.router.tool_sets.names():
+                self.router.tool_sets.activate(name)
+            else:
+                self.router.tool_sets.register(
+                    name,
+                    tool_set.tools,
+                    activate=True,
+                    cache_control=CACHE_CONTROL if PROMPT_CACHING else None,
+                )
+        return tool_set
     
-    def generate(self, state: MessagesState) -> Dict[str, List[Any]]:
+    def generate(self, state: AgentState, config: RunnableConfig = None) -> Dict[str, List[Any]]:
         """
         Generate answer based on tool results.
         
         Args:
             state: The current message state
+            config: The run config, forwarded to the LLM so callbacks and streaming reach it
+            
+        Returns:
+            Updated state with new messages
+        """
+        response = self.generation_llm.invoke(self._generation_prompt(state), config)
+        self.prompt_cache.record("generate", response)
+        self._store_answer(state, response)
+        return {"messages": [response]}
+
+    async def agenerate(self, state: AgentState, config: RunnableConfig = None) -> Dict[str, List[Any]]:
+        """
+        Async version of generate, used when the graph runs with ainvoke/astream.
+        
+        Args:
+            state: The current message state
+            config: The run config, forwarded to the LLM so callbacks and streaming reach it
             
         Returns:
             Updated state with new messages
         """
-        # Get generated ToolMessages
+        response = await self.generation_llm.ainvoke(self._generation_prompt(state), config)
+        self.prompt_cache.record("generate", response)
+        await self._astore_answer(state, response)
+        return {"messages": [response]}
+
+    @staticmethod
+    def _recent_tool_messages(state: AgentState) -> List[Any]:
+        """Return the ToolMessages produced by the latest tools step, in order."""
         recent_tool_messages = []
         for message in reversed(state["messages"]):
             if message.type == "tool":
                 recent_tool_messages.append(message)
             else:
                 break
-        tool_messages = recent_tool_messages[::-1]
-
-        # Format into prompt
-        docs_content = "\n\n".join(doc.content for doc in tool_messages)
-        system_message_content = (
-            "You are an assistant for question-answering tasks. "
-            "Use the following pieces of retrieved context to answer "
-            "the question. If you don't know the answer, say that you "
-            "don't know. Use three sentences maximum and keep the "
-            "answer concise."
-            "\n\n"
-            f"{docs_content}"
-        )
+        return recent_tool_messages[::-1]
+
+    def route_tool_results(self, state: AgentState) -> str:
+        """
+        Choose between the template fast path and the generate LLM call after the tools step.
+        
+        Args:
+            state: The current message state
+            
+        Returns:
+            The name of the next node
+        """
+        if self.formatter.format(self._recent_tool_messages(state)) is not None:
+            return "respond_from_tools"
+        return "generate"
+
+    def respond_from_tools(self, state: AgentState) -> Dict[str, List[Any]]:
+        """
+        Answer with the tool results rendered by deterministic templates, without an LLM call.
+        
+        Args:
+            state: The current message state
+            
+        Returns:
+            Updated state with new messages
+        """
+        return {"messages": [AIMessage(self.formatter.format(self._recent_tool_messages(state)))]}
+
+    def _generation_prompt(self, state: AgentState) -> List[Any]:
+        """
+        Build the prompt for the generate step from the latest tool results.
+        
+        Args:
+            state: The current message state
+            
+        Returns:
+            The list of messages to send to the LLM
+        """
+        tool_messages = self._recent_tool_messages(state)
+
+        # Format into prompt. The instructions and the earlier conversation form a stable,
+        # cacheable prefix; the retrieved context changes every turn, so it goes last.
+        docs_content = "\n\n".join(doc.text() for doc in tool_messages)
         conversation_messages = [
             message
             for message in state["messages"]
             if message.type in ("human", "system")
             or (message.type == "ai" and not message.tool_calls)
         ]
-        prompt = [SystemMessage(system_message_content)] + conversation_messages
-
-        # Run
-        response = self.llm.invoke(prompt)
-        return {"messages": [response]}
+        prompt = [system_prompt(GENERATION_INSTRUCTIONS)] + mark_history(conversation_messages)
+        if docs_content:
+            prompt.append(HumanMessage(f"Retrieved context:\n\n{docs_content}"))
+        return self.history.with_summary(state, prompt)
     
+    def _add_node(self, name: str, func, afunc=None):
+        """Add a node whose sync and async implementations record their wall time as node_seconds."""
+        timed = metrics.timed("node_seconds", node=name)
+        self.graph_builder.add_node(name, RunnableLambda(timed(func), afunc=timed(afunc) if afunc else None))
+
     def _build_graph(self):
         """Build the LangGraph flow."""
+        # langgraph.prebuilt pulls in the prebuilt agents; only the condition is needed, at build time
+        from langgraph.prebuilt import tools_condition
+        
         # Add nodes to the graph
-        self.graph_builder.add_node("query_or_respond", self.query_or_respond)
-        self.graph_builder.add_node("tools", self.tool_node)
-        self.graph_builder.add_node("generate", self.generate)
+        # Nodes carry a sync and an async implementation, picked by invoke/stream vs ainvoke/astream
+        self._add_node("check_answer_cache", self.check_answer_cache, self.acheck_answer_cache)
+        self._add_node("manage_history", self.manage_history, self.amanage_history)
+        self._add_node("query_or_respond", self.query_or_respond, self.aquery_or_respond)
+        self._add_node("tools", self.tool_node.invoke, self.tool_node.ainvoke)
+        self._add_node("generate", self.generate, self.agenerate)
+        self._add_node("respond_from_tools", self.respond_from_tools)
         
-        # Set the entry point
-        self.graph_builder.set_entry_point("query_or_respond")
+        # Set the entry point; every turn first checks the answer cache, then trims the history
+        self.graph_builder.set_entry_point("check_answer_cache")
+        self.graph_builder.add_conditional_edges(
+            "check_answer_cache",
+            self.route_answer_cache,
+            {END: END, "manage_history": "manage_history"},
+        )
+        self.graph_builder.add_edge("manage_history", "query_or_respond")
         
         # Add conditional edges
         self.graph_builder.add_conditional_edges(
@@ -126,9 +494,16 @@ class WeatherDocumentAgent:
             {END: END, "tools": "tools"},
         )
         
+        # Structured tool results the formatter can render skip the generate LLM call
+        self.graph_builder.add_conditional_edges(
+            "tools",
+            self.route_tool_results,
+            {"respond_from_tools": "respond_from_tools", "generate": "generate"},
+        )
+        
         # Add remaining edges
-        self.graph_builder.add_edge("tools", "generate")
         self.graph_builder.add_edge("generate", END)
+        self.graph_builder.add_edge("respond_from_tools", END)
     
     def stream(self, messages, thread_id=None):
         """
@@ -141,14 +516,76 @@ class WeatherDocumentAgent:
         Returns:
             A stream of responses
         """
-        config = {}
+        return self.graph.stream({"messages": messages}, config=self._config(thread_id), stream_mode="values")
+
+    def _config(self, thread_id=None) -> Dict[str, Any]:
+        """Build the run config for a conversation thread."""
         if thread_id and self.memory:
-            config = {"configurable": {"thread_id": thread_id}}
+            return {"configurable": {"thread_id": thread_id}}
+        return {}
+
+    async def astream(self, messages, thread_id=None, stream_mode="values"):
+        """
+        Asynchronously stream responses from the agent.
+        
+        Args:
+            messages: The messages to process
+            thread_id: Optional thread ID for memory persistence
+            stream_mode: The LangGraph stream mode
+            
+        Yields:
+            The streamed graph updates
+        """
+        async for step in self.graph.astream(
+            {"messages": messages}, config=self._config(thread_id), stream_mode=stream_mode
+        ):
+            yield step
+
+    async def ainvoke(self, messages, thread_id=None) -> Dict[str, Any]:
+        """
+        Asynchronously run the agent to completion.
+        
+        Many conversations can be served concurrently from a single event loop, since the
+        LLM, weather and document calls are all awaited.
+        
+        Args:
+            messages: The messages to process
+            thread_id: Optional thread ID for memory persistence
+            
+        Returns:
+            The final graph state
+        """
+        return await self.graph.ainvoke({"messages": messages}, config=self._config(thread_id))
+
+
+def create_agent(**kwargs) -> WeatherDocumentAgent:
+    """
+    Create an agent; nothing is built when this module is imported.
+    
+    Args:
+        kwargs: Arguments for WeatherDocumentAgent
         
-        return self.graph.stream({"messages": messages}, config=config, stream_mode="values")
+    Returns:
+        The new agent
+    """
+    return WeatherDocumentAgent(**kwargs)
+
+
+@functools.lru_cache(maxsize=None)
+def get_agent() -> WeatherDocumentAgent:
+    """Return the process-wide default agent, created on the first call."""
+    return create_agent()
+
+
+def get_graph():
+    """Return the compiled graph of the default agent, created on the first call."""
+    return get_agent().graph
 
 
-# Create an instance of the agent
-agent = WeatherDocumentAgent()
-# Export the compiled graph
-graph = agent.graph
\ No newline at end of file
+def __getattr__(name):
+    # `agent` and `graph` used to be created at import; they are still importable, lazily
+    if name == "agent":
+        return get_agent()
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
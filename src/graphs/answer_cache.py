@@ -0,0 +1,236 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import BaseMessage
+
+from src.tools.metrics import metrics
+
+# Semantic cache of whole document answers, keyed by collection and query embedding
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1000"))
+
+# The Streamlit UI appends the selected collection to the prompt as "[Collection: name]"
+COLLECTION_TAG = re.compile(r"\s*\[Collection:\s*([^\]]+)\]\s*$")
+
+
+class CachedAnswer(NamedTuple):
+    question: str
+    answer: str
+    created_at: float
+
+
+def split_question(text: str) -> tuple:
+    """
+    Separate the question from a trailing collection tag.
+
+    Args:
+        text: The user message
+
+    Returns:
+        (question, collection name or None)
+    """
+    match = COLLECTION_TAG.search(text)
+    if not match:
+        return text.strip(), None
+    return text[:match.start()].strip(), match.group(1).strip()
+
+
+def is_standalone(state: Dict[str, Any]) -> bool:
+    """
+    Return whether the current turn opens its conversation.
+
+    Later turns can lean on earlier ones ("and in 2024?"), so the same words may ask a
+    different question in another thread; only opening questions are looked up and cached.
+
+    Args:
+        state: The agent state, with messages and the rolling summary
+
+    Returns:
+        True if there is no earlier human message and no summary of folded turns
+    """
+    if state.get("summary"):
+        return False
+    return sum(message.type == "human" for message in state["messages"]) == 1
+
+
+def answered_collection(tool_messages: List[BaseMessage]) -> Optional[str]:
+    """
+    Return the collection a turn's answer is grounded in, if it is cacheable.
+
+    Only turns answered purely from document_query results that found documents are cached:
+    weather and other tool results go stale, answers without tools depend on the conversation,
+    and an empty retrieval may succeed once the collection is updated.
+
+    Args:
+        tool_messages: The ToolMessages of the turn's tools step
+
+    Returns:
+        The collection name, or None if the answer should not be cached
+    """
+    collections = set()
+    for message in tool_messages:
+        if message.name != "document_query" or message.status == "error":
+            return None
+        try:
+            result = json.loads(message.content)
+        except (TypeError, ValueError):
+            return None
+        if result.get("status") != "success" or not result.get("collection") or not result.get("results"):
+            return None
+        collections.add(result["collection"])
+    return collections.pop() if len(collections) == 1 else None
+
+
+class SemanticAnswerCache:
+    """
+    A local vector index of answered questions, one per collection.
+
+    A question whose embedding has a cosine similarity of at least threshold with a
+    cached question of the same collection gets the cached answer, without running the
+    graph's LLM calls. Entries expire after ttl seconds, the oldest are evicted beyond
+    max_entries per collection, and a collection's entries are dropped when it is
+    re-ingested.
+    """
+
+    def __init__(
+        self,
+        embeddings: Callable[[], Embeddings],
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl: float = ANSWER_CACHE_TTL,
+        max_entries: int = ANSWER_CACHE_SIZE,
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            embeddings: Returns the embeddings used for questions, called on first use so
+                that the document database is only created when needed
+            threshold: Minimum cosine similarity for a hit
+            ttl: Seconds an answer stays valid
+            max_entries: Maximum answers kept per collection
+        """
+        self._embeddings_factory = embeddings
+        self._embeddings: Optional[Embeddings] = None
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # collection -> (normalized question vectors, answers), rows aligned
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._answers: Dict[str, List[CachedAnswer]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def embeddings(self) -> Embeddings:
+        if self._embeddings is None:
+            self._embeddings = self._embeddings_factory()
+        return self._embeddings
+
+    def embed(self, question: str) -> np.ndarray:
+        """Embed a question as a unit vector."""
+        return self._normalize(self.embeddings.embed_query(question))
+
+    async def aembed(self, question: str) -> np.ndarray:
+        """Async version of embed."""
+        return self._normalize(await self.embeddings.aembed_query(question))
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _expire(self, collection: str, now: float):
+        answers = self._answers.get(collection, [])
+        fresh = [i for i, entry in enumerate(answers) if now - entry.created_at < self.ttl]
+        if len(fresh) != len(answers):
+            self._answers[collection] = [answers[i] for i in fresh]
+            self._vectors[collection] = self._vectors[collection][fresh]
+
+    def lookup(self, collection: str, vector: np.ndarray) -> Optional[str]:
+        """
+        Find the cached answer to the most similar question.
+
+        Args:
+            collection: The collection the question is about
+            vector: The normalized question embedding
+
+        Returns:
+            The cached answer, or None below the similarity threshold
+        """
+        with self._lock:
+            self._expire(collection, time.time())
+            vectors = self._vectors.get(collection)
+            answer = None
+            if vectors is not None and len(vectors):
+                similarities = vectors @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    answer = self._answers[collection][best].answer
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        metrics.increment("cache_lookups_total", cache="answer", result="miss" if answer is None else "hit")
+        return answer
+
+    def store(self, collection: str, question: str, vector: np.ndarray, answer: str):
+        """
+        Cache the answer to a question.
+
+        Args:
+            collection: The collection the answer is grounded in
+            question: The question text
+            vector: The normalized question embedding
+            answer: The answer text
+        """
+        with self._lock:
+            answers = self._answers.setdefault(collection, [])
+            vectors = self._vectors.get(collection)
+            answers.append(CachedAnswer(question, answer, time.time()))
+            row = vector.reshape(1, -1)
+            vectors = row if vectors is None or not len(vectors) else np.vstack([vectors, row])
+            if len(answers) > self.max_entries:
+                del answers[0]
+                vectors = vectors[1:]
+            self._vectors[collection] = vectors
+
+    def invalidate(self, collection: Optional[str] = None):
+        """
+        Drop the cached answers of a collection, or of every collection.
+
+        Args:
+            collection: The collection that changed, None for all
+        """
+        with self._lock:
+            if collection is None:
+                self._vectors.clear()
+                self._answers.clear()
+            else:
+                self._vectors.pop(collection, None)
+                self._answers.pop(collection, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: hits, misses, hit_rate and the number of cached answers
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": sum(len(answers) for answers in self._answers.values()),
+            }
@@ -0,0 +1,625 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.types import TASKS
+
+# Checkpointer selection: "memory" (bounded, in-process), "sqlite" (persistent, shareable) or "none"
+CHECKPOINTER = os.getenv("CHECKPOINTER", "memory")
+CHECKPOINT_MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "1000"))
+CHECKPOINT_IDLE_TTL = float(os.getenv("CHECKPOINT_IDLE_TTL", "3600"))
+# Checkpoints kept per conversation; older ones are only needed for time travel. 0 keeps all.
+CHECKPOINT_KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", "20"))
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "data/checkpoints.sqlite")
+# Persisted conversations outlive restarts, so they are kept much longer than in-memory ones
+CHECKPOINT_DB_IDLE_TTL = float(os.getenv("CHECKPOINT_DB_IDLE_TTL", str(7 * 24 * 3600)))
+CHECKPOINT_FLUSH_INTERVAL = float(os.getenv("CHECKPOINT_FLUSH_INTERVAL", "0.05"))
+CHECKPOINT_BATCH_SIZE = int(os.getenv("CHECKPOINT_BATCH_SIZE", "64"))
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    An in-memory checkpointer that keeps at most max_threads conversations.
+
+    The least recently used thread is evicted once the limit is exceeded, threads idle
+    for longer than idle_ttl seconds are dropped, and each thread keeps only its last
+    keep_last checkpoints, so memory stays flat in a long-running process no matter how
+    many conversations it has served or how long they get.
+    """
+
+    def __init__(self, max_threads: int = CHECKPOINT_MAX_THREADS, idle_ttl: Optional[float] = CHECKPOINT_IDLE_TTL,
+                 keep_last: int = CHECKPOINT_KEEP_LAST, **kwargs):
+        """
+        Initialize the saver.
+
+        Args:
+            max_threads: Maximum number of conversation threads kept
+            idle_ttl: Seconds after its last use that a thread is dropped, None to keep idle threads
+            keep_last: Checkpoints kept per thread and namespace, 0 to keep all
+        """
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.idle_ttl = idle_ttl
+        # The parent checkpoint holds the pending sends of the latest one, so keep at least two
+        self.keep_last = max(keep_last, 2) if keep_last else 0
+        self._lock = threading.RLock()
+        # thread ID -> last access time, least recently used first
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        # thread ID -> keys of its entries in self.writes and self.blobs
+        self._write_keys: Dict[str, Set[Tuple]] = {}
+        self._blob_keys: Dict[str, Set[Tuple]] = {}
+        # thread ID -> namespace -> checkpoint ID -> keys of the blobs it references, oldest first
+        self._checkpoint_blobs: Dict[str, Dict[str, "OrderedDict[str, Set[Tuple]]"]] = {}
+        self.evictions = 0
+
+    def _touch(self, thread_id: str):
+        self._last_access[thread_id] = time.monotonic()
+        self._last_access.move_to_end(thread_id)
+
+    def _evict(self):
+        """Drop idle threads, then the least recently used ones beyond max_threads."""
+        if self.idle_ttl is not None:
+            cutoff = time.monotonic() - self.idle_ttl
+            while self._last_access:
+                thread_id, last_access = next(iter(self._last_access.items()))
+                if last_access >= cutoff:
+                    break
+                self.delete_thread(thread_id)
+        while len(self._last_access) > self.max_threads:
+            self.delete_thread(next(iter(self._last_access)))
+
+    def _prune(self, thread_id: str, checkpoint_ns: str):
+        """Drop the checkpoints of a thread beyond keep_last, with their writes and unshared blobs."""
+        history = self._checkpoint_blobs.get(thread_id, {}).get(checkpoint_ns)
+        if not self.keep_last or history is None or len(history) <= self.keep_last:
+            return
+        dropped = set()
+        while len(history) > self.keep_last:
+            checkpoint_id, blob_keys = history.popitem(last=False)
+            self.storage[thread_id][checkpoint_ns].pop(checkpoint_id, None)
+            write_key = (thread_id, checkpoint_ns, checkpoint_id)
+            self.writes.pop(write_key, None)
+            self._write_keys.get(thread_id, set()).discard(write_key)
+            dropped |= blob_keys
+        # Channels that did not change since are still referenced by the kept checkpoints
+        for key in dropped.difference(*history.values()):
+            self.blobs.pop(key, None)
+            self._blob_keys.get(thread_id, set()).discard(key)
+
+    def delete_thread(self, thread_id: str):
+        """
+        Remove every checkpoint and write of a thread.
+
+        Args:
+            thread_id: The thread to remove
+        """
+        with self._lock:
+            self.storage.pop(thread_id, None)
+            self._checkpoint_blobs.pop(thread_id, None)
+            for key in self._write_keys.pop(thread_id, ()):
+                self.writes.pop(key, None)
+            for key in self._blob_keys.pop(thread_id, ()):
+                self.blobs.pop(key, None)
+            if self._last_access.pop(thread_id, None) is not None:
+                self.evictions += 1
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._evict()
+            if thread_id not in self.storage:
+                # Avoid creating an empty entry through the defaultdict
+                return None
+            self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], **kwargs) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            if config and config["configurable"]["thread_id"] not in self.storage:
+                return iter(())
+            return iter(list(super().list(config, **kwargs)))
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self._blob_keys.setdefault(thread_id, set()).update(
+                (thread_id, checkpoint_ns, channel, version) for channel, version in new_versions.items()
+            )
+            self._checkpoint_blobs.setdefault(thread_id, {}).setdefault(checkpoint_ns, OrderedDict())[
+                checkpoint["id"]
+            ] = {
+                (thread_id, checkpoint_ns, channel, version)
+                for channel, version in checkpoint["channel_versions"].items()
+            }
+            self._prune(thread_id, checkpoint_ns)
+            self._touch(thread_id)
+            self._evict()
+            return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            self._write_keys.setdefault(thread_id, set()).add(
+                (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+            )
+            self._touch(thread_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of threads held and threads evicted so far."""
+        with self._lock:
+            return {"threads": len(self._last_access), "evictions": self.evictions}
+
+
+class SQLiteSaver(BaseCheckpointSaver[int]):
+    """
+    A checkpointer storing conversations in a SQLite file.
+
+    The database runs in WAL mode, so several worker processes can share one file and
+    readers never block the writer. Writes are batched: they are queued in memory and
+    committed together every flush_interval seconds or once batch_size statements are
+    waiting. Reads flush the queue first, so a conversation always sees its own writes;
+    a crash can lose at most the last flush_interval of writes.
+
+    Like BoundedMemorySaver, each thread keeps only its last keep_last checkpoints, and
+    threads not written to for idle_ttl seconds are deleted by the background flusher.
+    """
+
+    def __init__(
+        self,
+        path: str = CHECKPOINT_DB_PATH,
+        flush_interval: float = CHECKPOINT_FLUSH_INTERVAL,
+        batch_size: int = CHECKPOINT_BATCH_SIZE,
+        keep_last: int = CHECKPOINT_KEEP_LAST,
+        idle_ttl: Optional[float] = CHECKPOINT_DB_IDLE_TTL,
+        **kwargs,
+    ):
+        """
+        Open (and create if needed) the checkpoint database.
+
+        Args:
+            path: Path of the SQLite file
+            flush_interval: Seconds between background commits of queued writes
+            batch_size: Queued statements that trigger an immediate commit
+            keep_last: Checkpoints kept per thread and namespace, 0 to keep all
+            idle_ttl: Seconds after its last write that a thread is deleted, None to keep idle threads
+        """
+        super().__init__(**kwargs)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # The parent checkpoint holds the pending sends of the latest one, so keep at least two
+        self.keep_last = max(keep_last, 2) if keep_last else 0
+        self.idle_ttl = idle_ttl
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, Tuple]] = []
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                type TEXT,
+                checkpoint BLOB,
+                metadata_type TEXT,
+                metadata BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                task_path TEXT NOT NULL DEFAULT '',
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                type TEXT,
+                value BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_id TEXT PRIMARY KEY,
+                last_write REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS threads_last_write ON threads (last_write);
+            """
+        )
+        self._pruned_at = 0.0
+        self.prune_idle()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="checkpoint-flusher", daemon=True)
+        self._flusher.start()
+
+    def _queue(self, statements: List[Tuple[str, Tuple]]):
+        with self._lock:
+            self._pending.extend(statements)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self._conn.execute("BEGIN")
+        try:
+            for sql, params in pending:
+                self._conn.execute(sql, params)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def flush(self):
+        """Commit all queued writes."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                # Idle threads only need to be found about as often as they can expire
+                if self.idle_ttl is not None and time.monotonic() - self._pruned_at >= min(self.idle_ttl, 60):
+                    self.prune_idle()
+            except Exception as e:
+                print(f"Checkpoint flush failed: {str(e)}")
+
+    def prune_idle(self) -> int:
+        """
+        Delete the threads not written to for idle_ttl seconds.
+
+        Returns:
+            The number of threads deleted
+        """
+        self._pruned_at = time.monotonic()
+        if self.idle_ttl is None:
+            return 0
+        cutoff = time.time() - self.idle_ttl
+        idle = "SELECT thread_id FROM threads WHERE last_write < ?"
+        with self._lock:
+            self._flush_locked()
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(f"DELETE FROM checkpoints WHERE thread_id IN ({idle})", (cutoff,))
+                self._conn.execute(f"DELETE FROM writes WHERE thread_id IN ({idle})", (cutoff,))
+                deleted = self._conn.execute("DELETE FROM threads WHERE last_write < ?", (cutoff,)).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return deleted
+
+    def close(self):
+        """Flush queued writes and close the database."""
+        self._stop.set()
+        self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+    def _query(self, sql: str, params: Tuple) -> List[Tuple]:
+        """Run a read after committing queued writes, so callers see their own writes."""
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute(sql, params).fetchall()
+
+    def _to_tuple(self, row: Tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+        writes = self._query(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        )
+        sends = []
+        if parent_checkpoint_id:
+            sends = self._query(
+                "SELECT type, value FROM writes "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? AND channel = ? "
+                "ORDER BY task_path, task_id, idx",
+                (thread_id, checkpoint_ns, parent_checkpoint_id, TASKS),
+            )
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **self.serde.loads_typed((type_, checkpoint)),
+                "pending_sends": [self.serde.loads_typed(send) for send in sends],
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        Get the checkpoint named in config, or the latest one of its thread.
+
+        Args:
+            config: The config to use for retrieving the checkpoint
+
+        Returns:
+            The checkpoint tuple, or None if there is none
+        """
+        return next(self.list(config, limit=1), None)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """
+        List checkpoints, newest first.
+
+        Args:
+            config: Restricts the listing to a thread, namespace or checkpoint
+            filter: Metadata key/values the checkpoints must match
+            before: Only list checkpoints created before this one
+            limit: Maximum number of checkpoints to return
+
+        Yields:
+            The matching checkpoint tuples
+        """
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # Metadata filters are applied after deserializing, so the SQL limit only applies without them
+        sql_limit = f" LIMIT {int(limit)}" if limit is not None and not filter else ""
+        rows = self._query(
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+            f"metadata_type, metadata FROM checkpoints {where} ORDER BY checkpoint_id DESC{sql_limit}",
+            tuple(params),
+        )
+        returned = 0
+        for row in rows:
+            if limit is not None and returned >= limit:
+                break
+            if filter:
+                metadata = self.serde.loads_typed((row[6], row[7]))
+                if not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+            returned += 1
+            yield self._to_tuple(row)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """
+        Queue a checkpoint for writing.
+
+        Args:
+            config: The config of the parent checkpoint
+            checkpoint: The checkpoint to save
+            metadata: Metadata saved with the checkpoint
+            new_versions: Channel versions updated by this checkpoint
+
+        Returns:
+            The config of the saved checkpoint
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint = {key: value for key, value in checkpoint.items() if key != "pending_sends"}
+        type_, serialized = self.serde.dumps_typed(checkpoint)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        statements = [
+            (
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    serialized,
+                    metadata_type,
+                    serialized_metadata,
+                ),
+            ),
+            ("INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, time.time())),
+        ]
+        if self.keep_last:
+            # Checkpoint IDs sort by creation time; drop all but the newest keep_last and their writes
+            kept = (
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT ?"
+            )
+            params = (thread_id, checkpoint_ns, thread_id, checkpoint_ns, self.keep_last)
+            statements += [
+                (
+                    f"DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ({kept})",
+                    params,
+                ),
+                (
+                    f"DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ({kept})",
+                    params,
+                ),
+            ]
+        self._queue(statements)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """
+        Queue the intermediate writes of a task.
+
+        Args:
+            config: The config of the checkpoint the writes belong to
+            writes: (channel, value) pairs
+            task_id: The task that produced the writes
+            task_path: The path of that task
+        """
+        # Special channels (errors, interrupts) overwrite; regular writes keep the first value
+        verb = "INSERT OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "INSERT OR IGNORE"
+        statements = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, serialized = self.serde.dumps_typed(value)
+            statements.append((
+                f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    config["configurable"]["thread_id"],
+                    config["configurable"].get("checkpoint_ns", ""),
+                    config["configurable"]["checkpoint_id"],
+                    task_id,
+                    task_path,
+                    WRITES_IDX_MAP.get(channel, idx),
+                    channel,
+                    type_,
+                    serialized,
+                ),
+            ))
+        self._queue(statements)
+
+    def delete_thread(self, thread_id: str):
+        """
+        Remove every checkpoint and write of a thread.
+
+        Args:
+            thread_id: The thread to remove
+        """
+        self._queue([
+            ("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)),
+            ("DELETE FROM writes WHERE thread_id = ?", (thread_id,)),
+            ("DELETE FROM threads WHERE thread_id = ?", (thread_id,)),
+        ])
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoints = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint in checkpoints:
+            yield checkpoint
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        # Only queues the write, so it is cheap enough to run on the event loop
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+
+def create_checkpointer(kind: Optional[str] = None) -> Optional[BaseCheckpointSaver]:
+    """
+    Create the checkpointer selected by kind or the CHECKPOINTER environment variable.
+
+    Args:
+        kind: "memory", "sqlite" or "none"
+
+    Returns:
+        The checkpointer, or None for "none"
+    """
+    kind = (kind or CHECKPOINTER).lower()
+    if kind == "memory":
+        return BoundedMemorySaver()
+    if kind == "sqlite":
+        return SQLiteSaver()
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown checkpointer: {kind}")
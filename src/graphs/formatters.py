@@ -0,0 +1,128 @@
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from langchain_core.messages import ToolMessage
+
+# Tools whose results are rendered by a template instead of a second LLM call (comma separated, empty disables).
+# weather_tool has a template but is not on by default: weather questions often ask for advice
+# ("Do I need an umbrella?") that a plain report of the conditions does not answer.
+FAST_PATH_TOOLS = os.getenv("FAST_PATH_TOOLS", "list_collections,create_document_collection,collection_stats")
+
+
+def format_weather(result: Dict[str, Any]) -> Optional[str]:
+    """Render a weather_tool result, or None when it is an error."""
+    if "error" in result:
+        return None
+    return (
+        f"Current weather in {result['location']}, {result['country']}: {result['weather']}, "
+        f"{result['temperature']}°C (feels like {result['feels_like']}°C), "
+        f"humidity {result['humidity']}%, wind {result['wind_speed']} m/s."
+    )
+
+
+def format_collections(result: Dict[str, Any]) -> Optional[str]:
+    """Render a list_collections result, or None when it is an error."""
+    if result.get("status") != "success":
+        return None
+    collections = result.get("collections") or []
+    if not collections:
+        return "There are no document collections yet. Upload a PDF to create one."
+    return "Available document collections: " + ", ".join(collections) + "."
+
+
+def format_collection_created(result: Dict[str, Any]) -> Optional[str]:
+    """Render a create_document_collection result, or None when it is an error."""
+    if result.get("status") != "success" or not result.get("message"):
+        return None
+    return result["message"]
+
+
+def format_collection_stats(result: Dict[str, Any]) -> Optional[str]:
+    """Render a collection_stats result, or None when it is an error."""
+    if result.get("status") != "success":
+        return None
+    text = (
+        f"Collection {result['collection']} holds {result['points_count']} chunks "
+        f"({result['vector_size']}-dimensional vectors, index {result['index_status']}, "
+        f"{result['segments_count']} segments)."
+    )
+    sources = result.get("sources")
+    if sources:
+        text += " Sources: " + ", ".join(f"{s['source']} ({s['chunks']} chunks)" for s in sources) + "."
+    return text
+
+
+FORMATTERS: Dict[str, Callable[[Dict[str, Any]], Optional[str]]] = {
+    "weather_tool": format_weather,
+    "list_collections": format_collections,
+    "create_document_collection": format_collection_created,
+    "collection_stats": format_collection_stats,
+}
+
+
+class ToolResultFormatter:
+    """
+    Renders structured tool results with deterministic templates.
+
+    When every result of a tool step can be rendered, the agent answers with the rendered
+    text and skips the generate LLM call. Anything else (an unknown tool, an error result or
+    unparseable output) returns None so that generate phrases the answer as before.
+    """
+
+    def __init__(
+        self,
+        tools: Optional[Iterable[str]] = None,
+        formatters: Optional[Dict[str, Callable[[Dict[str, Any]], Optional[str]]]] = None,
+    ):
+        """
+        Initialize the formatter.
+
+        Args:
+            tools: Names of the tools to render directly, defaults to FAST_PATH_TOOLS
+            formatters: Formatters by tool name, defaults to FORMATTERS
+        """
+        if tools is None:
+            tools = [name.strip() for name in FAST_PATH_TOOLS.split(",") if name.strip()]
+        available = FORMATTERS if formatters is None else formatters
+        self.formatters = {name: available[name] for name in tools if name in available}
+
+    def register(self, tool_name: str, formatter: Callable[[Dict[str, Any]], Optional[str]]):
+        """
+        Render a tool's results with a formatter.
+
+        Args:
+            tool_name: The tool name
+            formatter: Maps the tool's result dict to text, or None to fall back to the LLM
+        """
+        self.formatters[tool_name] = formatter
+
+    def _format_one(self, message: ToolMessage) -> Optional[str]:
+        formatter = self.formatters.get(message.name)
+        if formatter is None or message.status == "error":
+            return None
+        try:
+            result = json.loads(message.content) if isinstance(message.content, str) else message.content
+            return formatter(result) if isinstance(result, dict) else None
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def format(self, tool_messages: List[ToolMessage]) -> Optional[str]:
+        """
+        Render the results of a tool step.
+
+        Args:
+            tool_messages: The ToolMessages of the step
+
+        Returns:
+            The answer text, or None unless every result could be rendered
+        """
+        if not tool_messages:
+            return None
+        rendered = []
+        for message in tool_messages:
+            text = self._format_one(message)
+            if text is None:
+                return None
+            rendered.append(text)
+        return "\n".join(rendered)
@@ -0,0 +1,184 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import MessagesState
+
+# Turns kept verbatim, turns that trigger summarization, and the prompt budget for the history
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "4"))
+HISTORY_MAX_TURNS = int(os.getenv("HISTORY_MAX_TURNS", "8"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "4000"))
+
+SUMMARY_PROMPT = (
+    "Extend the running summary of a conversation between a user and an assistant with the "
+    "new messages below. Keep facts, names, places and open questions the assistant may need "
+    "later; drop pleasantries. Reply with the updated summary only.\n\n"
+    "Current summary:\n{summary}\n\nNew messages:\n{messages}"
+)
+
+
+class AgentState(MessagesState):
+    """Message state plus the rolling summary of turns no longer kept verbatim."""
+    summary: str
+
+
+class HistoryManager:
+    """
+    Keeps the prompt sent to the LLM bounded as a conversation grows.
+
+    Tool calls and their results from completed turns are dropped, since generate has
+    already turned them into an answer. Once the conversation exceeds max_turns turns or
+    token_budget tokens, all but the last keep_turns turns are folded into a rolling summary.
+    Only the newly folded turns are sent to the summarizer, so the cost of summarizing does
+    not grow with the length of the conversation.
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        keep_turns: int = HISTORY_KEEP_TURNS,
+        max_turns: int = HISTORY_MAX_TURNS,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+    ):
+        """
+        Initialize the history manager.
+
+        Args:
+            llm: The model used to write summaries
+            keep_turns: Number of most recent turns kept verbatim after summarizing
+            max_turns: Number of turns that triggers summarization
+            token_budget: Approximate token count of the history that triggers summarization
+        """
+        self.llm = llm
+        self.keep_turns = max(keep_turns, 1)
+        self.max_turns = max(max_turns, self.keep_turns)
+        self.token_budget = token_budget
+
+    @staticmethod
+    def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+        """
+        Split messages into turns, each starting at a human message.
+
+        Args:
+            messages: The conversation messages
+
+        Returns:
+            The list of turns
+        """
+        turns: List[List[BaseMessage]] = []
+        for message in messages:
+            if isinstance(message, HumanMessage) or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+    @staticmethod
+    def _is_tool_exchange(message: BaseMessage) -> bool:
+        return message.type == "tool" or (message.type == "ai" and bool(getattr(message, "tool_calls", None)))
+
+    def plan(self, messages: List[BaseMessage]) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+        """
+        Decide which messages to fold into the summary and which to remove.
+
+        Args:
+            messages: The conversation messages
+
+        Returns:
+            (messages to summarize, messages to remove from the state)
+        """
+        turns = self.split_turns(messages)
+        remove: List[BaseMessage] = []
+        kept_turns: List[List[BaseMessage]] = []
+        for index, turn in enumerate(turns):
+            if index == len(turns) - 1:
+                kept_turns.append(turn)
+                continue
+            remove.extend(message for message in turn if self._is_tool_exchange(message))
+            kept_turns.append([message for message in turn if not self._is_tool_exchange(message)])
+
+        fold_count = 0
+        if len(kept_turns) > self.max_turns or self._tokens(kept_turns) > self.token_budget:
+            fold_count = len(kept_turns) - self.keep_turns
+            # Fold further while the remaining history is still over budget, but keep the current turn
+            while fold_count < len(kept_turns) - 1 and self._tokens(kept_turns[fold_count:]) > self.token_budget:
+                fold_count += 1
+        folded = [message for turn in kept_turns[:max(fold_count, 0)] for message in turn]
+        return folded, remove + folded
+
+    @staticmethod
+    def _tokens(turns: List[List[BaseMessage]]) -> int:
+        return count_tokens_approximately([message for turn in turns for message in turn])
+
+    @staticmethod
+    def _summary_request(summary: str, messages: List[BaseMessage]) -> List[BaseMessage]:
+        transcript = "\n".join(f"{message.type}: {message.text()}" for message in messages)
+        return [HumanMessage(SUMMARY_PROMPT.format(summary=summary or "(empty)", messages=transcript))]
+
+    @staticmethod
+    def _update(summary: Optional[str], remove: List[BaseMessage]) -> Dict[str, Any]:
+        update: Dict[str, Any] = {"messages": [RemoveMessage(id=message.id) for message in remove]}
+        if summary is not None:
+            update["summary"] = summary
+        return update
+
+    def update(self, state: AgentState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        """
+        Compute the state update that trims the history.
+
+        Args:
+            state: The current agent state
+            config: The run config, forwarded to the summarizer
+
+        Returns:
+            Messages to remove and, when turns were folded, the new summary
+        """
+        folded, remove = self.plan(state["messages"])
+        summary = None
+        if folded:
+            summary = self.llm.invoke(self._summary_request(state.get("summary", ""), folded), config).text()
+        return self._update(summary, remove)
+
+    async def aupdate(self, state: AgentState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        """
+        Async version of update.
+
+        Args:
+            state: The current agent state
+            config: The run config, forwarded to the summarizer
+
+        Returns:
+            Messages to remove and, when turns were folded, the new summary
+        """
+        folded, remove = self.plan(state["messages"])
+        summary = None
+        if folded:
+            response = await self.llm.ainvoke(self._summary_request(state.get("summary", ""), folded), config)
+            summary = response.text()
+        return self._update(summary, remove)
+
+    @staticmethod
+    def with_summary(state: AgentState, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """
+        Prepend the rolling summary, if any, to a prompt.
+
+        Args:
+            state: The current agent state
+            messages: The prompt messages
+
+        Returns:
+            The prompt with the summary as a leading system message
+        """
+        summary = state.get("summary")
+        if not summary:
+            return messages
+        summary_content = f"Summary of the earlier conversation:\n{summary}"
+        # Anthropic accepts a single system message, so append to an existing one as a separate
+        # block after its content, keeping any cache breakpoint on the static part intact
+        if messages and messages[0].type == "system":
+            content = messages[0].content
+            blocks = [{"type": "text", "text": content}] if isinstance(content, str) else list(content)
+            return [SystemMessage(blocks + [{"type": "text", "text": summary_content}])] + messages[1:]
+        return [SystemMessage(summary_content)] + messages
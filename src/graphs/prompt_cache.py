@@ -0,0 +1,127 @@
+import logging
+import os
+import threading
+from typing import Any, Dict, List
+
+from langchain_core.messages import BaseMessage, SystemMessage
+
+from src.tools.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Anthropic prompt caching for the stable prefix of each request (tools, system prompt, older history)
+PROMPT_CACHING = os.getenv("PROMPT_CACHING", "true").lower() == "true"
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _with_cache_control(content: Any) -> List[Any]:
+    """Return content as a list of blocks whose last block carries a cache breakpoint."""
+    blocks = [{"type": "text", "text": content}] if isinstance(content, str) else list(content)
+    last = blocks[-1]
+    if isinstance(last, str):
+        last = {"type": "text", "text": last}
+    blocks[-1] = {**last, "cache_control": CACHE_CONTROL}
+    return blocks
+
+
+def system_prompt(content: str, enabled: bool = PROMPT_CACHING) -> SystemMessage:
+    """
+    Build a system message whose static content ends with a cache breakpoint.
+
+    Sections appended later, such as the conversation summary, come after the breakpoint
+    and so do not invalidate the cached instructions.
+
+    Args:
+        content: The static instructions
+        enabled: Whether to add the cache breakpoint
+
+    Returns:
+        The system message
+    """
+    return SystemMessage(_with_cache_control(content) if enabled else content)
+
+
+def mark_history(messages: List[BaseMessage], enabled: bool = PROMPT_CACHING) -> List[BaseMessage]:
+    """
+    Put a cache breakpoint on the last message before the current turn.
+
+    Everything up to and including that message is identical on the next request of the
+    conversation, so it is read from the cache instead of being processed again.
+
+    Args:
+        messages: The prompt messages, ending with the current turn
+        enabled: Whether to add the cache breakpoint
+
+    Returns:
+        The messages, with the breakpoint message copied rather than modified
+    """
+    if not enabled:
+        return messages
+    current_turn = max(
+        (index for index, message in enumerate(messages) if message.type == "human"),
+        default=len(messages),
+    )
+    for index in range(current_turn - 1, -1, -1):
+        message = messages[index]
+        # Only plain text turns can carry the marker; tool exchanges are dropped from older history anyway
+        if message.type in ("human", "ai") and message.content and not getattr(message, "tool_calls", None):
+            marked = message.model_copy(update={"content": _with_cache_control(message.content)})
+            return messages[:index] + [marked] + messages[index + 1:]
+    return messages
+
+
+class PromptCacheStats:
+    """
+    Accumulates the cache read/write token counts reported by Anthropic and logs each call at debug level.
+
+    Token counts per call are also recorded in the metrics registry, by node.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.input_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_creation_tokens = 0
+
+    def record(self, node: str, response: BaseMessage):
+        """
+        Record the token usage of a model response.
+
+        Args:
+            node: The graph node that made the call
+            response: The model response
+        """
+        usage = getattr(response, "usage_metadata", None) or {}
+        details = usage.get("input_token_details") or {}
+        cache_read = details.get("cache_read") or 0
+        cache_creation = details.get("cache_creation") or 0
+        with self._lock:
+            self.input_tokens += usage.get("input_tokens", 0)
+            self.cache_read_tokens += cache_read
+            self.cache_creation_tokens += cache_creation
+        if usage and metrics.enabled:
+            metrics.observe("llm_input_tokens", usage.get("input_tokens", 0), node=node)
+            metrics.observe("llm_output_tokens", usage.get("output_tokens", 0), node=node)
+            metrics.increment("prompt_cache_tokens_total", cache_read, node=node, kind="read")
+            metrics.increment("prompt_cache_tokens_total", cache_creation, node=node, kind="write")
+        if usage:
+            # Logged rather than printed, so that it never interleaves with streamed answer tokens
+            logger.debug(
+                "Prompt cache (%s): read %d tokens, wrote %d tokens, %d input tokens in total",
+                node, cache_read, cache_creation, usage.get("input_tokens", 0),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cumulative token counts.
+
+        Returns:
+            dict: input, cache read and cache write tokens and the share of input tokens read from the cache
+        """
+        with self._lock:
+            return {
+                "input_tokens": self.input_tokens,
+                "cache_read_tokens": self.cache_read_tokens,
+                "cache_creation_tokens": self.cache_creation_tokens,
+                "hit_rate": self.cache_read_tokens / self.input_tokens if self.input_tokens else 0.0,
+            }
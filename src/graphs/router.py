@@ -0,0 +1,227 @@
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.constants import TAG_NOSTREAM
+
+from src.graphs.answer_cache import split_question
+from src.graphs.tool_registry import ToolRegistry
+from src.tools.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Per-node models; unset nodes use the agent's model. The router is opt-in: it only runs when ROUTER_MODEL is set.
+ROUTER_MODEL = os.getenv("ROUTER_MODEL", "")
+GENERATION_MODEL = os.getenv("GENERATION_MODEL")
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL")
+
+# Minimum classifier confidence for letting the router model pick the tools
+ROUTER_CONFIDENCE = float(os.getenv("ROUTER_CONFIDENCE", "0.75"))
+
+# Label for questions answered without a tool
+NO_TOOL = "none"
+
+# Keyword patterns per route; each matching pattern adds one point to its route
+ROUTE_PATTERNS: Dict[str, Sequence[str]] = {
+    "weather_tool": (
+        r"\bweather\b", r"\btemperature", r"\bforecast", r"\brain(ing|y)?\b", r"\bsnow(ing)?\b",
+        r"\b(sunny|umbrella)\b", r"\bwind(y)?\b", r"\bhumid(ity)?\b", r"\bdegrees\b", r"\b(hot|cold|warm)\b",
+    ),
+    "list_collections": (
+        r"\b(list|show|which|what)\b.*\bcollections\b",
+        r"\bavailable\b.*\b(collections|documents)\b", r"\b(collections|documents)\b.*\bavailable\b",
+        r"\bcollections\b.*\b(are there|do (i|you|we) have|exist)\b",
+    ),
+    "collection_stats": (
+        r"\bhow (many|big|large)\b.*\b(chunks|points|vectors|pages|files|collection)\b",
+        r"\b(stats|statistics|size|details)\b.*\bcollection\b", r"\bcollection\b.*\b(stats|statistics|size|details)\b",
+        r"\b(chunks|vectors|segments|statistics|stats)\b",
+    ),
+    "create_document_collection": (
+        r"\b(create|make|build|new)\b.*\bcollection\b", r"\b(ingest|index|upload|load)\b",
+        r"\.pdf\b",
+    ),
+    "document_query": (
+        # File names such as report.pdf point to ingestion rather than a question about a document
+        r"(?<![.\w])(document|pdf|report|paper|manual|file)s?\b(?!\.\w)",
+        r"\baccording to\b", r"\b(summari[sz]e|summary)\b", r"\b(page|section|chapter)\b",
+    ),
+    NO_TOOL: (
+        r"^\s*(hi|hello|hey|thanks|thank you|good (morning|afternoon|evening))\b",
+        r"\bwho are you\b", r"\bwhat can you do\b",
+    ),
+}
+
+
+class RouteDecision(NamedTuple):
+    """The predicted route of a question and the classifier's confidence in it."""
+    route: Optional[str]
+    confidence: float
+
+
+class KeywordClassifier:
+    """
+    Predicts which tool a question needs from keyword patterns, without any model call.
+
+    The confidence is the share of matched patterns that belong to the best route, so a
+    question that matches no pattern or several routes equally gets a low confidence.
+    """
+
+    def __init__(self, patterns: Optional[Dict[str, Sequence[str]]] = None):
+        """
+        Initialize the classifier.
+
+        Args:
+            patterns: Regular expressions by route, defaults to ROUTE_PATTERNS
+        """
+        self.patterns = {
+            route: [re.compile(pattern, re.IGNORECASE) for pattern in route_patterns]
+            for route, route_patterns in (patterns or ROUTE_PATTERNS).items()
+        }
+
+    def classify(self, text: str) -> RouteDecision:
+        """
+        Predict the route of a question.
+
+        The "[Collection: name]" tag the UI appends to every prompt is not part of the
+        question, so it does not count towards any route.
+
+        Args:
+            text: The question
+
+        Returns:
+            The best route and its confidence, or (None, 0.0) when nothing matched
+        """
+        text = split_question(text)[0]
+        scores = {
+            route: sum(1 for pattern in patterns if pattern.search(text))
+            for route, patterns in self.patterns.items()
+        }
+        total = sum(scores.values())
+        if not total:
+            return RouteDecision(None, 0.0)
+        route = max(scores, key=scores.get)
+        return RouteDecision(route, scores[route] / total)
+
+
+def called_route(response: BaseMessage) -> str:
+    """Return the route a model response took: its single tool name, NO_TOOL, or a '+'-joined set."""
+    names = sorted({call["name"] for call in getattr(response, "tool_calls", None) or []})
+    return "+".join(names) if names else NO_TOOL
+
+
+class ModelRouter:
+    """
+    Runs the tool-selection step on a small model and escalates when confidence is low.
+
+    The keyword classifier first predicts the route of the current question. Below the
+    confidence threshold the question goes straight to the agent's main model. Otherwise
+    the small model picks the tools, and its response is only kept when it takes the
+    predicted route; a disagreement is treated as low confidence and escalated.
+    """
+
+    def __init__(
+        self,
+        tool_sets: ToolRegistry,
+        classifier: Optional[KeywordClassifier] = None,
+        confidence: float = ROUTER_CONFIDENCE,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            tool_sets: The tool sets bound to the small model
+            classifier: Predicts the route of a question, defaults to a KeywordClassifier
+            confidence: Minimum classifier confidence for using the small model
+        """
+        self.tool_sets = tool_sets
+        self.classifier = classifier or KeywordClassifier()
+        self.confidence = confidence
+        self._lock = threading.Lock()
+        self.routed = 0
+        self.escalated = 0
+
+    def _decide(self, question: str) -> RouteDecision:
+        decision = self.classifier.classify(question)
+        if decision.route is None or decision.confidence < self.confidence:
+            self._escalate(f"low confidence ({decision.confidence:.2f})")
+            return RouteDecision(None, decision.confidence)
+        return decision
+
+    def _accept(self, decision: RouteDecision, response: BaseMessage) -> Optional[BaseMessage]:
+        route = called_route(response)
+        if route != decision.route:
+            self._escalate(f"router model chose {route}, expected {decision.route}")
+            return None
+        with self._lock:
+            self.routed += 1
+        return response
+
+    def _router_llm(self) -> Runnable:
+        # Not streamed: a response that is escalated must not reach the user. An accepted
+        # response is still emitted, as a whole message, when the node finishes.
+        return self.tool_sets.active.llm.with_config(tags=[TAG_NOSTREAM])
+
+    def _escalate(self, reason: str):
+        with self._lock:
+            self.escalated += 1
+        if metrics.enabled:
+            metrics.increment("router_escalations_total")
+        logger.debug("Escalating tool selection to the main model: %s", reason)
+
+    def route(
+        self, question: str, messages: List[BaseMessage], config: RunnableConfig = None
+    ) -> Optional[BaseMessage]:
+        """
+        Select tools with the small model.
+
+        Args:
+            question: The current question, used by the classifier
+            messages: The prompt for the tool-selection step
+            config: The run config, forwarded to the model
+
+        Returns:
+            The small model's response, or None to escalate to the main model
+        """
+        decision = self._decide(question)
+        if decision.route is None:
+            return None
+        return self._accept(decision, self._router_llm().invoke(messages, config))
+
+    async def aroute(
+        self, question: str, messages: List[BaseMessage], config: RunnableConfig = None
+    ) -> Optional[BaseMessage]:
+        """
+        Async version of route.
+
+        Args:
+            question: The current question, used by the classifier
+            messages: The prompt for the tool-selection step
+            config: The run config, forwarded to the model
+
+        Returns:
+            The small model's response, or None to escalate to the main model
+        """
+        decision = self._decide(question)
+        if decision.route is None:
+            return None
+        return self._accept(decision, await self._router_llm().ainvoke(messages, config))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the routing counters.
+
+        Returns:
+            dict: turns routed by the small model, escalated turns and the share routed
+        """
+        with self._lock:
+            total = self.routed + self.escalated
+            return {
+                "routed": self.routed,
+                "escalated": self.escalated,
+                "routed_rate": self.routed / total if total else 0.0,
+            }
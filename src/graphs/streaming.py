@@ -0,0 +1,168 @@
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+# Nodes whose output is the answer shown to the user. Summaries written by
+# manage_history and tool results are not streamed.
+ANSWER_NODES = ("check_answer_cache", "query_or_respond", "generate", "respond_from_tools")
+
+# Nodes whose message either answers directly or calls tools. Any text before a tool call
+# ("Let me check the weather.") is a preamble, not the answer, and is only known to be one
+# once the tool call arrives, so their text is held back until the message is complete.
+TOOL_CALLING_NODES = ("query_or_respond",)
+
+
+def chunk_text(chunk: BaseMessage) -> str:
+    """
+    Extract the visible text of a streamed message chunk.
+
+    Anthropic streams content as blocks; tool_use and input_json_delta blocks carry
+    tool-call arguments and are skipped, as are chunks that only carry tool-call data.
+    Whole AI messages, such as the template answers of respond_from_tools and answers
+    from the semantic answer cache, are handled the same way.
+
+    Args:
+        chunk: A message or message chunk from the "messages" stream mode
+
+    Returns:
+        The text to display, possibly empty
+    """
+    if not isinstance(chunk, AIMessage):
+        return ""
+    if isinstance(chunk.content, str):
+        return "" if getattr(chunk, "tool_call_chunks", None) or chunk.tool_calls else chunk.content
+    return "".join(
+        block if isinstance(block, str) else block.get("text", "")
+        for block in chunk.content
+        if isinstance(block, str) or block.get("type") == "text"
+    )
+
+
+def calls_tools(chunk: BaseMessage) -> bool:
+    """Return whether a message or message chunk carries tool-call data."""
+    if not isinstance(chunk, AIMessage):
+        return False
+    if getattr(chunk, "tool_call_chunks", None) or chunk.tool_calls:
+        return True
+    return not isinstance(chunk.content, str) and any(
+        isinstance(block, dict) and block.get("type") in ("tool_use", "input_json_delta")
+        for block in chunk.content
+    )
+
+
+class AnswerFilter:
+    """
+    Turns the "messages" stream of the graph into the text of the answer.
+
+    Text of the answer nodes is passed through as it arrives, except for the
+    TOOL_CALLING_NODES, whose text is buffered per message and dropped if the message
+    turns out to call tools.
+    """
+
+    def __init__(self, nodes: Sequence[str] = ANSWER_NODES, buffered: Sequence[str] = TOOL_CALLING_NODES):
+        """
+        Initialize the filter.
+
+        Args:
+            nodes: Nodes whose LLM output is streamed
+            buffered: Nodes among them whose text is held back until their message is complete
+        """
+        self.nodes = nodes
+        self.buffered = buffered
+        self._message_id = None
+        self._parts = []
+        self._calls_tools = False
+
+    def feed(self, chunk: BaseMessage, metadata: Dict[str, Any]) -> str:
+        """
+        Process one streamed chunk.
+
+        Args:
+            chunk: A message or message chunk from the "messages" stream mode
+            metadata: The metadata streamed with it
+
+        Returns:
+            The text to display now, possibly empty
+        """
+        node = metadata.get("langgraph_node")
+        if node in self.buffered and node in self.nodes:
+            # A new message means the buffered one is complete
+            text = self.flush() if chunk.id != self._message_id else ""
+            self._message_id = chunk.id
+            self._calls_tools = self._calls_tools or calls_tools(chunk)
+            self._parts.append(chunk_text(chunk))
+            return text
+        text = self.flush()
+        return text + chunk_text(chunk) if node in self.nodes else text
+
+    def flush(self) -> str:
+        """
+        Release the buffered message.
+
+        Returns:
+            Its text, or an empty string if it called tools
+        """
+        text = "" if self._calls_tools else "".join(self._parts)
+        self._message_id = None
+        self._parts = []
+        self._calls_tools = False
+        return text
+
+
+def stream_text(
+    graph: Any,
+    inputs: Dict[str, Any],
+    config: Optional[Dict[str, Any]] = None,
+    nodes: Sequence[str] = ANSWER_NODES,
+) -> Iterator[str]:
+    """
+    Run the graph and yield the answer text token by token as it is generated.
+
+    Direct answers of the TOOL_CALLING_NODES arrive in one piece once complete, so that the
+    preamble of a tool call is never shown.
+
+    Args:
+        graph: The compiled graph
+        inputs: The graph input
+        config: The run config (thread ID)
+        nodes: Nodes whose LLM output is streamed
+
+    Yields:
+        Text fragments of the answer
+    """
+    answer = AnswerFilter(nodes)
+    for chunk, metadata in graph.stream(inputs, config=config, stream_mode="messages"):
+        text = answer.feed(chunk, metadata)
+        if text:
+            yield text
+    text = answer.flush()
+    if text:
+        yield text
+
+
+async def astream_text(
+    graph: Any,
+    inputs: Dict[str, Any],
+    config: Optional[Dict[str, Any]] = None,
+    nodes: Sequence[str] = ANSWER_NODES,
+) -> AsyncIterator[str]:
+    """
+    Async version of stream_text.
+
+    Args:
+        graph: The compiled graph
+        inputs: The graph input
+        config: The run config (thread ID)
+        nodes: Nodes whose LLM output is streamed
+
+    Yields:
+        Text fragments of the answer
+    """
+    answer = AnswerFilter(nodes)
+    async for chunk, metadata in graph.astream(inputs, config=config, stream_mode="messages"):
+        text = answer.feed(chunk, metadata)
+        if text:
+            yield text
+    text = answer.flush()
+    if text:
+        yield text
@@ -0,0 +1,211 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+
+from src.tools.metrics import metrics
+
+# Default concurrency limit and per-call timeout (seconds) for tool execution
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "8"))
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "30"))
+# Per-tool timeouts as "name=seconds,...", overriding the defaults below; 0 means no timeout
+TOOL_TIMEOUTS = os.getenv("TOOL_TIMEOUTS", "")
+
+
+def parse_timeouts(value: str) -> Dict[str, Optional[float]]:
+    """
+    Parse per-tool timeouts from a "name=seconds,..." string.
+
+    Args:
+        value: The string, e.g. "weather_tool=60,create_document_collection=0"
+
+    Returns:
+        Timeout in seconds per tool name, None for the tools set to 0 (no timeout)
+    """
+    timeouts = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, seconds = item.partition("=")
+        timeouts[name.strip()] = float(seconds) or None
+    return timeouts
+
+
+def default_timeouts() -> Dict[str, Optional[float]]:
+    """
+    Per-tool timeouts for the agent's tools.
+
+    Ingesting a PDF can take minutes and keeps running after a timeout anyway, so
+    create_document_collection has none. The weather tool gets the worst case of its HTTP
+    retries plus a margin, so a timeout never cuts off a retry that could still succeed.
+
+    Returns:
+        Timeout in seconds per tool name, None for no timeout
+    """
+    # Imported here: the HTTP clients load with the tools, not with the graph module
+    from src.tools.http_client import HTTP_RETRY_BUDGET
+
+    return {
+        "weather_tool": HTTP_RETRY_BUDGET + 5,
+        "create_document_collection": None,
+        **parse_timeouts(TOOL_TIMEOUTS),
+    }
+
+
+class ConcurrentToolNode:
+    """
+    Runs the tool calls of the latest AI message concurrently.
+
+    Sync execution uses a bounded thread pool and async execution uses asyncio.gather behind a
+    semaphore, so a turn costs roughly as much as its slowest tool call. Results are returned
+    in the order of the tool calls, and failed or timed-out calls become error ToolMessages
+    that the model can react to.
+    """
+
+    def __init__(
+        self,
+        tools: List[BaseTool],
+        max_concurrency: int = TOOL_MAX_CONCURRENCY,
+        timeout: float = TOOL_TIMEOUT,
+        timeouts: Optional[Dict[str, Optional[float]]] = None,
+    ):
+        """
+        Initialize the node.
+
+        Args:
+            tools: The tools that may be called
+            max_concurrency: Maximum number of tool calls running at the same time
+            timeout: Default timeout in seconds for a single tool call
+            timeouts: Per-tool timeouts in seconds, keyed by tool name, None for no
+                timeout; defaults to default_timeouts()
+        """
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.timeouts = default_timeouts() if timeouts is None else timeouts
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="tool")
+
+    def set_tools(self, tools: List[BaseTool]):
+        """
+        Replace the tools that may be called.
+
+        Args:
+            tools: The new tools
+        """
+        self.tools_by_name = {tool.name: tool for tool in tools}
+
+    def _timeout_for(self, name: str) -> Optional[float]:
+        return self.timeouts.get(name, self.timeout)
+
+    @staticmethod
+    def _tool_calls(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return list(getattr(state["messages"][-1], "tool_calls", None) or [])
+
+    @staticmethod
+    def _error_message(call: Dict[str, Any], error: str) -> ToolMessage:
+        return ToolMessage(
+            content=f"Error: {error}\n Please fix your mistakes.",
+            name=call["name"],
+            tool_call_id=call["id"],
+            status="error",
+        )
+
+    def _lookup(self, call: Dict[str, Any]) -> Optional[BaseTool]:
+        return self.tools_by_name.get(call["name"])
+
+    def _unknown_tool(self, call: Dict[str, Any]) -> ToolMessage:
+        available = ", ".join(self.tools_by_name)
+        return self._error_message(call, f"{call['name']} is not a valid tool, try one of [{available}].")
+
+    @staticmethod
+    def _record(call: Dict[str, Any], message: ToolMessage) -> ToolMessage:
+        """Count a finished tool call and the size of its result."""
+        if metrics.enabled:
+            metrics.increment("tool_calls_total", tool=call["name"], status=message.status)
+            metrics.observe("tool_result_bytes", len(str(message.content).encode()), tool=call["name"])
+        return message
+
+    def _run_call(self, call: Dict[str, Any], config: Optional[RunnableConfig]) -> ToolMessage:
+        """Run one tool call synchronously."""
+        tool = self._lookup(call)
+        if tool is None:
+            return self._unknown_tool(call)
+        with metrics.timer("tool_seconds", tool=call["name"]):
+            try:
+                message = tool.invoke({**call, "type": "tool_call"}, config)
+            except Exception as e:
+                message = self._error_message(call, repr(e))
+        return self._record(call, message)
+
+    async def _arun_call(self, call: Dict[str, Any], config: Optional[RunnableConfig]) -> ToolMessage:
+        """Run one tool call asynchronously."""
+        tool = self._lookup(call)
+        if tool is None:
+            return self._unknown_tool(call)
+        with metrics.timer("tool_seconds", tool=call["name"]):
+            try:
+                message = await tool.ainvoke({**call, "type": "tool_call"}, config)
+            except Exception as e:
+                message = self._error_message(call, repr(e))
+        return self._record(call, message)
+
+    def invoke(self, state: Dict[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, List[ToolMessage]]:
+        """
+        Execute the tool calls on the thread pool.
+
+        A call's timeout is counted from the start of the step, so time spent waiting for a
+        free worker counts against it. A timed-out call keeps running in the background but
+        its result is discarded.
+
+        Args:
+            state: The current message state
+            config: The run config, forwarded to the tools
+
+        Returns:
+            Updated state with one ToolMessage per tool call
+        """
+        calls = self._tool_calls(state)
+        start = time.monotonic()
+        futures = [self._executor.submit(self._run_call, call, config) for call in calls]
+        messages = []
+        for call, future in zip(calls, futures):
+            timeout = self._timeout_for(call["name"])
+            remaining = None if timeout is None else max(timeout - (time.monotonic() - start), 0)
+            try:
+                messages.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                future.cancel()
+                messages.append(self._error_message(
+                    call, f"{call['name']} timed out after {self._timeout_for(call['name'])}s"
+                ))
+        return {"messages": messages}
+
+    async def ainvoke(self, state: Dict[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, List[ToolMessage]]:
+        """
+        Execute the tool calls concurrently on the running event loop.
+
+        Tools without a native coroutine are run in the default executor by LangChain.
+
+        Args:
+            state: The current message state
+            config: The run config, forwarded to the tools
+
+        Returns:
+            Updated state with one ToolMessage per tool call
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(call):
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(self._arun_call(call, config), self._timeout_for(call["name"]))
+                except asyncio.TimeoutError:
+                    return self._error_message(
+                        call, f"{call['name']} timed out after {self._timeout_for(call['name'])}s"
+                    )
+
+        messages = await asyncio.gather(*(run(call) for call in self._tool_calls(state)))
+        return {"messages": list(messages)}
@@ -0,0 +1,105 @@
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+
+DEFAULT_TOOL_SET = "default"
+
+
+class BoundToolSet(NamedTuple):
+    """A tool set together with the LLM it was bound to."""
+    name: str
+    tools: List[BaseTool]
+    llm: Runnable
+    schemas: List[Dict[str, Any]]
+
+
+class ToolRegistry:
+    """
+    Named tool sets, each bound to the LLM once when registered.
+
+    bind_tools converts every tool signature into a provider-specific JSON schema. Doing
+    that on every turn is repeated CPU work on the hot path, so the bound runnable and its
+    serialized schemas are computed up front and reused until the set is replaced.
+    """
+
+    def __init__(self, llm: BaseChatModel):
+        """
+        Initialize an empty registry.
+
+        Args:
+            llm: The chat model the tool sets are bound to
+        """
+        self.llm = llm
+        self._tool_sets: Dict[str, BoundToolSet] = {}
+        self._active: Optional[str] = None
+
+    def register(
+        self,
+        name: str,
+        tools: List[BaseTool],
+        activate: bool = False,
+        cache_control: Optional[Dict[str, Any]] = None,
+    ) -> BoundToolSet:
+        """
+        Bind a tool set to the LLM and store it under a name, replacing any previous set.
+
+        Args:
+            name: The name of the tool set
+            tools: The tools in the set
+            activate: Whether to make this the active set
+            cache_control: Prompt cache marker put on the last tool schema, so that the
+                tool definitions are cached as a prefix of every request (Anthropic)
+
+        Returns:
+            The bound tool set
+        """
+        llm = self.llm.bind_tools(tools)
+        schemas = list(getattr(llm, "kwargs", {}).get("tools", []))
+        if cache_control and schemas:
+            schemas[-1] = {**schemas[-1], "cache_control": cache_control}
+            llm = llm.bind(tools=schemas)
+        tool_set = BoundToolSet(name=name, tools=list(tools), llm=llm, schemas=schemas)
+        self._tool_sets[name] = tool_set
+        if activate or self._active is None:
+            self._active = name
+        return tool_set
+
+    def get(self, name: Optional[str] = None) -> BoundToolSet:
+        """
+        Look up a tool set.
+
+        Args:
+            name: The name of the tool set, defaults to the active one
+
+        Returns:
+            The bound tool set
+        """
+        name = name or self._active
+        if name not in self._tool_sets:
+            raise KeyError(f"Unknown tool set: {name}")
+        return self._tool_sets[name]
+
+    def activate(self, name: str) -> BoundToolSet:
+        """
+        Make a registered tool set the active one.
+
+        Args:
+            name: The name of the tool set
+
+        Returns:
+            The newly active tool set
+        """
+        tool_set = self.get(name)
+        self._active = name
+        return tool_set
+
+    @property
+    def active(self) -> BoundToolSet:
+        """The active tool set."""
+        return self.get()
+
+    def names(self) -> List[str]:
+        """Names of the registered tool sets."""
+        return list(self._tool_sets)
@@ -1,17 +1,55 @@
-from src.tools.weather import weather_tool
-try:
-    from src.tools.document import document_query, list_collections, create_document_collection
-    # Successfully imported document tools
-    tools = [weather_tool, document_query, list_collections, create_document_collection]
-except (ImportError, ValueError) as e:
-    # Document tools not available (e.g., missing Qdrant or VoyageAI credentials)
-    print(f"Document tools not available: {str(e)}")
-    tools = [weather_tool]
+import functools
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# The document tools need Qdrant and Cohere credentials; checking the environment here avoids
+# importing document.py (and with it the Qdrant and Cohere clients) just to find out
+DOCUMENT_TOOLS_AVAILABLE = all(os.getenv(name) for name in ("QDRANT_URL", "QDRANT_API_KEY", "COHERE_API_KEY"))
 
-__all__ = ["weather_tool", "tools"]
+TOOL_NAMES = ["weather_tool", "document_query", "list_collections", "create_document_collection", "collection_stats"]
+
+__all__ = ["DOCUMENT_TOOLS_AVAILABLE", "get_tools", "tools", "weather_tool"]
 # Add these only if they're available
-try:
-    from src.tools.document import document_query, list_collections, create_document_collection
-    __all__.extend(["document_query", "list_collections", "create_document_collection"])
-except (ImportError, ValueError):
-    pass 
\ No newline at end of file
+if DOCUMENT_TOOLS_AVAILABLE:
+    __all__.extend(["document_query", "list_collections", "create_document_collection", "collection_stats"])
+
+
+@functools.lru_cache(maxsize=None)
+def get_tools():
+    """
+    Import the tool modules and return the available tools.
+
+    The modules are imported on the first call, so importing the package stays cheap.
+
+    Returns:
+    list: The weather tool, plus the document tools when their credentials are set.
+    """
+    from src.tools.weather import weather_tool
+
+    if not DOCUMENT_TOOLS_AVAILABLE:
+        # Document tools not available (e.g., missing Qdrant or Cohere credentials)
+        print("Document tools not available: Qdrant URL, API key and Cohere API key must be set")
+        return [weather_tool]
+    try:
+        from src.tools.document import document_query, list_collections, create_document_collection, collection_stats
+    except (ImportError, ValueError) as e:
+        print(f"Document tools not available: {str(e)}")
+        return [weather_tool]
+    # Successfully imported document tools
+    return [weather_tool, document_query, list_collections, create_document_collection, collection_stats]
+
+
+def __getattr__(name):
+    """Load `tools` and the individual tools on first access instead of at package import."""
+    if name == "tools":
+        return get_tools()
+    if name == "weather_tool":
+        from src.tools.weather import weather_tool
+        return weather_tool
+    if name in TOOL_NAMES and DOCUMENT_TOOLS_AVAILABLE:
+        from src.tools import document
+        return getattr(document, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,34 @@
+import asyncio
+import threading
+import weakref
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopLocal(Generic[T]):
+    """
+    Lazily creates one object per running event loop.
+
+    Async clients (httpx, AsyncQdrantClient) hold connections bound to the loop they were
+    first used on, so a single module-level instance breaks when the CLI, Streamlit or tests
+    run several loops. Instances are dropped together with their loop.
+    """
+    def __init__(self, factory: Callable[[], T]):
+        """
+        Parameters:
+        factory (callable): Creates a new instance for the current loop.
+        """
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._instances = weakref.WeakKeyDictionary()
+
+    def get(self) -> T:
+        """Return the instance for the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            instance = self._instances.get(loop)
+            if instance is None:
+                instance = self.factory()
+                self._instances[loop] = instance
+            return instance
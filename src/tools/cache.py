@@ -0,0 +1,222 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from src.tools.metrics import metrics
+
+# Metric label for each lookup outcome
+LOOKUP_RESULTS = {"hit": "hit", "stale": "stale", "wait": "coalesced", "load": "miss"}
+
+
+class TTLCache:
+    """
+    A size-bounded LRU cache whose entries expire after a TTL.
+
+    Concurrent misses for the same key are coalesced: the first caller loads the value and
+    the others wait for its result, whether they are threads or coroutines. With a non-zero
+    stale_ttl, expired entries are served for that long while a single background refresh
+    replaces them (stale-while-revalidate).
+    """
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int = 1024,
+        stale_ttl: float = 0,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+        name: Optional[str] = None,
+    ):
+        """
+        Parameters:
+        ttl (float): Seconds an entry is served as fresh.
+        max_size (int): Maximum number of entries; least recently used ones are evicted.
+        stale_ttl (float): Seconds past the TTL an entry may be served while it is refreshed.
+        0 disables stale-while-revalidate.
+        cache_if (callable, optional): Predicate deciding whether a loaded value is stored,
+        e.g. to keep error results out of the cache.
+        name (str, optional): Label under which lookups are counted in cache_lookups_total.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        self.cache_if = cache_if
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._refresh_tasks = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _lookup(self, key: Hashable):
+        """
+        Classify a lookup under the lock.
+
+        Returns:
+        tuple: (kind, payload) where kind is "hit" or "stale" with the cached value, "wait" with
+        the in-flight future to join, or "load" with a new future this caller must resolve.
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = now - entry[0]
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return "hit", entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                return "stale", entry[1]
+            del self._entries[key]
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return "wait", future
+        self.misses += 1
+        future = self._inflight[key] = Future()
+        return "load", future
+
+    def _store(self, key: Hashable, value: Any):
+        if self.cache_if is not None and not self.cache_if(value):
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _resolve(self, key: Hashable, future: Future, value: Any = None, error: BaseException = None):
+        """Store a loaded value and hand it (or the error) to the coalesced callers."""
+        if error is None:
+            self._store(key, value)
+        with self._lock:
+            self._inflight.pop(key, None)
+        if error is None:
+            future.set_result(value)
+        else:
+            future.set_exception(error)
+
+    def _claim_refresh(self, key: Hashable) -> Optional[Future]:
+        """Register a background refresh of a stale key unless one is already running."""
+        with self._lock:
+            if key in self._inflight:
+                return None
+            future = self._inflight[key] = Future()
+            return future
+
+    def _load(self, key: Hashable, loader: Callable[[], Any], future: Future) -> Any:
+        try:
+            value = loader()
+        except BaseException as e:
+            self._resolve(key, future, error=e)
+            raise
+        self._resolve(key, future, value)
+        return value
+
+    async def _aload(self, key: Hashable, loader: Callable[[], Awaitable[Any]], future: Future) -> Any:
+        try:
+            value = await loader()
+        except BaseException as e:
+            self._resolve(key, future, error=e)
+            raise
+        self._resolve(key, future, value)
+        return value
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling loader on a miss.
+
+        Parameters:
+        key (hashable): The cache key.
+        loader (callable): Computes the value; called at most once per key at a time.
+
+        Returns:
+        The cached or freshly loaded value.
+        """
+        with self._lock:
+            kind, payload = self._lookup(key)
+        if self.name:
+            metrics.increment("cache_lookups_total", cache=self.name, result=LOOKUP_RESULTS[kind])
+        if kind == "hit":
+            return payload
+        if kind == "stale":
+            refresh = self._claim_refresh(key)
+            if refresh is not None:
+                threading.Thread(target=self._refresh, args=(key, loader, refresh), daemon=True).start()
+            return payload
+        if kind == "wait":
+            return payload.result()
+        return self._load(key, loader, payload)
+
+    async def aget_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async version of get_or_load; loader is a coroutine function.
+
+        Parameters:
+        key (hashable): The cache key.
+        loader (callable): Returns an awaitable computing the value.
+
+        Returns:
+        The cached or freshly loaded value.
+        """
+        with self._lock:
+            kind, payload = self._lookup(key)
+        if self.name:
+            metrics.increment("cache_lookups_total", cache=self.name, result=LOOKUP_RESULTS[kind])
+        if kind == "hit":
+            return payload
+        if kind == "stale":
+            refresh = self._claim_refresh(key)
+            if refresh is not None:
+                task = asyncio.ensure_future(self._arefresh(key, loader, refresh))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return payload
+        if kind == "wait":
+            return await asyncio.wrap_future(payload)
+        return await self._aload(key, loader, payload)
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any], future: Future):
+        try:
+            self._load(key, loader, future)
+        except Exception as e:
+            print(f"Background refresh of {key!r} failed: {str(e)}")
+
+    async def _arefresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]], future: Future):
+        try:
+            await self._aload(key, loader, future)
+        except Exception as e:
+            print(f"Background refresh of {key!r} failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache counters.
+
+        Returns:
+        dict: hits, stale_hits, misses, coalesced (misses that joined an in-flight load),
+        evictions, hit_rate and current size.
+        """
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                "size": len(self._entries),
+            }
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.stale_hits = self.misses = self.coalesced = self.evictions = 0
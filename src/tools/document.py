@@ -1,17 +1,20 @@
+import asyncio
 import os
 import shutil
-import tempfile
-import uuid
+import threading
+import time
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 
-from langchain_core.tools import tool
-from langchain_voyageai import VoyageAIEmbeddings
-from langchain_cohere import CohereEmbeddings
-from qdrant_client import QdrantClient
-from langchain_qdrant import QdrantVectorStore
-from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.tools import StructuredTool
 from langchain_core.documents import Document
+# langchain_cohere, qdrant_client, langchain_qdrant and the PDF loader take seconds to import,
+# so they are imported where they are first used and the tool definitions stay cheap to load
+
+from src.tools.aio import LoopLocal
+from src.tools.embedding_cache import CachedEmbeddings
+from src.tools.ingestion import CONTENT_PAYLOAD_KEY, METADATA_PAYLOAD_KEY, IngestionManifest, IngestionPipeline, find_pdf_files, hash_file
+from src.tools.metrics import metrics
 
 from dotenv import load_dotenv
 
@@ -33,10 +36,55 @@ if not QDRANT_URL or not QDRANT_API_KEY:
 if not COHERE_API_KEY:
     raise ValueError("Cohere API key not found in environment variables")
 
+# How long (in seconds) a collection found to exist is trusted, and the collection listing stays fresh
+COLLECTION_CHECK_TTL = float(os.getenv("COLLECTION_CHECK_TTL", "300"))
+COLLECTIONS_CACHE_TTL = float(os.getenv("COLLECTIONS_CACHE_TTL", "30"))
+
+# Query embedding cache: in-memory LRU size and optional SQLite file for a persistent tier
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2048"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH")
+
+# Stream PDF pages through ingestion as they are parsed instead of loading the whole file first
+INGEST_STREAMING = os.getenv("INGEST_STREAMING", "true").lower() in ("1", "true", "yes")
+
+# Retrieval defaults, overridable per query: chunks returned (4 matches VectorStore.as_retriever()),
+# minimum cosine similarity, and MMR diversification over a larger candidate set
+DEFAULT_TOP_K = int(os.getenv("RETRIEVAL_K", "4"))
+RETRIEVAL_SCORE_THRESHOLD = float(os.getenv("RETRIEVAL_SCORE_THRESHOLD")) if os.getenv("RETRIEVAL_SCORE_THRESHOLD") else None
+RETRIEVAL_MMR = os.getenv("RETRIEVAL_MMR", "false").lower() in ("1", "true", "yes")
+RETRIEVAL_FETCH_K = int(os.getenv("RETRIEVAL_FETCH_K", "20"))
+RETRIEVAL_MMR_LAMBDA = float(os.getenv("RETRIEVAL_MMR_LAMBDA", "0.5"))
+# Metadata keys returned with each chunk (comma separated); empty returns all of them
+RETRIEVAL_METADATA_FIELDS = [f.strip() for f in os.getenv("RETRIEVAL_METADATA_FIELDS", "").split(",") if f.strip()] or None
+
+# Most distinct source files listed by collection_stats
+STATS_MAX_SOURCES = int(os.getenv("STATS_MAX_SOURCES", "100"))
+
+# Payload returned per chunk when browsing: the text and where it came from
+BROWSE_PAYLOAD_FIELDS = [
+    CONTENT_PAYLOAD_KEY,
+    f"{METADATA_PAYLOAD_KEY}.doc_id",
+    f"{METADATA_PAYLOAD_KEY}.source",
+    f"{METADATA_PAYLOAD_KEY}.page",
+]
+
 # Global variables to store the database and active collection
 qdrant_db = None
 active_collection = None
 
+# Callbacks run with the collection name (None for all) whenever its contents may have changed
+collection_listeners = []
+
+
+def on_collection_changed(callback):
+    """
+    Register a callback that is called when a collection is (re-)ingested or invalidated.
+
+    Parameters:
+    callback (callable): Receives the collection name, or None when every collection changed.
+    """
+    collection_listeners.append(callback)
+
 
 def get_qdrant_db():
     """Get or create the QdrantDatabase instance."""
@@ -49,9 +97,15 @@ class QdrantDatabase:
     """
     A class to manage the creation, retrieval, and querying of collections in a Qdrant vector database.
     """
-    def __init__(self):
+    def __init__(self, qdrant_client=None, embeddings=None, async_qdrant_client=None):
         """
         Initializes the QdrantDatabase object with required configurations and embeddings.
+
+        Parameters:
+        qdrant_client (QdrantClient, optional): Client to use instead of connecting to QDRANT_URL,
+        e.g. QdrantClient(":memory:") for local runs.
+        embeddings (Embeddings, optional): Embeddings to use instead of the cached Cohere embeddings.
+        async_qdrant_client (callable, optional): Creates the async client for each event loop.
         """
         self.used_documents_folder = os.path.join(os.getcwd(), 'src/used_documents')
         os.makedirs(self.used_documents_folder, exist_ok=True)
@@ -63,125 +117,578 @@ class QdrantDatabase:
         #     output_dimension=256, 
         #     truncation=True
         # )
-        self.embeddings = CohereEmbeddings(model="embed-multilingual-v3.0",
-                                           cohere_api_key=COHERE_API_KEY) 
-        self.qdrant_client = QdrantClient(
+        from qdrant_client import AsyncQdrantClient, QdrantClient
+
+        if embeddings is None:
+            from langchain_cohere import CohereEmbeddings
+
+            embeddings = CachedEmbeddings(
+                CohereEmbeddings(model="embed-multilingual-v3.0", cohere_api_key=COHERE_API_KEY),
+                model="embed-multilingual-v3.0",
+                max_size=EMBEDDING_CACHE_SIZE,
+                persist_path=EMBEDDING_CACHE_PATH,
+            )
+        self.embeddings = embeddings
+        self.qdrant_client = qdrant_client or QdrantClient(
             url=self.url,
             api_key=self.qdrant_api_key,
             prefer_grpc=True
         )
+        # Async clients are bound to the event loop they are used on, so keep one per loop
+        self.async_qdrant_client = LoopLocal(
+            async_qdrant_client
+            or (lambda: AsyncQdrantClient(url=self.url, api_key=self.qdrant_api_key, prefer_grpc=True))
+        )
+        self.ingestion = IngestionPipeline(self.qdrant_client, self.embeddings)
 
-    def create_collection(self, file_path: str, collection_name: str = None):
+        # Process-wide caches so that warm queries go straight to the vector search
+        self._cache_lock = threading.Lock()
+        self._checked_collections = {}  # collection name -> when it was last found to exist
+        self._collections_cache = None
+        self._collections_fetched_at = 0.0
+        self._collections_refreshing = False
+
+    def create_collection(self, file_path: str, collection_name: str = None, progress_callback=None,
+                          streaming: bool = None, source_name: str = None, doc_id: str = None):
         """
         Creates a Qdrant collection by loading documents from a file.
 
+        The pages are split into chunks, embedded in concurrent batches and upserted
+        batch by batch through the ingestion pipeline. Ingestion is content-addressed:
+        re-ingesting an unchanged file is a no-op. A file is only treated as a revision of an
+        earlier upload when it is ingested into an explicitly named collection under the same
+        document ID; then only the changed chunks are embedded and chunks that disappeared
+        are deleted. Without a collection name, every distinct file gets its own collection,
+        so unrelated files that share a name never replace each other.
+
         Parameters:
         file_path (str): Path to the PDF file
         collection_name (str, optional): The name of the collection to create.
+        progress_callback (callable, optional): Receives the running ingestion stats after every batch.
+        streaming (bool, optional): Parse pages lazily so that peak memory is bounded by the
+        pipeline's in-flight window rather than the size of the PDF. Defaults to INGEST_STREAMING.
+        source_name (str, optional): Original file name. Defaults to the base name of file_path.
+        doc_id (str, optional): Document ID within the collection; ingesting another file under
+        the same ID into the same collection replaces that document. Defaults to source_name.
 
         Returns:
-        tuple: (collection_name, retriever) - The name of the created collection and a retriever object
+        dict: The name of the created collection, a status message and the ingestion stats
         """
-        # If no collection name provided, create one based on filename
+        source_name = source_name or os.path.basename(file_path)
+        try:
+            file_hash = hash_file(file_path)
+        except OSError as e:
+            return {"error": f"Error loading PDF: {str(e)}"}
+
+        doc_id = doc_id or source_name
+
+        # If no collection name provided, derive one from the filename and the content hash,
+        # so that uploading the same file again is a no-op while a different file with the
+        # same name gets a new collection instead of overwriting an unrelated document
         if not collection_name:
-            file_name = os.path.basename(file_path)
-            base_name = os.path.splitext(file_name)[0]
-            collection_name = f"{base_name}_{uuid.uuid4().hex[:8]}"
+            collection_name = f"{os.path.splitext(source_name)[0]}_{file_hash[:8]}"
         
-        # Load the PDF
+        if streaming is None:
+            streaming = INGEST_STREAMING
+
+        from langchain_community.document_loaders import PyPDFLoader
+
+        # Load the PDF, either page by page or all at once
         loader = PyPDFLoader(file_path)
-        documents = []
         try:
-            documents.extend(loader.load())
+            documents = loader.lazy_load() if streaming else loader.load()
         except Exception as e:
             return {"error": f"Error loading PDF: {str(e)}"}
 
         # Create the collection
         try:
-            QdrantVectorStore.from_documents(
-                documents,
-                self.embeddings,
-                url=self.url,
-                api_key=self.qdrant_api_key,
-                collection_name=collection_name
+            stats = self.ingestion.run(
+                collection_name, documents, progress_callback, doc_id=doc_id, file_hash=file_hash
             )
+            if not stats["chunks"] and not stats["skipped_chunks"]:
+                return {"error": "No text could be extracted from the PDF."}
             
-            # Copy the file to used_documents folder
-            dest_path = os.path.join(self.used_documents_folder, os.path.basename(file_path))
-            shutil.copy2(file_path, dest_path)
+            # Copy the file to used_documents folder unless an identical copy is already there
+            dest_path = os.path.join(self.used_documents_folder, source_name)
+            if not os.path.exists(dest_path) or hash_file(dest_path) != file_hash:
+                shutil.copy2(file_path, dest_path)
             
-            # Create retriever
-            vector_store = QdrantVectorStore(
-                client=self.qdrant_client,
-                collection_name=collection_name,
-                embedding=self.embeddings
-            )
-            retriever = vector_store.as_retriever()
+            # Drop anything cached for this name; the collection was just written, so it exists
+            self.invalidate_cache(collection_name)
+            self._mark_checked(collection_name)
             
             # Set as active collection
             global active_collection
             active_collection = collection_name
             
+            if stats["unchanged"]:
+                message = f"Collection {collection_name} is already up to date with {source_name}."
+            elif stats["skipped_chunks"] or stats["deleted_chunks"]:
+                message = (
+                    f"Collection {collection_name} updated: {stats['chunks']} new chunks embedded, "
+                    f"{stats['skipped_chunks']} unchanged and {stats['deleted_chunks']} removed."
+                )
+            else:
+                message = (
+                    f"Collection {collection_name} created successfully with "
+                    f"{stats['chunks']} chunks from {stats['pages']} pages."
+                )
             return {
                 "status": "success", 
                 "collection_name": collection_name,
-                "message": f"Collection {collection_name} created successfully with {len(documents)} documents."
+                "message": message,
+                "stats": stats
             }
         except Exception as e:
             return {"error": f"Failed to create collection: {str(e)}"}
 
-    def get_collections(self) -> list:
+    def ingest_files(self, path_or_glob: str, collection_name: str, processes: int = None,
+                     manifest_path: str = None, resume: bool = True, progress_callback=None) -> Dict[str, Any]:
+        """
+        Bulk-ingests many PDFs into one collection, appending to it if it already exists.
+
+        PDFs are parsed in a process pool and share one embedding and upsert pipeline.
+        Completed files are recorded in a manifest so that an interrupted run can be resumed.
+
+        Parameters:
+        path_or_glob (str): A directory (searched recursively), a PDF file or a glob pattern.
+        collection_name (str): The collection to ingest into.
+        processes (int, optional): Number of parser processes. Defaults to the CPU count.
+        manifest_path (str, optional): Manifest file. Defaults to `<collection_name>.manifest.json`
+        in the used documents folder.
+        resume (bool): Skip files the manifest records as already ingested and unchanged.
+        progress_callback (callable, optional): Receives the running ingestion stats after every batch.
+
+        Returns:
+        dict: Status, message and the ingestion stats, or an error
+        """
+        file_paths = find_pdf_files(path_or_glob)
+        if not file_paths:
+            return {"error": f"No PDF files found for '{path_or_glob}'."}
+
+        # Documents are identified by their path relative to the ingested directory
+        if os.path.isdir(path_or_glob):
+            root = os.path.abspath(path_or_glob)
+        else:
+            root = os.path.commonpath([os.path.dirname(path) for path in file_paths])
+        doc_ids = {path: os.path.relpath(path, root) for path in file_paths}
+
+        manifest = IngestionManifest(
+            manifest_path or os.path.join(self.used_documents_folder, f"{collection_name}.manifest.json")
+        )
+        pending_files = [path for path in file_paths if not (resume and manifest.is_done(path))]
+        skipped = len(file_paths) - len(pending_files)
+        if not pending_files:
+            return {
+                "status": "success",
+                "collection_name": collection_name,
+                "message": f"All {skipped} files are already ingested into {collection_name}.",
+                "stats": {"files": 0, "skipped": skipped, "failed": [], "pages": 0, "chunks": 0}
+            }
+
+        try:
+            stats = self.ingestion.ingest_files(
+                collection_name,
+                pending_files,
+                processes=processes,
+                progress_callback=progress_callback,
+                on_file_complete=manifest.mark_done,
+                doc_ids=doc_ids
+            )
+        except Exception as e:
+            return {"error": f"Failed to ingest files: {str(e)}"}
+        finally:
+            self.invalidate_cache(collection_name)
+
+        stats["skipped"] = skipped
+        return {
+            "status": "success",
+            "collection_name": collection_name,
+            "message": (
+                f"Ingested {stats['files']} files ({stats['chunks']} chunks) into {collection_name}. "
+                f"Skipped {skipped} already ingested, {len(stats['failed'])} failed."
+            ),
+            "stats": stats
+        }
+
+    def get_collections(self, refresh: bool = False) -> list:
         """
         Retrieves the list of existing collections in the Qdrant database.
 
+        The listing is cached. Once it is older than COLLECTIONS_CACHE_TTL the cached
+        value is still returned while a background thread fetches a fresh one.
+
+        Parameters:
+        refresh (bool): Bypass the cache and fetch the listing from Qdrant.
+
         Returns:
         list: A list of collection names.
         """
-        collections = self.qdrant_client.get_collections()
-        existing_indexes = [collection.name for collection in collections.collections]
-        return existing_indexes
+        with self._cache_lock:
+            cached = self._collections_cache
+            if cached is not None and not refresh:
+                age = time.monotonic() - self._collections_fetched_at
+                if age >= COLLECTIONS_CACHE_TTL and not self._collections_refreshing:
+                    self._collections_refreshing = True
+                    threading.Thread(target=self._refresh_collections_in_background, daemon=True).start()
+                return list(cached)
+        return self._refresh_collections()
 
-    def return_retriever(self, collection_name: str):
+    def _refresh_collections(self) -> list:
+        """Fetch the collection listing from Qdrant and update the cache."""
+        try:
+            with metrics.timer("qdrant_seconds", op="get_collections"):
+                collections = self.qdrant_client.get_collections()
+            return self._store_collections([collection.name for collection in collections.collections])
+        finally:
+            with self._cache_lock:
+                self._collections_refreshing = False
+
+    def _store_collections(self, existing_indexes: list) -> list:
+        """Update the cached collection listing."""
+        with self._cache_lock:
+            self._collections_cache = existing_indexes
+            self._collections_fetched_at = time.monotonic()
+            # Forget the checks of collections that no longer exist
+            for name in list(self._checked_collections):
+                if name not in existing_indexes:
+                    del self._checked_collections[name]
+        return list(existing_indexes)
+
+    async def aget_collections(self, refresh: bool = False) -> list:
         """
-        Creates a retriever object from existing collection in the Qdrant database.
+        Asynchronously retrieves the list of existing collections, sharing the cache with get_collections.
 
         Parameters:
-        collection_name (str): The name of the collection to create retriever.
+        refresh (bool): Bypass the cache and fetch the listing from Qdrant.
 
         Returns:
-        retriever: A retriever object for querying the specified collection.
-        If the collection does not exist, returns None.
+        list: A list of collection names.
         """
+        with self._cache_lock:
+            cached = self._collections_cache
+            fresh = cached is not None and time.monotonic() - self._collections_fetched_at < COLLECTIONS_CACHE_TTL
+        if fresh and not refresh:
+            return list(cached)
+        with metrics.timer("qdrant_seconds", op="get_collections"):
+            collections = await self.async_qdrant_client.get().get_collections()
+        return self._store_collections([collection.name for collection in collections.collections])
+
+    def _refresh_collections_in_background(self):
+        """Refresh the collection listing, keeping the stale copy on failure."""
         try:
-            # Check if collection exists
-            if collection_name not in self.get_collections():
-                print(f"Collection '{collection_name}' not found in available collections.")
-                return None
-                
-            # Get the collection
-            if self.qdrant_client.get_collection(collection_name):
-                print(f"Successfully found collection '{collection_name}' in Qdrant.")
-                vector_store = QdrantVectorStore(
-                    client=self.qdrant_client,
+            self._refresh_collections()
+        except Exception as e:
+            print(f"Background refresh of collections failed: {str(e)}")
+
+    def collection_stats(self, collection_name: str = None) -> Dict[str, Any]:
+        """
+        Reports the size and state of a collection from Qdrant's metadata endpoints.
+
+        Uses the collection info, an exact count and a facet over the indexed document IDs;
+        nothing is embedded or searched.
+
+        Parameters:
+        collection_name (str, optional): The collection to describe. If None, uses active collection.
+
+        Returns:
+        Dictionary with the statistics or error information
+        """
+        collection_name = collection_name or active_collection
+        if not collection_name:
+            return {"error": "No collection specified and no active collection."}
+        available_collections = self.get_collections()
+        if collection_name not in available_collections:
+            available_collections = self.get_collections(refresh=True)
+        if collection_name not in available_collections:
+            return self._missing_collection(collection_name, available_collections)
+
+        try:
+            with metrics.timer("qdrant_seconds", op="collection_stats"):
+                info = self.qdrant_client.get_collection(collection_name)
+                count = self.qdrant_client.count(collection_name, exact=True).count
+                try:
+                    sources = self.qdrant_client.facet(
+                        collection_name, key=f"{METADATA_PAYLOAD_KEY}.doc_id", limit=STATS_MAX_SOURCES
+                    ).hits
+                except Exception:
+                    # Collections ingested without the doc_id index cannot be faceted
+                    sources = None
+            return self._format_stats(collection_name, info, count, sources)
+        except Exception as e:
+            return {"error": f"Error reading collection statistics: {str(e)}"}
+
+    async def acollection_stats(self, collection_name: str = None) -> Dict[str, Any]:
+        """
+        Asynchronously reports the size and state of a collection, see collection_stats.
+
+        Parameters:
+        collection_name (str, optional): The collection to describe. If None, uses active collection.
+
+        Returns:
+        Dictionary with the statistics or error information
+        """
+        collection_name = collection_name or active_collection
+        if not collection_name:
+            return {"error": "No collection specified and no active collection."}
+        try:
+            available_collections = await self.aget_collections()
+            if collection_name not in available_collections:
+                available_collections = await self.aget_collections(refresh=True)
+            if collection_name not in available_collections:
+                return self._missing_collection(collection_name, available_collections)
+
+            client = self.async_qdrant_client.get()
+            with metrics.timer("qdrant_seconds", op="collection_stats"):
+                info, count = await asyncio.gather(
+                    client.get_collection(collection_name),
+                    client.count(collection_name, exact=True),
+                )
+                try:
+                    sources = (await client.facet(
+                        collection_name, key=f"{METADATA_PAYLOAD_KEY}.doc_id", limit=STATS_MAX_SOURCES
+                    )).hits
+                except Exception:
+                    sources = None
+            return self._format_stats(collection_name, info, count.count, sources)
+        except Exception as e:
+            return {"error": f"Error reading collection statistics: {str(e)}"}
+
+    def browse_collection(self, collection_name: str = None, limit: int = 10, offset=None,
+                          source: str = None, page: int = None,
+                          payload_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Pages through the chunks of a collection in storage order, without a vector search.
+
+        Backed by Qdrant's scroll: each page costs one request of `limit` points, however deep
+        into the collection it is. Vectors are never fetched.
+
+        Parameters:
+        collection_name (str, optional): The collection to browse. If None, uses active collection.
+        limit (int): Chunks per page.
+        offset (optional): The next_offset of the previous page; None starts from the beginning.
+        source (str, optional): Only chunks of this source file (document ID or metadata source).
+        page (int, optional): Only chunks of this page number, 0-based as stored by PyPDFLoader.
+        payload_fields (list, optional): Payload keys to return, e.g. ["page_content",
+        "metadata.page"]. Defaults to BROWSE_PAYLOAD_FIELDS.
+
+        Returns:
+        Dictionary with the results and the next_offset (None on the last page), or error information
+        """
+        collection_name = collection_name or active_collection
+        if not collection_name:
+            return {"error": "No collection specified and no active collection."}
+        available_collections = self.get_collections()
+        if collection_name not in available_collections:
+            available_collections = self.get_collections(refresh=True)
+        if collection_name not in available_collections:
+            return self._missing_collection(collection_name, available_collections)
+
+        try:
+            with metrics.timer("qdrant_seconds", op="scroll"):
+                records, next_offset = self.qdrant_client.scroll(
                     collection_name=collection_name,
-                    embedding=self.embeddings
+                    scroll_filter=self._metadata_filter(source, page),
+                    limit=limit,
+                    offset=offset,
+                    with_payload=payload_fields or BROWSE_PAYLOAD_FIELDS,
+                    with_vectors=False,
                 )
-                retriever = vector_store.as_retriever()
-                return retriever
         except Exception as e:
-            print(f"Error creating retriever for collection '{collection_name}': {str(e)}")
+            return {"error": f"Error browsing collection: {str(e)}"}
+        return {
+            "status": "success",
+            "collection": collection_name,
+            "results": [
+                {
+                    "id": record.id,
+                    "page_content": (record.payload or {}).get(CONTENT_PAYLOAD_KEY, ""),
+                    "metadata": (record.payload or {}).get(METADATA_PAYLOAD_KEY, {}),
+                } for record in records
+            ],
+            "next_offset": next_offset,
+        }
+
+    @staticmethod
+    def _metadata_filter(source: str = None, page: int = None):
+        """
+        Build a Qdrant filter on the chunk metadata.
+
+        Parameters:
+        source (str, optional): Source file; matches the document ID set by ingestion or the
+        loader's source path, so collections from before incremental ingestion match too.
+        page (int, optional): Page number, 0-based as stored by PyPDFLoader.
+
+        Returns:
+        models.Filter, or None when there is nothing to filter on
+        """
+        from qdrant_client import models
+
+        conditions = []
+        if source:
+            conditions.append(models.Filter(should=[
+                models.FieldCondition(key=f"{METADATA_PAYLOAD_KEY}.doc_id", match=models.MatchValue(value=source)),
+                models.FieldCondition(key=f"{METADATA_PAYLOAD_KEY}.source", match=models.MatchValue(value=source)),
+            ]))
+        if page is not None:
+            conditions.append(
+                models.FieldCondition(key=f"{METADATA_PAYLOAD_KEY}.page", match=models.MatchValue(value=int(page)))
+            )
+        return models.Filter(must=conditions) if conditions else None
+
+    @staticmethod
+    def _missing_collection(collection_name: str, available_collections: list) -> Dict[str, Any]:
+        """Error result for a collection that does not exist."""
+        return {
+            "error": f"Collection '{collection_name}' not found.",
+            "available_collections": available_collections,
+            "suggestion": "Please select one of the available collections."
+        }
+
+    @staticmethod
+    def _format_stats(collection_name: str, info, count: int, sources) -> Dict[str, Any]:
+        """Format collection info, the point count and the source facet as a tool result."""
+        vectors = info.config.params.vectors
+        if isinstance(vectors, dict):
+            # Named vectors
+            vector_size = {name: params.size for name, params in vectors.items()}
+            dimensions = sum(vector_size.values())
+            vectors_on_disk = any(params.on_disk for params in vectors.values())
+        else:
+            vector_size = vectors.size
+            dimensions = vectors.size
+            vectors_on_disk = bool(vectors.on_disk)
+        return {
+            "status": "success",
+            "collection": collection_name,
+            "points_count": count,
+            "indexed_vectors_count": info.indexed_vectors_count,
+            "vector_size": vector_size,
+            "index_status": getattr(info.status, "value", str(info.status)),
+            "optimizer_status": getattr(info.optimizer_status, "value", str(info.optimizer_status)),
+            "segments_count": info.segments_count,
+            # Qdrant does not report storage size per collection; float32 vectors dominate it
+            "vectors_size_bytes": count * dimensions * 4,
+            "vectors_on_disk": vectors_on_disk,
+            "payload_on_disk": bool(info.config.params.on_disk_payload),
+            "sources": None if sources is None else [{"source": hit.value, "chunks": hit.count} for hit in sources],
+        }
+
+    def _recently_checked(self, collection_name: str) -> bool:
+        """Return whether the collection was found to exist within COLLECTION_CHECK_TTL seconds."""
+        with self._cache_lock:
+            checked_at = self._checked_collections.get(collection_name)
+            if checked_at is None:
+                return False
+            if time.monotonic() - checked_at >= COLLECTION_CHECK_TTL:
+                del self._checked_collections[collection_name]
+                return False
+            return True
+
+    def _mark_checked(self, collection_name: str):
+        """Record that the collection exists and is usable."""
+        with self._cache_lock:
+            self._checked_collections[collection_name] = time.monotonic()
+
+    def invalidate_cache(self, collection_name: str = None):
+        """
+        Invalidates the collection checks and the cached collection listing, and notifies
+        the callbacks registered with on_collection_changed.
+
+        Parameters:
+        collection_name (str, optional): Only forget the check of this collection.
+        If None, every collection is checked again on its next query.
+        """
+        with self._cache_lock:
+            if collection_name is None:
+                self._checked_collections.clear()
+            else:
+                self._checked_collections.pop(collection_name, None)
+            self._collections_cache = None
+            self._collections_fetched_at = 0.0
+        for callback in list(collection_listeners):
+            callback(collection_name)
+
+    @staticmethod
+    def _as_retriever(vector_store):
+        """Create a retriever of a vector store that searches with the retrieval defaults."""
+        if RETRIEVAL_MMR:
+            return vector_store.as_retriever(search_type="mmr", search_kwargs={
+                "k": DEFAULT_TOP_K, "fetch_k": max(RETRIEVAL_FETCH_K, DEFAULT_TOP_K), "lambda_mult": RETRIEVAL_MMR_LAMBDA
+            })
+        search_kwargs = {"k": DEFAULT_TOP_K}
+        if RETRIEVAL_SCORE_THRESHOLD is not None:
+            search_kwargs["score_threshold"] = RETRIEVAL_SCORE_THRESHOLD
+        return vector_store.as_retriever(search_kwargs=search_kwargs)
+
+    def _vector_store(self, collection_name: str):
+        """
+        Creates the vector store of an existing collection and records the collection as checked.
+
+        Parameters:
+        collection_name (str): The name of the collection.
+
+        Returns:
+        QdrantVectorStore, or None if the collection does not exist or cannot be accessed.
+        """
+        from langchain_qdrant import QdrantVectorStore
+
+        try:
+            # Check if collection exists, re-fetching once in case the cached listing is stale
+            if collection_name not in self.get_collections():
+                if collection_name not in self.get_collections(refresh=True):
+                    print(f"Collection '{collection_name}' not found in available collections.")
+                    return None
+
+            # Constructing the vector store validates the collection config against Qdrant
+            vector_store = QdrantVectorStore(
+                client=self.qdrant_client,
+                collection_name=collection_name,
+                embedding=self.embeddings
+            )
+            print(f"Successfully found collection '{collection_name}' in Qdrant.")
+            self._mark_checked(collection_name)
+            return vector_store
+        except Exception as e:
+            print(f"Error accessing collection '{collection_name}': {str(e)}")
             return None
+
+    def return_retriever(self, collection_name: str):
+        """
+        Creates a retriever object from existing collection in the Qdrant database.
+
+        Parameters:
+        collection_name (str): The name of the collection to create retriever.
+
+        Returns:
+        retriever: A retriever object for querying the specified collection, searching with
+        the retrieval defaults. If the collection does not exist, returns None.
+        """
+        vector_store = self._vector_store(collection_name)
+        return None if vector_store is None else self._as_retriever(vector_store)
     
-    def query_collection(self, query: str, collection_name: str = None) -> Dict[str, Any]:
+    def query_collection(self, query: str, collection_name: str = None, k: int = None,
+                         score_threshold: float = None, mmr: bool = None, source: str = None,
+                         page: int = None, metadata_fields: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Query a collection for relevant documents.
         
         Parameters:
         query (str): The query string
         collection_name (str, optional): The collection to query. If None, uses active collection.
+        k (int, optional): Number of chunks to return. Defaults to RETRIEVAL_K.
+        score_threshold (float, optional): Minimum cosine similarity of a returned chunk.
+        Defaults to RETRIEVAL_SCORE_THRESHOLD (none).
+        mmr (bool, optional): Diversify the chunks with maximal marginal relevance over
+        RETRIEVAL_FETCH_K candidates. Defaults to RETRIEVAL_MMR.
+        source (str, optional): Only search chunks of this source file.
+        page (int, optional): Only search chunks of this page number, 0-based as stored by
+        PyPDFLoader (the first page is 0).
+        metadata_fields (list, optional): Metadata keys to return with each chunk; others are
+        not fetched. Defaults to RETRIEVAL_METADATA_FIELDS (all).
         
         Returns:
-        Dictionary with results or error information
+        Dictionary with the results, each with its similarity score, or error information
         """
         global active_collection
         
@@ -192,65 +699,245 @@ class QdrantDatabase:
         if not collection_name:
             return {"error": "No collection specified and no active collection."}
         
-        # Check if collection exists in available collections
-        available_collections = self.get_collections()
-        if collection_name not in available_collections:
-            return {
-                "error": f"Collection '{collection_name}' not found.",
-                "available_collections": available_collections,
-                "suggestion": "Please select one of the available collections."
-            }
-        
-        # Get the retriever
-        retriever = self.return_retriever(collection_name)
-        if not retriever:
-            return {
-                "error": f"Failed to create retriever for collection '{collection_name}'.",
-                "suggestion": "The collection exists but could not be accessed. This might be due to missing embeddings or database connection issues."
-            }
+        # A collection checked recently is known to exist, so skip the lookups
+        if not self._recently_checked(collection_name):
+            # Check if collection exists in available collections
+            available_collections = self.get_collections()
+            if collection_name not in available_collections:
+                available_collections = self.get_collections(refresh=True)
+            if collection_name not in available_collections:
+                return self._missing_collection(collection_name, available_collections)
+
+            if self._vector_store(collection_name) is None:
+                return {
+                    "error": f"Failed to access collection '{collection_name}'.",
+                    "suggestion": "The collection exists but could not be accessed. This might be due to missing embeddings or database connection issues."
+                }
         
         # Query the collection
         try:
-            docs = retriever.invoke(query)
-            if not docs or len(docs) == 0:
-                return {
-                    "status": "success",
-                    "collection": collection_name,
-                    "message": "No relevant documents found for your query.",
-                    "results": []
-                }
-            
+            options = self._retrieval_options(k, score_threshold, mmr, metadata_fields)
+            vector = self.embeddings.embed_query(query)
+            with metrics.timer("qdrant_seconds", op="query_points"):
+                response = self.qdrant_client.query_points(
+                    **self._points_request(collection_name, vector, options, source, page)
+                )
+            return self._format_points(collection_name, vector, response.points, options)
+        except Exception as e:
+            return {"error": f"Error querying collection: {str(e)}"}
+
+    async def aquery_collection(self, query: str, collection_name: str = None, k: int = None,
+                                score_threshold: float = None, mmr: bool = None, source: str = None,
+                                page: int = None, metadata_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Asynchronously query a collection for relevant documents.
+
+        Uses the async embeddings and AsyncQdrantClient, so many queries can share one event loop.
+
+        Parameters:
+        query (str): The query string
+        collection_name (str, optional): The collection to query. If None, uses active collection.
+        k, score_threshold, mmr, source, page, metadata_fields: As for query_collection.
+
+        Returns:
+        Dictionary with the results, each with its similarity score, or error information
+        """
+        # If no collection specified, use the active one
+        if not collection_name:
+            collection_name = active_collection
+
+        if not collection_name:
+            return {"error": "No collection specified and no active collection."}
+
+        try:
+            # Check if collection exists in available collections
+            available_collections = await self.aget_collections()
+            if collection_name not in available_collections:
+                available_collections = await self.aget_collections(refresh=True)
+            if collection_name not in available_collections:
+                return self._missing_collection(collection_name, available_collections)
+
+            # Query the collection
+            options = self._retrieval_options(k, score_threshold, mmr, metadata_fields)
+            vector = await self.embeddings.aembed_query(query)
+            with metrics.timer("qdrant_seconds", op="query_points"):
+                response = await self.async_qdrant_client.get().query_points(
+                    **self._points_request(collection_name, vector, options, source, page)
+                )
+            return self._format_points(collection_name, vector, response.points, options)
+        except Exception as e:
+            return {"error": f"Error querying collection: {str(e)}"}
+
+    @staticmethod
+    def _retrieval_options(k: int = None, score_threshold: float = None, mmr: bool = None,
+                           metadata_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Fill in the retrieval defaults for the options a query did not set."""
+        k = max(1, int(k or DEFAULT_TOP_K))
+        return {
+            "k": k,
+            "score_threshold": RETRIEVAL_SCORE_THRESHOLD if score_threshold is None else score_threshold,
+            "mmr": RETRIEVAL_MMR if mmr is None else bool(mmr),
+            "fetch_k": max(RETRIEVAL_FETCH_K, k),
+            "metadata_fields": RETRIEVAL_METADATA_FIELDS if metadata_fields is None else metadata_fields,
+        }
+
+    def _points_request(self, collection_name: str, vector: List[float], options: Dict[str, Any],
+                        source: str = None, page: int = None) -> Dict[str, Any]:
+        """Build the query_points arguments; vectors are only fetched when MMR needs them."""
+        fields = options["metadata_fields"]
+        return {
+            "collection_name": collection_name,
+            "query": vector,
+            "query_filter": self._metadata_filter(source, page),
+            "limit": options["fetch_k"] if options["mmr"] else options["k"],
+            "score_threshold": options["score_threshold"],
+            "with_payload": True if fields is None else
+                [CONTENT_PAYLOAD_KEY] + [f"{METADATA_PAYLOAD_KEY}.{field}" for field in fields],
+            "with_vectors": options["mmr"],
+        }
+
+    @classmethod
+    def _format_points(cls, collection_name: str, vector: List[float], points: list,
+                       options: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply MMR if requested and format the scored points as a tool result."""
+        if options["mmr"] and len(points) > options["k"]:
+            import numpy as np
+            from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+            selected = maximal_marginal_relevance(
+                np.array(vector), [point.vector for point in points],
+                lambda_mult=RETRIEVAL_MMR_LAMBDA, k=options["k"],
+            )
+            points = [points[i] for i in selected]
+        else:
+            points = points[:options["k"]]
+
+        docs, scores = [], []
+        for point in points:
+            payload = point.payload or {}
+            metadata = dict(payload.get(METADATA_PAYLOAD_KEY) or {})
+            if options["metadata_fields"] is None:
+                # The same extra keys langchain_qdrant adds to retrieved documents
+                metadata.update(_id=point.id, _collection_name=collection_name)
+            docs.append(Document(page_content=payload.get(CONTENT_PAYLOAD_KEY, ""), metadata=metadata))
+            scores.append(point.score)
+        return cls._format_results(collection_name, docs, scores)
+
+    @staticmethod
+    def _format_results(collection_name: str, docs: List[Document],
+                        scores: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Format retrieved documents, and their scores if given, as a tool result."""
+        if not docs or len(docs) == 0:
             return {
                 "status": "success",
                 "collection": collection_name,
-                "results": [
-                    {
-                        "page_content": doc.page_content,
-                        "metadata": doc.metadata
-                    } for doc in docs
-                ]
+                "message": "No relevant documents found for your query.",
+                "results": []
             }
-        except Exception as e:
-            return {"error": f"Error querying collection: {str(e)}"}
 
-@tool
-def document_query(query: str, collection_name: str = None) -> Dict[str, Any]:
+        results = [
+            {
+                "page_content": doc.page_content,
+                "metadata": doc.metadata
+            } for doc in docs
+        ]
+        if scores is not None:
+            for result, score in zip(results, scores):
+                result["score"] = round(score, 4)
+        return {
+            "status": "success",
+            "collection": collection_name,
+            "results": results
+        }
+
+class DocumentQueryInput(BaseModel):
+    """Input for the document query tool."""
+    query: str = Field(..., description="The question to search the documents for")
+    collection_name: Optional[str] = Field(None, description="The collection to search, defaults to the active one")
+    k: Optional[int] = Field(None, description="Number of chunks to return, default 4")
+    score_threshold: Optional[float] = Field(None, description="Minimum similarity of a chunk, between 0 and 1")
+    mmr: Optional[bool] = Field(None, description="Diversify the chunks with maximal marginal relevance")
+    source: Optional[str] = Field(None, description="Only search in this file name")
+    page: Optional[int] = Field(None, description="Only search this page, 0-based (the first page is 0)")
+    metadata_fields: Optional[List[str]] = Field(
+        None, description='Metadata keys to return with each chunk, e.g. ["source", "page"]'
+    )
+
+def _given(**options) -> Dict[str, Any]:
+    """Drop the options a tool call left unset, so that the database defaults apply."""
+    return {name: value for name, value in options.items() if value is not None}
+
+def query_documents(query: str, collection_name: str = None, k: int = None, score_threshold: float = None,
+                    mmr: bool = None, source: str = None, page: int = None,
+                    metadata_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Tool that queries a document collection for relevant information based on the query"""
+    print("Using tool document_query")
+    db = get_qdrant_db()
+    return db.query_collection(query, collection_name, **_given(
+        k=k, score_threshold=score_threshold, mmr=mmr, source=source, page=page,
+        metadata_fields=metadata_fields
+    ))
+
+async def aquery_documents(query: str, collection_name: str = None, k: int = None, score_threshold: float = None,
+                           mmr: bool = None, source: str = None, page: int = None,
+                           metadata_fields: Optional[List[str]] = None) -> Dict[str, Any]:
     """Tool that queries a document collection for relevant information based on the query"""
     print("Using tool document_query")
     db = get_qdrant_db()
-    return db.query_collection(query, collection_name)
+    return await db.aquery_collection(query, collection_name, **_given(
+        k=k, score_threshold=score_threshold, mmr=mmr, source=source, page=page,
+        metadata_fields=metadata_fields
+    ))
 
-@tool
-def list_collections() -> Dict[str, Any]:
+def get_collection_names() -> Dict[str, Any]:
     """Tool that lists all available document collections"""
     print("Using tool list_collections")
     db = get_qdrant_db()
     collections = db.get_collections()
     return {"status": "success", "collections": collections}
 
-@tool
-def create_document_collection(file_path: str, collection_name: str = None) -> Dict[str, Any]:
+async def aget_collection_names() -> Dict[str, Any]:
+    """Tool that lists all available document collections"""
+    print("Using tool list_collections")
+    db = get_qdrant_db()
+    collections = await db.aget_collections()
+    return {"status": "success", "collections": collections}
+
+def get_collection_stats(collection_name: str = None) -> Dict[str, Any]:
+    """Tool that reports how many chunks a document collection holds, its vector index state and source files"""
+    print("Using tool collection_stats")
+    db = get_qdrant_db()
+    return db.collection_stats(collection_name)
+
+async def aget_collection_stats(collection_name: str = None) -> Dict[str, Any]:
+    """Tool that reports how many chunks a document collection holds, its vector index state and source files"""
+    print("Using tool collection_stats")
+    db = get_qdrant_db()
+    return await db.acollection_stats(collection_name)
+
+def create_collection_from_file(file_path: str, collection_name: str = None) -> Dict[str, Any]:
     """Tool that creates a new document collection from a PDF file"""
     print("Using tool create_document_collection")
     db = get_qdrant_db()
-    return db.create_collection(file_path, collection_name) 
\ No newline at end of file
+    return db.create_collection(file_path, collection_name)
+
+async def acreate_collection_from_file(file_path: str, collection_name: str = None) -> Dict[str, Any]:
+    """Tool that creates a new document collection from a PDF file"""
+    print("Using tool create_document_collection")
+    db = get_qdrant_db()
+    # Ingestion manages its own worker pools, so run it off the event loop
+    return await asyncio.to_thread(db.create_collection, file_path, collection_name)
+
+# Each tool has a sync and an async implementation, used by graph.invoke and graph.ainvoke respectively
+document_query = StructuredTool.from_function(
+    func=query_documents, coroutine=aquery_documents, name="document_query", args_schema=DocumentQueryInput
+)
+list_collections = StructuredTool.from_function(
+    func=get_collection_names, coroutine=aget_collection_names, name="list_collections"
+)
+collection_stats = StructuredTool.from_function(
+    func=get_collection_stats, coroutine=aget_collection_stats, name="collection_stats"
+)
+create_document_collection = StructuredTool.from_function(
+    func=create_collection_from_file, coroutine=acreate_collection_from_file, name="create_document_collection"
+)
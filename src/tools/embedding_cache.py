@@ -0,0 +1,233 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from src.tools.metrics import metrics
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache lookups (unicode form and whitespace)."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class SQLiteEmbeddingStore:
+    """
+    A persistent embedding store backed by a single SQLite table.
+
+    Vectors are stored as packed float32 blobs keyed by a SHA-256 digest of the cache key.
+    """
+    def __init__(self, path: str):
+        """
+        Opens (or creates) the SQLite database at the given path.
+
+        Parameters:
+        path (str): Path of the SQLite file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _digest(key: Tuple[str, str, str]) -> str:
+        return hashlib.sha256("\x00".join(key).encode("utf-8")).hexdigest()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[List[float]]:
+        """Return the stored vector for a key, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (self._digest(key),)
+            ).fetchone()
+        if row is None:
+            return None
+        vector = array("f")
+        vector.frombytes(row[0])
+        return vector.tolist()
+
+    def put_many(self, items: List[Tuple[Tuple[str, str, str], List[float]]]):
+        """Store several vectors in one transaction."""
+        rows = [(self._digest(key), array("f", vector).tobytes()) for key, vector in items]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embeddings object with an in-memory LRU cache and an optional SQLite tier.
+
+    Entries are keyed on (model, input type, normalized text) because providers such as
+    Cohere embed queries and documents differently.
+    """
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model: str = None,
+        max_size: int = 2048,
+        persist_path: str = None,
+        cache_documents: bool = False,
+    ):
+        """
+        Initializes the cache around an embeddings object.
+
+        Parameters:
+        embeddings (Embeddings): The embeddings object doing the actual work.
+        model (str, optional): Model name used in cache keys. Defaults to the wrapped object's `model`.
+        max_size (int): Maximum number of vectors kept in memory.
+        persist_path (str, optional): Path of a SQLite file used as a second cache tier.
+        cache_documents (bool): Also cache `embed_documents` calls. Off by default so that
+        bulk ingestion does not evict the query entries.
+        """
+        self.embeddings = embeddings
+        self.model = model or getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.max_size = max_size
+        self.cache_documents = cache_documents
+        self.store = SQLiteEmbeddingStore(persist_path) if persist_path else None
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[Tuple[str, str, str], List[float]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _key(self, kind: str, text: str) -> Tuple[str, str, str]:
+        return (self.model, kind, normalize_text(text))
+
+    def _lookup(self, key: Tuple[str, str, str]) -> Optional[List[float]]:
+        """Look a key up in memory, then on disk. Updates the hit/miss counters."""
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+        if self.store is not None:
+            vector = self.store.get(key)
+            if vector is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, vector)
+                return vector
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _remember(self, key: Tuple[str, str, str], vector: List[float]):
+        """Insert a vector into the in-memory LRU, evicting the oldest entries."""
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    def _store(self, items: List[Tuple[Tuple[str, str, str], List[float]]]):
+        for key, vector in items:
+            self._remember(key, vector)
+        if self.store is not None and items:
+            self.store.put_many(items)
+
+    def _partition(self, kind: str, texts: List[str]):
+        """Split texts into cached vectors and the (deduplicated) texts still to embed."""
+        keys = [self._key(kind, text) for text in texts]
+        results: List[Optional[List[float]]] = [self._lookup(key) for key in keys]
+        pending: Dict[Tuple[str, str, str], str] = {}
+        for key, text, vector in zip(keys, texts, results):
+            if vector is None and key not in pending:
+                pending[key] = text
+        return keys, results, pending
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, serving repeated queries from the cache."""
+        key = self._key("query", text)
+        vector = self._lookup(key)
+        metrics.increment("cache_lookups_total", cache="embedding", result="miss" if vector is None else "hit")
+        if vector is None:
+            with metrics.timer("embedding_seconds", op="query"):
+                vector = self.embeddings.embed_query(text)
+            self._store([(key, vector)])
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Asynchronously embed a query, serving repeated queries from the cache."""
+        key = self._key("query", text)
+        vector = self._lookup(key)
+        metrics.increment("cache_lookups_total", cache="embedding", result="miss" if vector is None else "hit")
+        if vector is None:
+            with metrics.timer("embedding_seconds", op="query"):
+                vector = await self.embeddings.aembed_query(text)
+            self._store([(key, vector)])
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, only sending uncached texts when document caching is enabled."""
+        if not self.cache_documents:
+            with metrics.timer("embedding_seconds", op="documents"):
+                return self.embeddings.embed_documents(texts)
+        keys, results, pending = self._partition("document", texts)
+        fresh = {}
+        if pending:
+            with metrics.timer("embedding_seconds", op="documents"):
+                vectors = self.embeddings.embed_documents(list(pending.values()))
+            fresh = dict(zip(pending.keys(), vectors))
+            self._store(list(fresh.items()))
+        return [vector if vector is not None else fresh[key] for key, vector in zip(keys, results)]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Asynchronously embed documents, see `embed_documents`."""
+        if not self.cache_documents:
+            with metrics.timer("embedding_seconds", op="documents"):
+                return await self.embeddings.aembed_documents(texts)
+        keys, results, pending = self._partition("document", texts)
+        fresh = {}
+        if pending:
+            with metrics.timer("embedding_seconds", op="documents"):
+                vectors = await self.embeddings.aembed_documents(list(pending.values()))
+            fresh = dict(zip(pending.keys(), vectors))
+            self._store(list(fresh.items()))
+        return [vector if vector is not None else fresh[key] for key, vector in zip(keys, results)]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache counters.
+
+        Returns:
+        dict: hits (memory), disk_hits, misses, hit_rate and current in-memory size.
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "model": self.model,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "size": len(self._memory),
+                "max_size": self.max_size,
+                "persistent": self.store is not None,
+            }
+
+    def clear(self):
+        """Drop the in-memory entries and reset the counters. The SQLite tier is kept."""
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = 0
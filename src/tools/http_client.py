@@ -0,0 +1,198 @@
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Connection pool, timeout and retry settings shared by the HTTP-backed tools
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))
+HTTP_BREAKER_THRESHOLD = int(os.getenv("HTTP_BREAKER_THRESHOLD", "5"))
+HTTP_BREAKER_RESET = float(os.getenv("HTTP_BREAKER_RESET", "30"))
+
+# Longest wait between two attempts: the last backoff step. Retry-After values are capped
+# at it, so a server cannot make a request outlast HTTP_RETRY_BUDGET.
+HTTP_MAX_RETRY_DELAY = HTTP_RETRY_BACKOFF * 2 ** HTTP_MAX_RETRIES
+
+# Worst case seconds for one request with all its retries: every attempt waits out the
+# connect and read timeouts, plus the longest delay between attempts
+HTTP_RETRY_BUDGET = (
+    (HTTP_MAX_RETRIES + 1) * (HTTP_CONNECT_TIMEOUT + HTTP_READ_TIMEOUT)
+    + HTTP_MAX_RETRIES * HTTP_MAX_RETRY_DELAY
+)
+
+# Responses worth retrying: rate limiting and server-side failures
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that is known to be failing."""
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream service is down.
+
+    After failure_threshold consecutive failures the circuit opens and calls are rejected
+    for reset_timeout seconds. A single trial call is then let through; its outcome either
+    closes the circuit again or re-opens it.
+    """
+    def __init__(self, failure_threshold: int = HTTP_BREAKER_THRESHOLD, reset_timeout: float = HTTP_BREAKER_RESET):
+        """
+        Parameters:
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open before a trial call.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """One of "closed", "open" or "half-open"."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through right now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0 or self._trial_in_flight:
+                raise CircuitOpenError(f"circuit open, retry in {max(remaining, 0):.0f}s")
+            self._trial_in_flight = True
+
+    def release(self):
+        """Give up a call without an outcome (e.g. it was cancelled), so that another call can be the trial."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Count a failed call, opening the circuit once the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def record_status(self, status_code: int):
+        """Record a completed call; only 429 and 5xx responses count as upstream failures."""
+        if status_code in RETRY_STATUSES or status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+def retry_after_seconds(value: Optional[str], max_delay: float = HTTP_MAX_RETRY_DELAY) -> Optional[float]:
+    """
+    Parse a Retry-After header given in seconds or as an HTTP date.
+
+    Parameters:
+    value (str): The header value, if any.
+    max_delay (float): Longest delay honoured; larger values are capped.
+
+    Returns:
+    float: Seconds to wait, or None when the header is missing or unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError, IndexError):
+            return None
+    return min(max(seconds, 0.0), max_delay)
+
+
+class CappedRetry(Retry):
+    """urllib3 Retry whose Retry-After handling goes through retry_after_seconds."""
+
+    def get_retry_after(self, response) -> Optional[float]:
+        # None makes urllib3 fall back to the exponential backoff
+        return retry_after_seconds(response.headers.get("Retry-After"))
+
+
+def create_session(
+    pool_size: int = HTTP_POOL_SIZE,
+    max_retries: int = HTTP_MAX_RETRIES,
+    retry_backoff: float = HTTP_RETRY_BACKOFF,
+) -> requests.Session:
+    """
+    Create a keep-alive session with a bounded connection pool and a retry policy.
+
+    Connection errors and RETRY_STATUSES responses to GET requests are retried with
+    exponential backoff plus jitter, honouring Retry-After headers up to HTTP_MAX_RETRY_DELAY.
+    """
+    retry = CappedRetry(
+        total=max_retries,
+        backoff_factor=retry_backoff,
+        backoff_jitter=retry_backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def create_async_client(pool_size: int = HTTP_POOL_SIZE, max_retries: int = HTTP_MAX_RETRIES) -> httpx.AsyncClient:
+    """Create an async client with the same pool size and timeouts; connect errors are retried by the transport."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        transport=httpx.AsyncHTTPTransport(retries=max_retries),
+    )
+
+
+def _retry_delay(response: httpx.Response, attempt: int, retry_backoff: float) -> float:
+    """Delay before the next attempt: Retry-After (capped) when given, else exponential backoff with full jitter."""
+    retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, retry_backoff * (2 ** attempt))
+
+
+async def aget_with_retries(
+    client: httpx.AsyncClient,
+    url: str,
+    max_retries: int = HTTP_MAX_RETRIES,
+    retry_backoff: float = HTTP_RETRY_BACKOFF,
+    **kwargs,
+) -> httpx.Response:
+    """GET url, retrying RETRY_STATUSES responses like the sync session does; returns the last response."""
+    for attempt in range(max_retries + 1):
+        response = await client.get(url, **kwargs)
+        if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+            return response
+        await asyncio.sleep(_retry_delay(response, attempt, retry_backoff))
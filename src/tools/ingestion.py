@@ -0,0 +1,608 @@
+import glob
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.tools.metrics import metrics
+
+# Heavy dependencies (qdrant_client, the text splitter, the PDF loader) are imported in the
+# functions that need them; this module is loaded whenever the document tools are
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
+
+# Default ingestion settings, overridable through environment variables
+CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("INGEST_CHUNK_OVERLAP", "200"))
+EMBED_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+EMBED_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+MAX_IN_FLIGHT = int(os.getenv("INGEST_MAX_IN_FLIGHT", str(2 * EMBED_WORKERS)))
+MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "5"))
+RETRY_BACKOFF = float(os.getenv("INGEST_RETRY_BACKOFF", "1.0"))
+
+# Payload keys used by langchain_qdrant.QdrantVectorStore
+CONTENT_PAYLOAD_KEY = "page_content"
+METADATA_PAYLOAD_KEY = "metadata"
+
+# Namespace for deterministic point IDs derived from (doc_id, chunk_hash)
+POINT_ID_NAMESPACE = uuid.UUID("6f1c1f0e-3b5a-4d0e-9a53-1d2b7c9e4f10")
+
+
+def hash_text(text: str) -> str:
+    """Return the SHA-256 hex digest of a chunk's text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_file(file_path: str) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def point_id(doc_id: str, chunk_hash: str) -> str:
+    """Deterministic point ID, so that re-ingesting a chunk overwrites instead of duplicating it."""
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{doc_id}:{chunk_hash}"))
+
+
+def chunk_key(chunk_hash: str, occurrence: int = 0) -> str:
+    """
+    Identity of a chunk within its document: the hash of its text, plus which repeat of that
+    text it is, so that text repeated on several pages is stored once per page.
+    """
+    return chunk_hash if not occurrence else f"{chunk_hash}:{occurrence}"
+
+
+class IngestionPipeline:
+    """
+    Splits documents into chunks, embeds them in bounded batches on a pool of worker
+    threads and upserts every batch into Qdrant as soon as its embeddings are ready.
+    """
+    def __init__(
+        self,
+        client: "QdrantClient",
+        embeddings: Embeddings,
+        chunk_size: int = CHUNK_SIZE,
+        chunk_overlap: int = CHUNK_OVERLAP,
+        batch_size: int = EMBED_BATCH_SIZE,
+        max_workers: int = EMBED_WORKERS,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        max_retries: int = MAX_RETRIES,
+        retry_backoff: float = RETRY_BACKOFF,
+    ):
+        """
+        Initializes the pipeline.
+
+        Parameters:
+        client (QdrantClient): Client used to create collections and upsert points.
+        embeddings (Embeddings): Embeddings used for the chunks.
+        chunk_size (int): Maximum number of characters per chunk.
+        chunk_overlap (int): Number of characters shared by consecutive chunks.
+        batch_size (int): Number of chunks per embedding call and per upsert.
+        max_workers (int): Number of batches embedded and upserted concurrently.
+        max_in_flight (int): Maximum number of batches submitted but not yet upserted. Reading
+        pages pauses while the window is full, which bounds memory independently of document size.
+        max_retries (int): Attempts per embedding call or upsert before giving up.
+        retry_backoff (float): Base delay in seconds for the jittered exponential backoff.
+        """
+        self.client = client
+        self.embeddings = embeddings
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_in_flight = max(max_in_flight, max_workers)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        self.splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            add_start_index=True,
+        )
+        self._collections_lock = threading.Lock()
+        self._ready_collections = set()
+
+    def split(self, pages: Iterable[Document]) -> Iterator[Document]:
+        """
+        Splits pages into chunks one page at a time.
+
+        Parameters:
+        pages (Iterable[Document]): The pages to split.
+
+        Returns:
+        Iterator[Document]: The chunks, carrying the metadata of their page.
+        """
+        for page in pages:
+            yield from self.splitter.split_documents([page])
+
+    def _batches(self, chunks: Iterable[Document]) -> Iterator[List[Document]]:
+        """Group chunks into lists of at most batch_size items."""
+        batch = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _with_retries(self, func: Callable, *args, **kwargs):
+        """Call func, retrying failures with exponential backoff and full jitter."""
+        for attempt in range(self.max_retries):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    raise
+                delay = random.uniform(0, self.retry_backoff * (2 ** attempt))
+                print(f"Ingestion call failed ({str(e)}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _ensure_collection(self, collection_name: str, vector_size: int):
+        """Create the collection on first use unless it already exists."""
+        from qdrant_client import models
+
+        with self._collections_lock:
+            if collection_name in self._ready_collections:
+                return
+            if not self.client.collection_exists(collection_name):
+                self.client.create_collection(
+                    collection_name=collection_name,
+                    vectors_config=models.VectorParams(size=vector_size, distance=models.Distance.COSINE),
+                )
+                # Incremental ingestion filters on the document ID
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=f"{METADATA_PAYLOAD_KEY}.doc_id",
+                    field_schema=models.PayloadSchemaType.KEYWORD,
+                )
+                # Browsing and retrieval filter by page
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=f"{METADATA_PAYLOAD_KEY}.page",
+                    field_schema=models.PayloadSchemaType.INTEGER,
+                )
+            self._ready_collections.add(collection_name)
+
+    def document_state(self, collection_name: str, doc_id: str) -> Dict[str, Any]:
+        """
+        Looks up the chunks already stored for a document, without fetching vectors.
+
+        Parameters:
+        collection_name (str): The collection to look in.
+        doc_id (str): The document ID stored in the chunk metadata.
+
+        Returns:
+        dict: file_hashes (set of file hashes seen on the stored chunks) and
+        points (chunk key -> (point ID, stored metadata)).
+        """
+        from qdrant_client import models
+
+        state = {"file_hashes": set(), "points": {}}
+        if not self.client.collection_exists(collection_name):
+            return state
+        doc_filter = models.Filter(must=[
+            models.FieldCondition(key=f"{METADATA_PAYLOAD_KEY}.doc_id", match=models.MatchValue(value=doc_id))
+        ])
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=collection_name,
+                scroll_filter=doc_filter,
+                with_payload=[METADATA_PAYLOAD_KEY],
+                with_vectors=False,
+                limit=256,
+                offset=offset,
+            )
+            for record in records:
+                metadata = (record.payload or {}).get(METADATA_PAYLOAD_KEY, {})
+                state["file_hashes"].add(metadata.get("file_hash"))
+                key = chunk_key(metadata.get("chunk_hash"), metadata.get("occurrence", 0))
+                state["points"][key] = (record.id, metadata)
+            if offset is None:
+                return state
+
+    def _new_chunks(self, chunks: Iterable[Document], doc_id: str, file_hash: str,
+                    state: Dict[str, Any], seen: Dict[str, Dict[str, Any]],
+                    stats: Dict[str, Any]) -> Iterator[Document]:
+        """
+        Tag chunks with their hashes and drop those already stored. The metadata of every
+        chunk of the new revision is recorded in seen, keyed by chunk key.
+        """
+        occurrences = {}
+        for chunk in chunks:
+            chunk_hash = hash_text(chunk.page_content)
+            occurrence = occurrences.get(chunk_hash, 0)
+            occurrences[chunk_hash] = occurrence + 1
+            key = chunk_key(chunk_hash, occurrence)
+            chunk.metadata.update(doc_id=doc_id, file_hash=file_hash, chunk_hash=chunk_hash, occurrence=occurrence)
+            seen[key] = chunk.metadata
+            if key in state["points"]:
+                stats["skipped_chunks"] += 1
+                continue
+            yield chunk
+
+    def _finalize_document(self, collection_name: str, file_hash: str, state: Dict[str, Any],
+                           seen: Dict[str, Dict[str, Any]], stats: Dict[str, Any]):
+        """
+        Delete chunks that are gone from the new revision, and bring the metadata of the
+        retained ones (file hash, page, offset) up to date with the new revision.
+        """
+        from qdrant_client import models
+
+        stale = [pid for key, (pid, _) in state["points"].items() if key not in seen]
+        if stale:
+            self._with_retries(
+                self.client.delete,
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(points=stale),
+            )
+        # Text that moved (e.g. after a page was inserted) keeps its point but not its page
+        updates = [
+            models.SetPayloadOperation(set_payload=models.SetPayload(
+                payload={METADATA_PAYLOAD_KEY: seen[key]}, points=[pid],
+            ))
+            for key, (pid, metadata) in state["points"].items()
+            if key in seen and metadata != seen[key]
+        ]
+        for start in range(0, len(updates), self.batch_size):
+            self._with_retries(
+                self.client.batch_update_points,
+                collection_name=collection_name,
+                update_operations=updates[start:start + self.batch_size],
+            )
+        stats["deleted_chunks"] += len(stale)
+        stats["updated_chunks"] += len(updates)
+
+    def _process_batch(self, collection_name: str, batch: List[Document]) -> int:
+        """Embed one batch of chunks and upsert it. Returns the number of points written."""
+        from qdrant_client import models
+
+        vectors = self._with_retries(
+            self.embeddings.embed_documents, [chunk.page_content for chunk in batch]
+        )
+        self._ensure_collection(collection_name, len(vectors[0]))
+        points = [
+            models.PointStruct(
+                id=(
+                    point_id(chunk.metadata["doc_id"],
+                             chunk_key(chunk.metadata["chunk_hash"], chunk.metadata.get("occurrence", 0)))
+                    if "chunk_hash" in chunk.metadata else str(uuid.uuid4())
+                ),
+                vector=vector,
+                payload={
+                    CONTENT_PAYLOAD_KEY: chunk.page_content,
+                    METADATA_PAYLOAD_KEY: chunk.metadata,
+                },
+            )
+            for chunk, vector in zip(batch, vectors)
+        ]
+        with metrics.timer("qdrant_seconds", op="upsert"):
+            self._with_retries(self.client.upsert, collection_name=collection_name, points=points)
+        return len(points)
+
+    def _execute(
+        self,
+        collection_name: str,
+        keyed_batches: Iterable[Tuple[Any, List[Document]]],
+        stats: Dict[str, Any],
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        on_batch_done: Optional[Callable[[Any, int], None]] = None,
+    ):
+        """
+        Embeds and upserts batches on the worker pool, keeping at most max_in_flight pending.
+
+        Completion callbacks run on the calling thread, never on a worker.
+        """
+        # Re-check existence once per run in case the collection was dropped in between
+        with self._collections_lock:
+            self._ready_collections.discard(collection_name)
+
+        def record(future):
+            written = future.result()
+            stats["chunks"] += written
+            stats["batches"] += 1
+            if on_batch_done:
+                on_batch_done(pending[future], written)
+            if progress_callback:
+                progress_callback(dict(stats))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}  # future -> batch key
+            try:
+                for key, batch in keyed_batches:
+                    # Apply back-pressure: stop reading pages while the window is full
+                    if len(pending) >= self.max_in_flight:
+                        wait(pending, return_when=FIRST_COMPLETED)
+                    for future in [future for future in pending if future.done()]:
+                        record(future)
+                        del pending[future]
+                    future = executor.submit(self._process_batch, collection_name, batch)
+                    pending[future] = key
+                for future in as_completed(list(pending)):
+                    record(future)
+                    del pending[future]
+            except Exception:
+                for future in pending:
+                    future.cancel()
+                raise
+
+    def _finish(self, collection_name: str, stats: Dict[str, Any], start: float) -> Dict[str, Any]:
+        """Add timing and throughput figures to the stats and print a summary."""
+        elapsed = time.perf_counter() - start
+        stats["seconds"] = round(elapsed, 3)
+        stats["pages_per_sec"] = round(stats["pages"] / elapsed, 2) if elapsed else 0.0
+        stats["chunks_per_sec"] = round(stats["chunks"] / elapsed, 2) if elapsed else 0.0
+        print(
+            f"Ingested {stats['pages']} pages / {stats['chunks']} chunks into '{collection_name}' "
+            f"in {stats['seconds']}s ({stats['pages_per_sec']} pages/s, {stats['chunks_per_sec']} chunks/s); "
+            f"{stats.get('skipped_chunks', 0)} chunks unchanged, {stats.get('deleted_chunks', 0)} deleted"
+        )
+        return stats
+
+    def run(
+        self,
+        collection_name: str,
+        pages: Iterable[Document],
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        doc_id: str = None,
+        file_hash: str = None,
+    ) -> Dict[str, Any]:
+        """
+        Ingests pages into a collection, creating the collection if needed.
+
+        When doc_id and file_hash are given, ingestion is incremental: an unchanged file is
+        skipped without reading its pages, only chunks whose content hash is not yet stored
+        for the document are embedded, chunks missing from the new revision are deleted, and
+        retained chunks that moved get their page and offset updated.
+
+        Parameters:
+        collection_name (str): The collection to write to.
+        pages (Iterable[Document]): The pages to ingest. Consumed lazily, so a generator such
+        as PyPDFLoader.lazy_load streams pages through the pipeline as they are parsed.
+        progress_callback (callable, optional): Called from the calling thread with the
+        running stats every time a batch has been upserted.
+        doc_id (str, optional): Stable ID of the document, e.g. its original file name.
+        file_hash (str, optional): Content hash of the document file.
+
+        Returns:
+        dict: pages, chunks, batches, skipped_chunks, deleted_chunks, updated_chunks, unchanged,
+        seconds, pages_per_sec and chunks_per_sec.
+        """
+        stats = {"pages": 0, "chunks": 0, "batches": 0, "skipped_chunks": 0, "deleted_chunks": 0,
+                 "updated_chunks": 0, "unchanged": False}
+        start = time.perf_counter()
+
+        def counted(items):
+            for item in items:
+                stats["pages"] += 1
+                yield item
+
+        chunks = self.split(counted(pages))
+        if doc_id is not None and file_hash is not None:
+            state = self.document_state(collection_name, doc_id)
+            if state["file_hashes"] == {file_hash}:
+                stats["unchanged"] = True
+                stats["skipped_chunks"] = len(state["points"])
+                return self._finish(collection_name, stats, start)
+            seen = {}
+            chunks = self._new_chunks(chunks, doc_id, file_hash, state, seen, stats)
+
+        batches = ((None, batch) for batch in self._batches(chunks))
+        self._execute(collection_name, batches, stats, progress_callback)
+        if doc_id is not None and file_hash is not None:
+            self._finalize_document(collection_name, file_hash, state, seen, stats)
+        return self._finish(collection_name, stats, start)
+
+    def ingest_files(
+        self,
+        collection_name: str,
+        file_paths: Iterable[str],
+        processes: int = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        on_file_complete: Optional[Callable[[str, int], None]] = None,
+        doc_ids: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Ingests many PDF files into one collection.
+
+        PDFs are hashed, parsed and split in a process pool, since pypdf parsing is CPU-bound,
+        and the resulting chunks share this pipeline's embedding and upsert workers. Batches
+        never mix files, so a file is reported complete once all of its batches are upserted.
+        Each file is ingested incrementally, as described in `run`.
+
+        Parameters:
+        collection_name (str): The collection to write to. Created if it does not exist.
+        file_paths (Iterable[str]): The PDF files to ingest.
+        processes (int, optional): Number of parser processes. Defaults to the CPU count.
+        progress_callback (callable, optional): Receives the running stats after every batch.
+        on_file_complete (callable, optional): Called with (file_path, chunk_count) once a file
+        has been fully upserted.
+        doc_ids (dict, optional): Document ID for each file path. Defaults to the path itself.
+
+        Returns:
+        dict: files, unchanged_files, failed, pages, chunks, batches, skipped_chunks,
+        deleted_chunks, updated_chunks, seconds, pages_per_sec and chunks_per_sec.
+        """
+        stats = {"files": 0, "unchanged_files": 0, "failed": [], "pages": 0, "chunks": 0, "batches": 0,
+                 "skipped_chunks": 0, "deleted_chunks": 0, "updated_chunks": 0}
+        doc_ids = doc_ids or {}
+        start = time.perf_counter()
+        outstanding = {}  # file path -> batches not yet upserted
+        written = {}  # file path -> chunks upserted
+        parsed = set()
+        revisions = {}  # file path -> (file hash, stored state, chunk metadata seen)
+
+        def complete(file_path):
+            stats["files"] += 1
+            if file_path in revisions:
+                file_hash, state, seen = revisions.pop(file_path)
+                self._finalize_document(collection_name, file_hash, state, seen, stats)
+            if on_file_complete:
+                on_file_complete(file_path, written[file_path])
+
+        def batch_done(file_path, count):
+            outstanding[file_path] -= 1
+            written[file_path] += count
+            if file_path in parsed and outstanding[file_path] == 0:
+                complete(file_path)
+
+        def file_batches(pool):
+            for file_path, page_count, chunks, file_hash in self._parse_files(pool, file_paths, processes, stats):
+                outstanding[file_path] = 0
+                written[file_path] = 0
+                doc_id = doc_ids.get(file_path, file_path)
+                state = self.document_state(collection_name, doc_id)
+                if state["file_hashes"] == {file_hash}:
+                    stats["unchanged_files"] += 1
+                    stats["skipped_chunks"] += len(state["points"])
+                    parsed.add(file_path)
+                    complete(file_path)
+                    continue
+                stats["pages"] += page_count
+                seen = {}
+                revisions[file_path] = (file_hash, state, seen)
+                chunks = list(self._new_chunks(chunks, doc_id, file_hash, state, seen, stats))
+                for batch in self._batches(chunks):
+                    outstanding[file_path] += 1
+                    yield file_path, batch
+                parsed.add(file_path)
+                if outstanding[file_path] == 0:
+                    complete(file_path)
+
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            self._execute(collection_name, file_batches(pool), stats, progress_callback, batch_done)
+        return self._finish(collection_name, stats, start)
+
+    def _parse_files(self, pool: ProcessPoolExecutor, file_paths: Iterable[str], processes: int,
+                     stats: Dict[str, Any]) -> Iterator[Tuple[str, int, List[Document], str]]:
+        """Parse files on the process pool, yielding them in completion order."""
+        paths = iter(file_paths)
+        window = 2 * (processes or os.cpu_count() or 1)
+        pending = {}
+
+        def submit_next():
+            for file_path in paths:
+                pending[pool.submit(load_and_split_pdf, file_path, self.chunk_size, self.chunk_overlap)] = file_path
+                return
+
+        for _ in range(window):
+            submit_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path = pending.pop(future)
+                submit_next()
+                try:
+                    page_count, chunks, file_hash = future.result()
+                except Exception as e:
+                    print(f"Failed to parse '{file_path}': {str(e)}")
+                    stats["failed"].append({"file": file_path, "error": str(e)})
+                    continue
+                yield file_path, page_count, chunks, file_hash
+
+
+def load_and_split_pdf(file_path: str, chunk_size: int = CHUNK_SIZE,
+                       chunk_overlap: int = CHUNK_OVERLAP) -> Tuple[int, List[Document], str]:
+    """
+    Loads a PDF page by page, splits it into chunks and hashes the file. Runs in parser
+    worker processes.
+
+    Parameters:
+    file_path (str): Path to the PDF file.
+    chunk_size (int): Maximum number of characters per chunk.
+    chunk_overlap (int): Number of characters shared by consecutive chunks.
+
+    Returns:
+    tuple: (page_count, chunks, file_hash)
+    """
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        add_start_index=True,
+    )
+    page_count = 0
+    chunks = []
+    for page in PyPDFLoader(file_path).lazy_load():
+        page_count += 1
+        chunks.extend(splitter.split_documents([page]))
+    return page_count, chunks, hash_file(file_path)
+
+
+def find_pdf_files(path_or_glob: str) -> List[str]:
+    """
+    Resolves a directory (searched recursively), a single file or a glob pattern to PDF paths.
+
+    Parameters:
+    path_or_glob (str): A directory, a PDF file or a glob such as "manuals/**/*.pdf".
+
+    Returns:
+    list: Sorted absolute paths of the matching PDF files.
+    """
+    if os.path.isdir(path_or_glob):
+        pattern = os.path.join(path_or_glob, "**", "*.pdf")
+    else:
+        pattern = path_or_glob
+    matches = glob.glob(pattern, recursive=True)
+    return sorted(os.path.abspath(path) for path in matches if path.lower().endswith(".pdf") and os.path.isfile(path))
+
+
+class IngestionManifest:
+    """
+    A JSON record of the files already ingested into a collection, used to resume bulk runs.
+
+    A file counts as done while its size and modification time are unchanged.
+    """
+    def __init__(self, path: str):
+        """
+        Loads the manifest at the given path, or starts an empty one.
+
+        Parameters:
+        path (str): Path of the JSON manifest file.
+        """
+        self.path = path
+        self.files = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.files = json.load(f).get("files", {})
+
+    @staticmethod
+    def _signature(file_path: str) -> Dict[str, Any]:
+        stat = os.stat(file_path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def is_done(self, file_path: str) -> bool:
+        """Return True if the file was ingested and has not changed since."""
+        entry = self.files.get(os.path.abspath(file_path))
+        if entry is None:
+            return False
+        signature = self._signature(file_path)
+        return entry["size"] == signature["size"] and entry["mtime"] == signature["mtime"]
+
+    def mark_done(self, file_path: str, chunks: int):
+        """Record a file as ingested and write the manifest atomically."""
+        entry = self._signature(file_path)
+        entry["chunks"] = chunks
+        self.files[os.path.abspath(file_path)] = entry
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files}, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,294 @@
+"""
+In-process latency, size and counter metrics for the agent's hot path.
+
+Graph nodes, tool calls, embedding and Qdrant calls record into a process-wide registry
+when METRICS_ENABLED is set. When it is not set every recording call returns after one
+attribute check, so the instrumentation can stay in place in production.
+"""
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Record metrics; off by default
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+# Optional JSON lines file the CLI appends a snapshot to on exit
+METRICS_JSONL_PATH = os.getenv("METRICS_JSONL_PATH")
+
+# Histogram bucket upper bounds
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKENS_BUCKETS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000)
+BYTES_BUCKETS = (100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Histogram:
+    """A cumulative-bucket histogram in the Prometheus style: bucket counts, sum and count."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class _Timer:
+    """Context manager observing its wall time into a histogram."""
+
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class _NullTimer:
+    """Shared no-op timer used while metrics are disabled."""
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc: Any):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    Thread-safe histograms and counters keyed by metric name and labels.
+
+    Histogram buckets are picked from the metric name: *_seconds, *_tokens and *_bytes get
+    time, token and size buckets. Export with to_prometheus() or write_jsonl().
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        """
+        Initialize an empty registry.
+
+        Args:
+            enabled: Whether recording calls store anything
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+
+    @staticmethod
+    def _buckets_for(name: str) -> Sequence[float]:
+        if name.endswith("_tokens"):
+            return TOKENS_BUCKETS
+        if name.endswith("_bytes"):
+            return BYTES_BUCKETS
+        return SECONDS_BUCKETS
+
+    def observe(self, name: str, value: float, **labels: Any):
+        """
+        Record a value in a histogram.
+
+        Args:
+            name: The metric name, e.g. node_seconds
+            value: The observed value
+            labels: Label values identifying the series
+        """
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._buckets_for(name))
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels: Any):
+        """
+        Add to a counter.
+
+        Args:
+            name: The metric name, e.g. cache_lookups_total
+            amount: The amount to add
+            labels: Label values identifying the series
+        """
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def timer(self, name: str, **labels: Any):
+        """
+        Time a block into a histogram.
+
+        Args:
+            name: The metric name
+            labels: Label values identifying the series
+
+        Returns:
+            A context manager, a shared no-op one while disabled
+        """
+        return _Timer(self, name, labels) if self.enabled else NULL_TIMER
+
+    def timed(self, name: str, **labels: Any) -> Callable[[Callable], Callable]:
+        """
+        Decorator timing every call of a sync or async function into a histogram.
+
+        Args:
+            name: The metric name
+            labels: Label values identifying the series
+
+        Returns:
+            The decorator
+        """
+        def decorator(func: Callable) -> Callable:
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    with _Timer(self, name, labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, name, labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        """Return the histogram of a series, or None if nothing was recorded."""
+        with self._lock:
+            return self._histograms.get(name, {}).get(_label_key(labels))
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """Return the value of a counter series, 0 if nothing was recorded."""
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Returns every series as a dict.
+
+        Returns:
+            list: One dict per series with the name, type, labels and values; histograms
+            carry count, sum, p50/p95/p99 estimates and their bucket counts
+        """
+        records = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                for key, histogram in series.items():
+                    records.append({
+                        "name": name,
+                        "type": "histogram",
+                        "labels": dict(key),
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "p50": histogram.quantile(0.50),
+                        "p95": histogram.quantile(0.95),
+                        "p99": histogram.quantile(0.99),
+                        "buckets": dict(zip([str(b) for b in histogram.buckets] + ["+Inf"], histogram.counts)),
+                    })
+            for name, series in sorted(self._counters.items()):
+                for key, value in series.items():
+                    records.append({"name": name, "type": "counter", "labels": dict(key), "value": value})
+        return records
+
+    def to_prometheus(self) -> str:
+        """
+        Render every series in the Prometheus text exposition format.
+
+        Returns:
+            The exposition text
+        """
+        lines = []
+        for name, kind, rows in self._prometheus_rows():
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(rows)
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def _prometheus_rows(self) -> Iterator[Tuple[str, str, List[str]]]:
+        def render(labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                rows = []
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        rows.append(f"{name}_bucket{render(key, (('le', le),))} {cumulative}")
+                    rows.append(f"{name}_sum{render(key)} {histogram.sum}")
+                    rows.append(f"{name}_count{render(key)} {histogram.count}")
+                yield name, "histogram", rows
+            for name, series in sorted(self._counters.items()):
+                yield name, "counter", [f"{name}{render(key)} {value}" for key, value in series.items()]
+
+    def write_jsonl(self, path: str):
+        """
+        Append a timestamped snapshot to a JSON lines file, one series per line.
+
+        Args:
+            path: The file to append to
+        """
+        timestamp = time.time()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for record in self.snapshot():
+                f.write(json.dumps({"timestamp": timestamp, **record}) + "\n")
+
+    def clear(self):
+        """Drop every recorded series."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+# Process-wide registry used by the instrumented code
+metrics = MetricsRegistry()
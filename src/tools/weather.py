@@ -1,11 +1,25 @@
 import os
+import re
+import httpx
 import requests
 from typing import Optional, Dict, Any, Type
 from pydantic import BaseModel, Field
 # from langchain.tools import BaseTool
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 from dotenv import load_dotenv
 
+from src.tools.aio import LoopLocal
+from src.tools.cache import TTLCache
+from src.tools.http_client import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    CircuitBreaker,
+    CircuitOpenError,
+    aget_with_retries,
+    create_async_client,
+    create_session,
+)
+
 # Load environment variables
 load_dotenv()
 
@@ -14,56 +28,140 @@ OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
 if not OPENWEATHER_API_KEY:
     raise ValueError("OpenWeather API key not found in environment variables")
 
+# API endpoint for OpenWeatherMap
+# Overridable to point at a local stand-in, e.g. for the offline benchmarks
+OPENWEATHER_URL = os.getenv("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5/weather")
+
+# Pooled keep-alive session for sync calls and one async client per event loop
+weather_session = create_session()
+async_http_client = LoopLocal(create_async_client)
+
+# Shared by both implementations, so an OpenWeatherMap outage fails fast everywhere
+weather_breaker = CircuitBreaker()
+
+# Current weather changes over minutes, so repeat lookups of a city are served from memory
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "1024"))
+WEATHER_CACHE_STALE_TTL = float(os.getenv("WEATHER_CACHE_STALE_TTL", "0"))
+weather_cache = TTLCache(
+    ttl=WEATHER_CACHE_TTL,
+    max_size=WEATHER_CACHE_SIZE,
+    stale_ttl=WEATHER_CACHE_STALE_TTL,
+    cache_if=lambda result: "error" not in result,  # Failed lookups are retried next time
+    name="weather",
+)
+
 class WeatherInput(BaseModel):
     """Input for the weather tool."""
     location: str = Field(..., description="The city name to get weather for")
 
 # class WeatherTool(BaseTool):
 #     """Tool that fetches weather information from OpenWeatherMap API."""
-    
+
 #     name: str = "weather_tool"
 #     description: str = "Useful for getting current weather information for a city."
 #     args_schema: Type[WeatherInput] = WeatherInput
 
-@tool
-def weather_tool(location: str) -> Dict[str, Any]:
-    """Tool that fetches weather information for the provided location"""
-    print("Using tool weather_tool")
+def _weather_params(location: str) -> Dict[str, Any]:
+    """Parameters for the OpenWeatherMap API request."""
+    return {
+        "q": location,
+        "appid": OPENWEATHER_API_KEY,
+        "units": "metric"  # For temperature in Celsius
+    }
+
+def _parse_weather(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract relevant weather information from an OpenWeatherMap response."""
+    return {
+        "location": data["name"],
+        "country": data["sys"]["country"],
+        "weather": data["weather"][0]["description"],
+        "temperature": data["main"]["temp"],
+        "feels_like": data["main"]["feels_like"],
+        "humidity": data["main"]["humidity"],
+        "wind_speed": data["wind"]["speed"],
+        "timestamp": data["dt"]
+    }
+
+def _location_key(location: str) -> str:
+    """Normalize a location so that "London ,GB" and "london, gb" share a cache entry."""
+    location = " ".join(location.split()).casefold()
+    return re.sub(r"\s*,\s*", ",", location)
+
+def _request_weather(location: str) -> Dict[str, Any]:
+    """Fetch the current weather from OpenWeatherMap, bypassing the cache."""
     try:
-        # API endpoint for OpenWeatherMap
-        url = f"https://api.openweathermap.org/data/2.5/weather"
-        
-        # Parameters for the API request
-        params = {
-            "q": location,
-            "appid": OPENWEATHER_API_KEY,
-            "units": "metric"  # For temperature in Celsius
-        }
-        
+        weather_breaker.before_call()
         # Make the API request
-        response = requests.get(url, params=params)
+        try:
+            response = weather_session.get(
+                OPENWEATHER_URL,
+                params=_weather_params(location),
+                timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+            )
+        except requests.exceptions.RequestException:
+            weather_breaker.record_failure()
+            raise
+        except BaseException:
+            # Not the upstream's fault (e.g. cancelled); never leave a half-open trial pending
+            weather_breaker.release()
+            raise
+        weather_breaker.record_status(response.status_code)
         response.raise_for_status()  # Raise an exception for HTTP errors
-        
+
         # Parse the JSON response
-        data = response.json()
-        
-        # Extract relevant weather information
-        weather_info = {
-            "location": data["name"],
-            "country": data["sys"]["country"],
-            "weather": data["weather"][0]["description"],
-            "temperature": data["main"]["temp"],
-            "feels_like": data["main"]["feels_like"],
-            "humidity": data["main"]["humidity"],
-            "wind_speed": data["wind"]["speed"],
-            "timestamp": data["dt"]
-        }
-        
-        return weather_info
-        
+        return _parse_weather(response.json())
+
+    except CircuitOpenError as e:
+        return {"error": f"Weather service unavailable: {str(e)}"}
     except requests.exceptions.RequestException as e:
         return {"error": f"Failed to fetch weather data: {str(e)}"}
     except (KeyError, IndexError) as e:
         return {"error": f"Failed to parse weather data: {str(e)}"}
     except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"} 
\ No newline at end of file
+        return {"error": f"Unexpected error: {str(e)}"}
+
+async def _arequest_weather(location: str) -> Dict[str, Any]:
+    """Async version of _request_weather."""
+    try:
+        weather_breaker.before_call()
+        try:
+            response = await aget_with_retries(
+                async_http_client.get(), OPENWEATHER_URL, params=_weather_params(location)
+            )
+        except httpx.TransportError:
+            weather_breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled by a tool timeout or failed locally; never leave a half-open trial pending
+            weather_breaker.release()
+            raise
+        weather_breaker.record_status(response.status_code)
+        response.raise_for_status()
+        return _parse_weather(response.json())
+
+    except CircuitOpenError as e:
+        return {"error": f"Weather service unavailable: {str(e)}"}
+    except httpx.HTTPError as e:
+        return {"error": f"Failed to fetch weather data: {str(e)}"}
+    except (KeyError, IndexError) as e:
+        return {"error": f"Failed to parse weather data: {str(e)}"}
+    except Exception as e:
+        return {"error": f"Unexpected error: {str(e)}"}
+
+def fetch_weather(location: str) -> Dict[str, Any]:
+    """Tool that fetches weather information for the provided location"""
+    print("Using tool weather_tool")
+    return weather_cache.get_or_load(_location_key(location), lambda: _request_weather(location))
+
+async def afetch_weather(location: str) -> Dict[str, Any]:
+    """Tool that fetches weather information for the provided location"""
+    print("Using tool weather_tool")
+    return await weather_cache.aget_or_load(_location_key(location), lambda: _arequest_weather(location))
+
+# Sync and async implementations behind one tool, so both graph.invoke and graph.ainvoke work
+weather_tool = StructuredTool.from_function(
+    func=fetch_weather,
+    coroutine=afetch_weather,
+    name="weather_tool",
+)
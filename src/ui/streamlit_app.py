@@ -4,15 +4,56 @@ import os
 import tempfile
 import sys
 from langchain_core.messages import HumanMessage, AIMessage
-from src.graphs.agent_flow import graph
+from src.graphs.agent_flow import get_graph
+from src.graphs.streaming import stream_text
 
 # Try to import document-related functions
 try:
-    from src.tools.document import get_qdrant_db, document_query
+    from src.tools.document import get_qdrant_db, document_query, on_collection_changed
     DOCUMENT_TOOLS_AVAILABLE = True
 except (ImportError, ValueError):
     DOCUMENT_TOOLS_AVAILABLE = False
 
+# Seconds collection listings and previews are reused across reruns and sessions
+UI_CACHE_TTL = float(os.getenv("UI_CACHE_TTL", "60"))
+# Chunks shown per page of the collection preview
+PREVIEW_PAGE_SIZE = 5
+
+@st.cache_resource(show_spinner=False)
+def get_agent_graph():
+    """Return the compiled agent graph, built once per process and shared by every session."""
+    return get_graph()
+
+@st.cache_resource(show_spinner=False)
+def get_database():
+    """Return the QdrantDatabase shared by every session and rerun."""
+    # Uploads, and collections the agent creates from chat, make the cached listings stale
+    on_collection_changed(lambda collection_name: clear_collection_cache())
+    return get_qdrant_db()
+
+@st.cache_data(ttl=UI_CACHE_TTL, show_spinner=False)
+def list_collections():
+    """Return the collection names; reruns within UI_CACHE_TTL make no Qdrant call."""
+    return get_database().get_collections()
+
+@st.cache_data(ttl=UI_CACHE_TTL, show_spinner=False)
+def preview_documents(collection_name, offset=None, source=None, page=None):
+    """Return one page of a collection's chunks for the preview panel (a scroll, no search)."""
+    return get_database().browse_collection(
+        collection_name, limit=PREVIEW_PAGE_SIZE, offset=offset, source=source, page=page
+    )
+
+@st.cache_data(ttl=UI_CACHE_TTL, show_spinner=False)
+def collection_details(collection_name):
+    """Return the statistics of a collection (point count, index state, sources)."""
+    return get_database().collection_stats(collection_name)
+
+def clear_collection_cache():
+    """Drop the cached collection listings, previews and statistics."""
+    list_collections.clear()
+    preview_documents.clear()
+    collection_details.clear()
+
 def initialize_session_state():
     """Initialize session state variables."""
     if "messages" not in st.session_state:
@@ -34,6 +75,13 @@ def initialize_session_state():
     if "show_preview" not in st.session_state:
         st.session_state.show_preview = False
         
+    # Offsets of the preview pages visited so far, for the Previous button
+    if "preview_offsets" not in st.session_state:
+        st.session_state.preview_offsets = [None]
+        
+    if "preview_filters" not in st.session_state:
+        st.session_state.preview_filters = None
+        
     if "show_diagnostics" not in st.session_state:
         st.session_state.show_diagnostics = False
 
@@ -58,28 +106,33 @@ def upload_and_process_pdf():
                     pdf_path = tmp_file.name
                 
                 try:
-                    # Create database instance
-                    db = get_qdrant_db()
+                    # Shared database instance
+                    db = get_database()
                     
                     # Create collection
                     with st.status("Creating vector database...") as status:
-                        status.update(label="Loading document...")
-                        
-                        # First status update
-                        status.update(label="Splitting document into chunks...")
-                        
-                        # Second status update
-                        status.update(label="Generating embeddings...")
-                        
+                        status.update(label="Loading and splitting document...")
+
+                        # Report progress as each batch of chunks is embedded and stored
+                        def show_progress(stats):
+                            status.update(
+                                label=f"Embedded {stats['chunks']} chunks from {stats['pages']} pages..."
+                            )
+
                         # Create collection
-                        result = db.create_collection(pdf_path, collection_name)
+                        result = db.create_collection(
+                            pdf_path,
+                            collection_name,
+                            progress_callback=show_progress,
+                            source_name=uploaded_file.name
+                        )
                         
                         # Final status
                         if "error" in result:
                             status.update(label=f"Error: {result['error']}", state="error")
                         else:
                             status.update(
-                                label=f"Success! Created collection: {result['collection_name']}", 
+                                label=f"Success! {result['message']}", 
                                 state="complete"
                             )
                             st.session_state.active_collection = result["collection_name"]
@@ -87,6 +140,12 @@ def upload_and_process_pdf():
                     # Display result
                     if "error" not in result:
                         st.success(f"Document processed successfully! Collection: {result['collection_name']}")
+                        stats = result.get("stats", {})
+                        if stats:
+                            st.caption(
+                                f"{stats['pages']} pages, {stats['chunks']} chunks in {stats['seconds']}s "
+                                f"({stats['pages_per_sec']} pages/s, {stats['chunks_per_sec']} chunks/s)"
+                            )
                         st.session_state.messages.append(
                             AIMessage(content=f"I've processed your document and created a collection named '{result['collection_name']}'. You can now ask questions about it!")
                         )
@@ -108,15 +167,17 @@ def display_collection_selector():
         col1, col2 = st.columns([4, 1])
         with col1:
             try:
-                db = get_qdrant_db()
+                db = get_database()
                 
                 # Add a refresh button
                 with col2:
                     if st.button("🔄", help="Refresh collections list"):
                         st.session_state.collections_refreshed = True
+                        clear_collection_cache()
+                        db.get_collections(refresh=True)
                         st.rerun()
                 
-                collections = db.get_collections()
+                collections = list_collections()
                 
                 if collections:
                     # Create a more informative dropdown with collection count
@@ -136,14 +197,25 @@ def display_collection_selector():
                         
                         # Add a button to view collection details
                         if st.button("View Collection Details"):
-                            # Query collection metadata (document count, etc.)
+                            # Read the collection metadata (point count, index state, sources) from Qdrant
                             try:
-                                # Use direct database query instead of document_query tool
-                                result = db.query_collection("", st.session_state.active_collection)
+                                result = collection_details(st.session_state.active_collection)
                                 if "error" not in result:
-                                    doc_count = len(result.get("results", []))
-                                    st.info(f"Collection '{st.session_state.active_collection}' contains {doc_count} documents/chunks.")
+                                    st.info(
+                                        f"Collection '{st.session_state.active_collection}' contains "
+                                        f"{result['points_count']} chunks from "
+                                        f"{len(result['sources']) if result['sources'] is not None else 'unknown'} files."
+                                    )
+                                    st.caption(
+                                        f"{result['vector_size']}-dimensional vectors, index {result['index_status']}, "
+                                        f"{result['segments_count']} segments, "
+                                        f"~{result['vectors_size_bytes'] / 2**20:.1f} MB of vectors"
+                                        f"{' on disk' if result['vectors_on_disk'] else ' in memory'}"
+                                    )
+                                    for source in result["sources"] or []:
+                                        st.markdown(f"- `{source['source']}`: {source['chunks']} chunks")
                                 else:
+                                    collection_details.clear()
                                     st.warning(f"Could not retrieve details: {result.get('error')}")
                             except Exception as e:
                                 st.error(f"Error retrieving collection details: {str(e)}")
@@ -167,8 +239,7 @@ def display_all_collections():
         return
         
     try:
-        db = get_qdrant_db()
-        collections = db.get_collections()
+        collections = list_collections()
         
         if not collections:
             st.info("No collections available yet. Upload a document to create one.")
@@ -211,18 +282,35 @@ def display_all_collections():
         st.error(f"Error loading collections: {str(e)}")
 
 def preview_collection_documents():
-    """Display a preview of documents in the currently selected collection."""
+    """Page through the documents in the currently selected collection."""
     if not DOCUMENT_TOOLS_AVAILABLE or not st.session_state.active_collection:
         return
     
+    collection = st.session_state.active_collection
     try:
-        # Get database instance
-        db = get_qdrant_db()
+        st.subheader(f"Preview of '{collection}'")
         
-        # Get a sample of documents from the collection using direct query
-        result = db.query_collection("Show me a sample of this document", st.session_state.active_collection)
+        # Filter by source file and page
+        details = collection_details(collection)
+        sources = [s["source"] for s in details.get("sources") or []]
+        col1, col2 = st.columns([3, 1])
+        source = col1.selectbox("Source file", options=["All files"] + sources, key="preview_source")
+        source = None if source == "All files" else source
+        page = col2.number_input("Page", min_value=0, step=1, value=None, placeholder="Any", key="preview_page")
+        
+        # Start from the first page whenever the collection or the filters change
+        filters = (collection, source, page)
+        if st.session_state.preview_filters != filters:
+            st.session_state.preview_filters = filters
+            st.session_state.preview_offsets = [None]
+        
+        # Get the current page of chunks, cached across reruns
+        offsets = st.session_state.preview_offsets
+        result = preview_documents(collection, offsets[-1], source, page)
         
         if "error" in result:
+            # Do not keep serving the failure from the cache
+            preview_documents.clear()
             st.warning(f"Could not retrieve documents: {result.get('error')}")
             return
             
@@ -231,18 +319,23 @@ def preview_collection_documents():
         if not documents:
             st.info("No documents found in this collection.")
             return
-            
-        st.subheader(f"Preview of '{st.session_state.active_collection}'")
         
-        # Show 3 document samples maximum
-        for i, doc in enumerate(documents[:3]):
-            with st.expander(f"Document sample {i+1}"):
-                st.markdown(doc.get("page_content", "No content"))
-                st.caption(f"Source: {doc.get('metadata', {}).get('source', 'Unknown')}, Page: {doc.get('metadata', {}).get('page', 'N/A')}")
-                
-        # If there are more than 3 documents, show a message
-        if len(documents) > 3:
-            st.caption(f"Showing 3 of {len(documents)} document chunks. Ask questions to search through all content.")
+        first = (len(offsets) - 1) * PREVIEW_PAGE_SIZE
+        for i, doc in enumerate(documents):
+            metadata = doc.get("metadata", {})
+            with st.expander(f"Chunk {first + i + 1}"):
+                st.markdown(doc.get("page_content") or "No content")
+                st.caption(f"Source: {metadata.get('doc_id') or metadata.get('source', 'Unknown')}, Page: {metadata.get('page', 'N/A')}")
+        
+        # Cursor pagination: every page is one scroll request, however deep it is
+        col1, col2, col3 = st.columns([1, 2, 1])
+        if col1.button("◀ Previous", disabled=len(offsets) == 1):
+            offsets.pop()
+            st.rerun()
+        col2.caption(f"Chunks {first + 1}-{first + len(documents)}")
+        if col3.button("Next ▶", disabled=result.get("next_offset") is None):
+            offsets.append(result["next_offset"])
+            st.rerun()
     
     except Exception as e:
         st.error(f"Error previewing documents: {str(e)}")
@@ -255,8 +348,8 @@ def diagnose_collection_issues():
     st.subheader("💻 Collection Diagnostics")
     
     try:
-        db = get_qdrant_db()
-        available_collections = db.get_collections()
+        db = get_database()
+        available_collections = list_collections()
         
         if not available_collections:
             st.warning("No collections are available in the database.")
@@ -401,27 +494,14 @@ def main():
         else:
             enhanced_prompt = prompt
             
-        # Run agent with user input
-        with st.spinner("Thinking..."):
-            # Create raw message for the graph
-            human_message = {"role": "user", "content": enhanced_prompt}
-            
-            # Invoke the graph
-            result = graph.invoke(
-                {"messages": [human_message]},
-                config=config
-            )
-            
-            # Extract AI response (skip human message)
-            if "messages" in result and len(result["messages"]) > 1:
-                ai_message = result["messages"][-1]
-                
-                # Add to display messages
-                st.session_state.messages.append(ai_message)
-                
-                # Display AI response
-                with st.chat_message("assistant"):
-                    st.write(ai_message.content)
+        # Run agent with user input, streaming the answer as it is generated
+        human_message = {"role": "user", "content": enhanced_prompt}
+        with st.chat_message("assistant"):
+            response = st.write_stream(stream_text(get_agent_graph(), {"messages": [human_message]}, config=config))
+        
+        # Add to display messages
+        if response:
+            st.session_state.messages.append(AIMessage(content=response))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,183 @@
+import json
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.graphs.agent_flow import WeatherDocumentAgent
+from src.graphs.answer_cache import SemanticAnswerCache, answered_collection, is_standalone, split_question
+
+
+class KeywordEmbeddings(Embeddings):
+    """Embeds text as word counts over a fixed vocabulary, so similar questions get similar vectors."""
+
+    VOCABULARY = ["revenue", "profit", "2023", "2024", "ceo", "who", "what", "was", "the", "is"]
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        words = text.lower().replace("?", "").split()
+        return [float(words.count(word)) for word in self.VOCABULARY]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def document_result(collection, status="success", results=None):
+    if results is None:
+        results = [{"content": "Revenue was $5M", "metadata": {}}]
+    result = {"status": status, "collection": collection, "results": results}
+    return ToolMessage(json.dumps(result), name="document_query", tool_call_id="call_1")
+
+
+def make_cache(**kwargs):
+    embeddings = KeywordEmbeddings()
+    return SemanticAnswerCache(lambda: embeddings, **kwargs), embeddings
+
+
+class TestSemanticAnswerCache:
+    """Tests for the semantic answer cache."""
+
+    def test_similar_question_hits(self):
+        cache, _ = make_cache(threshold=0.9)
+        cache.store("reports", "What was the revenue in 2023?", cache.embed("What was the revenue in 2023?"), "$5M")
+
+        assert cache.lookup("reports", cache.embed("what was the revenue in 2023")) == "$5M"
+        assert cache.stats()["hits"] == 1
+
+    def test_different_question_misses(self):
+        cache, _ = make_cache(threshold=0.9)
+        cache.store("reports", "What was the revenue in 2023?", cache.embed("What was the revenue in 2023?"), "$5M")
+
+        assert cache.lookup("reports", cache.embed("Who is the CEO?")) is None
+        assert cache.lookup("reports", cache.embed("What was the revenue in 2024?")) is None
+        assert cache.stats()["misses"] == 2
+
+    def test_collections_are_separate(self):
+        cache, _ = make_cache()
+        vector = cache.embed("What was the revenue in 2023?")
+        cache.store("reports", "What was the revenue in 2023?", vector, "$5M")
+
+        assert cache.lookup("manuals", vector) is None
+
+    def test_entries_expire(self, monkeypatch):
+        cache, _ = make_cache(ttl=10)
+        now = 1000.0
+        monkeypatch.setattr("src.graphs.answer_cache.time.time", lambda: now)
+        vector = cache.embed("Who is the CEO?")
+        cache.store("reports", "Who is the CEO?", vector, "Jane")
+
+        now = 1011.0
+        assert cache.lookup("reports", vector) is None
+        assert cache.stats()["size"] == 0
+
+    def test_oldest_entries_are_evicted(self):
+        cache, _ = make_cache(max_entries=2)
+        questions = ["Who is the CEO?", "What was the revenue in 2023?", "What was the profit in 2024?"]
+        for question in questions:
+            cache.store("reports", question, cache.embed(question), question.upper())
+
+        assert cache.lookup("reports", cache.embed(questions[0])) is None
+        assert cache.lookup("reports", cache.embed(questions[2])) == questions[2].upper()
+        assert cache.stats()["size"] == 2
+
+    def test_invalidate_collection(self):
+        cache, _ = make_cache()
+        vector = cache.embed("Who is the CEO?")
+        cache.store("reports", "Who is the CEO?", vector, "Jane")
+        cache.store("manuals", "Who is the CEO?", vector, "John")
+
+        cache.invalidate("reports")
+
+        assert cache.lookup("reports", vector) is None
+        assert cache.lookup("manuals", vector) == "John"
+
+        cache.invalidate()
+        assert cache.stats()["size"] == 0
+
+    def test_embeddings_created_on_first_use(self):
+        created = []
+        cache = SemanticAnswerCache(lambda: created.append(1) or KeywordEmbeddings())
+
+        assert created == []
+        cache.embed("Who is the CEO?")
+        cache.embed("Who is the CEO?")
+        assert created == [1]
+
+    def test_vectors_are_normalized(self):
+        cache, _ = make_cache()
+
+        assert np.isclose(np.linalg.norm(cache.embed("the the revenue")), 1.0)
+
+
+class TestAnswerCacheHelpers:
+    """Tests for deciding what is cached and under which collection."""
+
+    def test_split_question_with_collection_tag(self):
+        assert split_question("What is the revenue? [Collection: reports]") == ("What is the revenue?", "reports")
+
+    def test_split_question_without_tag(self):
+        assert split_question(" What is the revenue? ") == ("What is the revenue?", None)
+
+    def test_answer_from_one_collection_is_cacheable(self):
+        assert answered_collection([document_result("reports"), document_result("reports")]) == "reports"
+
+    def test_answers_using_other_tools_are_not_cached(self):
+        weather = ToolMessage(json.dumps({"location": "London"}), name="weather_tool", tool_call_id="call_2")
+
+        assert answered_collection([document_result("reports"), weather]) is None
+        assert answered_collection([document_result("reports"), document_result("manuals")]) is None
+        assert answered_collection([document_result("reports", status="error")]) is None
+        assert answered_collection([]) is None
+
+    def test_empty_retrieval_is_not_cached(self):
+        assert answered_collection([document_result("reports", results=[])]) is None
+
+    def test_only_opening_questions_are_standalone(self):
+        first = [HumanMessage("Who is the CEO?")]
+        follow_up = first + [AIMessage("Jane"), HumanMessage("And the CFO?")]
+
+        assert is_standalone({"messages": first})
+        assert not is_standalone({"messages": follow_up})
+        assert not is_standalone({"messages": first, "summary": "Earlier turns"})
+
+
+def make_agent(cache):
+    """An agent with only what the answer cache nodes use, without models or tools."""
+    agent = WeatherDocumentAgent.__new__(WeatherDocumentAgent)
+    agent.answer_cache = cache
+    agent.documents = None
+    return agent
+
+
+def answered_turn(question, history=()):
+    """The state after a document_query turn for question, following history."""
+    call = AIMessage("", tool_calls=[{"name": "document_query", "args": {}, "id": "call_1"}])
+    return {"messages": [*history, HumanMessage(question), call, document_result("reports")]}
+
+
+class TestAgentAnswerCache:
+    """Tests for the answer cache nodes of the agent across threads."""
+
+    def test_follow_up_in_another_thread_misses(self):
+        cache, _ = make_cache()
+        agent = make_agent(cache)
+        question = "What was the revenue in 2023? [Collection: reports]"
+        # Thread A asks the question first, thread B after talking about another company
+        agent._store_answer(answered_turn(question), AIMessage("$5M"))
+        history_b = [HumanMessage("Tell me about Globex [Collection: reports]"), AIMessage("Globex is ...")]
+
+        assert agent.check_answer_cache({"messages": [*history_b, HumanMessage(question)]}) == {}
+        assert agent.check_answer_cache({"messages": [HumanMessage(question)]})["messages"][0].text() == "$5M"
+
+    def test_follow_up_answers_are_not_cached(self):
+        cache, _ = make_cache()
+        agent = make_agent(cache)
+        history = [HumanMessage("Tell me about Globex [Collection: reports]"), AIMessage("Globex is ...")]
+
+        agent._store_answer(answered_turn("What was the revenue in 2023? [Collection: reports]", history),
+                            AIMessage("$7M"))
+
+        assert cache.stats()["size"] == 0
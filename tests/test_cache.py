@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+from src.tools.cache import TTLCache
+
+
+class TestTTLCache:
+    """Tests for the TTL cache with request coalescing."""
+
+    def test_hit_within_ttl(self):
+        cache = TTLCache(ttl=60)
+        calls = []
+
+        assert cache.get_or_load("a", lambda: calls.append(1) or "value") == "value"
+        assert cache.get_or_load("a", lambda: calls.append(1) or "other") == "value"
+
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_expired_entry_is_reloaded(self):
+        cache = TTLCache(ttl=0.05)
+        cache.get_or_load("a", lambda: 1)
+        time.sleep(0.06)
+
+        assert cache.get_or_load("a", lambda: 2) == 2
+
+    def test_size_bound_evicts_least_recently_used(self):
+        cache = TTLCache(ttl=60, max_size=2)
+        cache.get_or_load("a", lambda: 1)
+        cache.get_or_load("b", lambda: 2)
+        cache.get_or_load("a", lambda: 1)
+        cache.get_or_load("c", lambda: 3)
+
+        assert cache.get_or_load("a", lambda: "reloaded") == 1
+        assert cache.get_or_load("b", lambda: "reloaded") == "reloaded"
+        assert cache.stats()["evictions"] >= 1
+
+    def test_cache_if_skips_values(self):
+        cache = TTLCache(ttl=60, cache_if=lambda value: value != "error")
+        cache.get_or_load("a", lambda: "error")
+
+        assert cache.get_or_load("a", lambda: "ok") == "ok"
+
+    def test_concurrent_misses_are_coalesced(self):
+        cache = TTLCache(ttl=60)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load("a", loader)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["value"] * 8
+        assert len(calls) == 1
+        assert cache.stats()["coalesced"] == 7
+
+    def test_loader_errors_reach_coalesced_callers(self):
+        cache = TTLCache(ttl=60)
+
+        async def loader():
+            await asyncio.sleep(0.05)
+            raise RuntimeError("boom")
+
+        async def run():
+            return await asyncio.gather(
+                cache.aget_or_load("a", loader), cache.aget_or_load("a", loader), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert cache.stats()["misses"] == 1
+
+    def test_async_concurrent_misses_are_coalesced(self):
+        cache = TTLCache(ttl=60)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "value"
+
+        async def run():
+            return await asyncio.gather(*(cache.aget_or_load("a", loader) for _ in range(5)))
+
+        assert asyncio.run(run()) == ["value"] * 5
+        assert len(calls) == 1
+
+    def test_stale_while_revalidate(self):
+        cache = TTLCache(ttl=0.05, stale_ttl=60)
+        cache.get_or_load("a", lambda: "old")
+        time.sleep(0.06)
+        refreshed = threading.Event()
+
+        def loader():
+            refreshed.set()
+            return "new"
+
+        assert cache.get_or_load("a", loader) == "old"
+        assert refreshed.wait(1)
+        deadline = time.monotonic() + 1
+        while cache.get_or_load("a", loader) != "new":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert cache.stats()["stale_hits"] >= 1
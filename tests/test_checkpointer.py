@@ -0,0 +1,185 @@
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from src.graphs.checkpointer import BoundedMemorySaver, SQLiteSaver, create_checkpointer
+
+
+def echo(state: MessagesState):
+    return {"messages": [AIMessage(f"echo: {state['messages'][-1].content}")]}
+
+
+def build_graph(checkpointer):
+    builder = StateGraph(MessagesState)
+    builder.add_node("echo", echo)
+    builder.add_edge(START, "echo")
+    builder.add_edge("echo", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def chat(graph, thread_id, text):
+    config = {"configurable": {"thread_id": thread_id}}
+    return graph.invoke({"messages": [HumanMessage(text)]}, config)["messages"]
+
+
+class TestBoundedMemorySaver:
+    """Tests for the in-memory checkpointer with thread eviction."""
+
+    def test_keeps_conversation_history(self):
+        graph = build_graph(BoundedMemorySaver(max_threads=10))
+        chat(graph, "a", "hi")
+
+        assert len(chat(graph, "a", "again")) == 4
+
+    def test_evicts_least_recently_used_thread(self):
+        saver = BoundedMemorySaver(max_threads=2, idle_ttl=None)
+        graph = build_graph(saver)
+        chat(graph, "a", "hi")
+        chat(graph, "b", "hi")
+        chat(graph, "a", "hi again")
+        chat(graph, "c", "hi")
+
+        assert saver.stats() == {"threads": 2, "evictions": 1}
+        assert "b" not in saver.storage
+        assert len(chat(graph, "a", "still here")) == 6
+
+    def test_evicted_thread_releases_all_entries(self):
+        saver = BoundedMemorySaver(max_threads=1, idle_ttl=None)
+        graph = build_graph(saver)
+        chat(graph, "a", "hi")
+        chat(graph, "b", "hi")
+
+        assert "a" not in saver.storage
+        assert all(key[0] == "b" for key in saver.blobs)
+        assert all(key[0] == "b" for key in saver.writes)
+
+    def test_idle_threads_expire(self):
+        saver = BoundedMemorySaver(max_threads=10, idle_ttl=0.05)
+        graph = build_graph(saver)
+        chat(graph, "a", "hi")
+        time.sleep(0.06)
+
+        assert len(chat(graph, "a", "hi again")) == 2
+
+    def test_keeps_last_checkpoints_per_thread(self):
+        saver = BoundedMemorySaver(max_threads=10, idle_ttl=None, keep_last=3)
+        graph = build_graph(saver)
+        for turn in range(5):
+            messages = chat(graph, "a", f"turn {turn}")
+
+        assert len(messages) == 10
+        assert len(saver.storage["a"][""]) == 3
+        # Only the blobs of the kept checkpoints remain
+        assert len(saver.blobs) < 3 * 3
+        assert len(list(saver.list({"configurable": {"thread_id": "a"}}))) == 3
+
+
+class TestSQLiteSaver:
+    """Tests for the persistent SQLite checkpointer."""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        return str(tmp_path / "checkpoints.sqlite")
+
+    def test_history_survives_restart(self, path):
+        saver = SQLiteSaver(path)
+        chat(build_graph(saver), "a", "hi")
+        saver.close()
+
+        reopened = SQLiteSaver(path)
+        messages = chat(build_graph(reopened), "a", "again")
+        reopened.close()
+
+        assert [m.content for m in messages] == ["hi", "echo: hi", "again", "echo: again"]
+
+    def test_uses_wal_mode(self, path):
+        saver = SQLiteSaver(path)
+        mode = saver._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        saver.close()
+
+        assert mode == "wal"
+
+    def test_writes_are_batched_but_visible_to_reads(self, path):
+        saver = SQLiteSaver(path, flush_interval=60, batch_size=10_000)
+        graph = build_graph(saver)
+        chat(graph, "a", "hi")
+
+        assert saver._pending
+        assert len(chat(graph, "a", "again")) == 4
+        saver.close()
+
+    def test_list_filters_and_limits(self, path):
+        saver = SQLiteSaver(path)
+        graph = build_graph(saver)
+        chat(graph, "a", "hi")
+        chat(graph, "b", "hi")
+        config = {"configurable": {"thread_id": "a"}}
+
+        checkpoints = list(saver.list(config))
+        inputs = list(saver.list(config, filter={"source": "input"}))
+        latest = list(saver.list(None, limit=1))
+        saver.close()
+
+        assert len(checkpoints) == 3
+        assert len(inputs) == 1
+        assert len(latest) == 1
+
+    def test_keeps_last_checkpoints_per_thread(self, path):
+        saver = SQLiteSaver(path, keep_last=3)
+        graph = build_graph(saver)
+        for turn in range(5):
+            messages = chat(graph, "a", f"turn {turn}")
+        chat(graph, "b", "hi")
+        saver.flush()
+
+        counts = dict(saver._conn.execute("SELECT thread_id, COUNT(*) FROM checkpoints GROUP BY thread_id"))
+        orphaned = saver._conn.execute(
+            "SELECT COUNT(*) FROM writes WHERE checkpoint_id NOT IN (SELECT checkpoint_id FROM checkpoints)"
+        ).fetchone()[0]
+        saver.close()
+
+        assert len(messages) == 10
+        assert counts == {"a": 3, "b": 3}
+        assert orphaned == 0
+
+    def test_idle_threads_expire(self, path):
+        saver = SQLiteSaver(path, idle_ttl=3600)
+        graph = build_graph(saver)
+        chat(graph, "a", "hi")
+        chat(graph, "b", "hi")
+        saver.flush()
+        saver._conn.execute("UPDATE threads SET last_write = last_write - 7200 WHERE thread_id = 'a'")
+
+        assert saver.prune_idle() == 1
+        assert saver.get_tuple({"configurable": {"thread_id": "a"}}) is None
+        assert len(chat(graph, "b", "again")) == 4
+        saver.close()
+
+    def test_delete_thread(self, path):
+        saver = SQLiteSaver(path)
+        chat(build_graph(saver), "a", "hi")
+        saver.delete_thread("a")
+
+        assert saver.get_tuple({"configurable": {"thread_id": "a"}}) is None
+        saver.close()
+
+    def test_async_graph(self, path):
+        import asyncio
+
+        saver = SQLiteSaver(path)
+        graph = build_graph(saver)
+        config = {"configurable": {"thread_id": "a"}}
+        asyncio.run(graph.ainvoke({"messages": [HumanMessage("hi")]}, config))
+        result = asyncio.run(graph.ainvoke({"messages": [HumanMessage("again")]}, config))
+        saver.close()
+
+        assert len(result["messages"]) == 4
+
+
+def test_create_checkpointer():
+    assert isinstance(create_checkpointer("memory"), BoundedMemorySaver)
+    assert create_checkpointer("none") is None
+    with pytest.raises(ValueError):
+        create_checkpointer("redis")
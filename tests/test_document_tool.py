@@ -149,4 +149,384 @@ class TestDocumentTool:
         assert result["error"] == "Invalid PDF file"
         
         # Verify the create_collection method was called
-        mock_create_collection.assert_called_once()
\ No newline at end of file
+        mock_create_collection.assert_called_once()
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Create a QdrantDatabase with the Qdrant client and vector store mocked out."""
+    # Keep the used documents folder inside the test directory
+    monkeypatch.chdir(tmp_path)
+    with patch('qdrant_client.QdrantClient') as mock_client_cls, \
+            patch('langchain_qdrant.QdrantVectorStore') as mock_store_cls:
+        client = mock_client_cls.return_value
+        collection = MagicMock()
+        collection.name = "test_collection"
+        client.get_collections.return_value = MagicMock(collections=[collection])
+
+        retriever = MagicMock()
+        retriever.invoke.return_value = []
+        mock_store_cls.return_value.as_retriever.return_value = retriever
+
+        from src.tools.document import QdrantDatabase
+        database = QdrantDatabase(embeddings=MagicMock(embed_query=MagicMock(return_value=[0.1, 0.2])))
+        client.query_points.return_value = MagicMock(points=[])
+        database.mock_store_cls = mock_store_cls
+        database.mock_retriever = retriever
+        yield database
+
+
+class TestQdrantDatabaseCache:
+    """Test suite for the collection checks and listing cache of QdrantDatabase."""
+
+    def test_warm_query_skips_collection_lookups(self, db):
+        """Test that a second query trusts the recent check of the collection."""
+        db.query_collection("first query", "test_collection")
+        db.query_collection("second query", "test_collection")
+
+        assert db.qdrant_client.get_collections.call_count == 1
+        assert db.mock_store_cls.call_count == 1
+        assert db.qdrant_client.query_points.call_count == 2
+
+    def test_invalidate_cache_checks_collection_again(self, db):
+        """Test that invalidating a collection makes the next query look it up again."""
+        db.query_collection("query", "test_collection")
+        db.invalidate_cache("test_collection")
+        db.query_collection("query", "test_collection")
+
+        assert db.qdrant_client.get_collections.call_count == 2
+        assert db.mock_store_cls.call_count == 2
+
+    def test_unknown_collection_refreshes_listing(self, db):
+        """Test that a collection missing from the cached listing triggers one refresh."""
+        db.get_collections()
+        result = db.query_collection("query", "missing_collection")
+
+        assert "error" in result
+        assert result["available_collections"] == ["test_collection"]
+        assert db.qdrant_client.get_collections.call_count == 2
+
+    def test_stale_listing_is_returned_while_refreshing(self, db):
+        """Test that an expired listing is served while a background refresh runs."""
+        db.get_collections()
+        db._collections_fetched_at -= 3600
+
+        with patch('src.tools.document.threading.Thread') as mock_thread:
+            assert db.get_collections() == ["test_collection"]
+            mock_thread.return_value.start.assert_called_once()
+
+
+class TestBulkIngestion:
+    """Test suite for QdrantDatabase.ingest_files."""
+
+    def test_resume_skips_files_in_manifest(self, db, make_pdf, tmp_path):
+        """Test that files recorded in the manifest are not ingested again."""
+        done = make_pdf("docs/done.pdf", ["Already ingested"])
+        make_pdf("docs/new.pdf", ["Not yet ingested"])
+        manifest_path = str(tmp_path / "manifest.json")
+
+        from src.tools.ingestion import IngestionManifest
+        IngestionManifest(manifest_path).mark_done(done, 1)
+
+        db.ingestion = MagicMock()
+        db.ingestion.ingest_files.return_value = {"files": 1, "failed": [], "pages": 1, "chunks": 1}
+        result = db.ingest_files(str(tmp_path / "docs"), "manuals", manifest_path=manifest_path)
+
+        assert result["status"] == "success"
+        assert result["stats"]["skipped"] == 1
+        args, kwargs = db.ingestion.ingest_files.call_args
+        assert [os.path.basename(path) for path in args[1]] == ["new.pdf"]
+
+    def test_no_matching_files(self, db, tmp_path):
+        """Test that an empty directory returns an error."""
+        result = db.ingest_files(str(tmp_path), "manuals")
+        assert "error" in result
+
+
+class TestContentAddressedIngestion:
+    """Test suite for the content hashing in QdrantDatabase.create_collection."""
+
+    def test_same_file_maps_to_same_collection(self, db, make_pdf):
+        """Test that uploading identical content twice targets one collection and document."""
+        first = make_pdf("upload_1.pdf", ["Refund policy"])
+        second = make_pdf("upload_2.pdf", ["Refund policy"])
+        db.ingestion = MagicMock()
+        db.ingestion.run.return_value = {"pages": 1, "chunks": 1, "skipped_chunks": 0,
+                                         "deleted_chunks": 0, "unchanged": False}
+
+        result_1 = db.create_collection(first, source_name="policy.pdf")
+        result_2 = db.create_collection(second, source_name="policy.pdf")
+
+        assert result_1["collection_name"] == result_2["collection_name"]
+        assert result_1["collection_name"].startswith("policy_")
+        hashes = {call.kwargs["file_hash"] for call in db.ingestion.run.call_args_list}
+        assert len(hashes) == 1
+        assert db.ingestion.run.call_args.kwargs["doc_id"] == "policy.pdf"
+
+    def test_different_files_with_same_name_get_separate_collections(self, db, make_pdf):
+        """Test that an unrelated file with the same name does not replace the earlier upload."""
+        first = make_pdf("upload_1.pdf", ["Quarterly report for sales"])
+        second = make_pdf("upload_2.pdf", ["Quarterly report for engineering"])
+        db.ingestion = MagicMock()
+        db.ingestion.run.return_value = {"pages": 1, "chunks": 1, "skipped_chunks": 0,
+                                         "deleted_chunks": 0, "unchanged": False}
+
+        result_1 = db.create_collection(first, source_name="report.pdf")
+        result_2 = db.create_collection(second, source_name="report.pdf")
+
+        assert result_1["collection_name"] != result_2["collection_name"]
+        collections = {call.args[0] for call in db.ingestion.run.call_args_list}
+        assert collections == {result_1["collection_name"], result_2["collection_name"]}
+
+    def test_explicit_collection_ingests_a_revision(self, db, make_pdf):
+        """Test that an edited file ingested into a named collection updates the same document."""
+        first = make_pdf("upload_1.pdf", ["Refund policy"])
+        second = make_pdf("upload_2.pdf", ["Refund policy, revised"])
+        db.ingestion = MagicMock()
+        db.ingestion.run.return_value = {"pages": 1, "chunks": 1, "skipped_chunks": 0,
+                                         "deleted_chunks": 0, "unchanged": False}
+
+        result_1 = db.create_collection(first, "policies", source_name="policy.pdf")
+        result_2 = db.create_collection(second, "policies", source_name="policy.pdf")
+
+        assert result_1["collection_name"] == result_2["collection_name"] == "policies"
+        doc_ids = {call.kwargs["doc_id"] for call in db.ingestion.run.call_args_list}
+        assert doc_ids == {"policy.pdf"}
+        hashes = {call.kwargs["file_hash"] for call in db.ingestion.run.call_args_list}
+        assert len(hashes) == 2
+
+    def test_explicit_doc_id_overrides_source_name(self, db, make_pdf):
+        """Test that a caller-supplied document ID is used for the revision."""
+        path = make_pdf("upload_1.pdf", ["Refund policy"])
+        db.ingestion = MagicMock()
+        db.ingestion.run.return_value = {"pages": 1, "chunks": 1, "skipped_chunks": 0,
+                                         "deleted_chunks": 0, "unchanged": False}
+
+        db.create_collection(path, "policies", source_name="policy.pdf", doc_id="emea/policy.pdf")
+
+        assert db.ingestion.run.call_args.kwargs["doc_id"] == "emea/policy.pdf"
+
+
+class TestAsyncDocumentQuery:
+    """Test suite for the async document query path."""
+
+    def test_aquery_collection(self, db):
+        """Test that the async query embeds asynchronously and searches with the async client."""
+        import asyncio
+        from unittest.mock import AsyncMock
+
+        collection = MagicMock()
+        collection.name = "test_collection"
+        point = MagicMock(id="point-1", payload=SAMPLE_DOCUMENT_RESULTS[0])
+        async_client = MagicMock()
+        async_client.get_collections = AsyncMock(return_value=MagicMock(collections=[collection]))
+        async_client.query_points = AsyncMock(return_value=MagicMock(points=[point]))
+        db.async_qdrant_client = MagicMock(get=MagicMock(return_value=async_client))
+        db.embeddings = MagicMock(aembed_query=AsyncMock(return_value=[0.1, 0.2]))
+
+        result = asyncio.run(db.aquery_collection("test query", "test_collection"))
+
+        assert result["status"] == "success"
+        assert result["results"][0]["page_content"] == "This is a sample document for testing."
+        assert result["results"][0]["metadata"]["source"] == "test_doc.pdf"
+        db.embeddings.aembed_query.assert_awaited_once_with("test query")
+        assert async_client.query_points.call_args.kwargs["with_vectors"] is False
+
+    def test_document_query_tool_has_async_implementation(self):
+        """Test that the tool dispatches ainvoke to the async query."""
+        import asyncio
+        from unittest.mock import AsyncMock
+
+        with patch('src.tools.document.QdrantDatabase.aquery_collection', new_callable=AsyncMock) as mock_query:
+            mock_query.return_value = SAMPLE_COLLECTION_RESPONSE
+            result = asyncio.run(document_query.ainvoke({"query": "test query", "collection_name": "test_collection"}))
+
+        assert result["collection"] == "test_collection"
+        mock_query.assert_awaited_once_with("test query", "test_collection")
+
+
+class TestInjectedClients:
+    """Test suite for running QdrantDatabase against local stand-ins."""
+
+    def test_query_in_memory_qdrant(self, tmp_path, monkeypatch):
+        """Test that an injected in-memory client and embeddings serve ingestion and queries."""
+        from langchain_core.documents import Document
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        from qdrant_client import QdrantClient
+        from src.tools.document import QdrantDatabase
+
+        monkeypatch.chdir(tmp_path)
+        with patch('qdrant_client.QdrantClient') as mock_client_cls:
+            database = QdrantDatabase(
+                qdrant_client=QdrantClient(":memory:"),
+                embeddings=DeterministicFakeEmbedding(size=16),
+            )
+        mock_client_cls.assert_not_called()
+
+        database.ingestion.run("notes", [Document(page_content="Qdrant runs in memory.",
+                                                  metadata={"source": "notes.pdf", "page": 0})])
+        result = database.query_collection("Qdrant runs in memory.", "notes")
+
+        assert result["status"] == "success"
+        assert result["results"][0]["page_content"] == "Qdrant runs in memory."
+
+
+@pytest.fixture
+def in_memory_db(tmp_path, monkeypatch):
+    """Create a QdrantDatabase on an in-memory Qdrant holding a.pdf (3 pages) and b.pdf (1 page)."""
+    from langchain_core.documents import Document
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    from qdrant_client import QdrantClient
+    from src.tools.document import QdrantDatabase
+    from src.tools.embedding_cache import CachedEmbeddings
+
+    monkeypatch.chdir(tmp_path)
+    # Query embeddings are counted as cache hits and misses
+    embeddings = CachedEmbeddings(DeterministicFakeEmbedding(size=16), model="fake")
+    database = QdrantDatabase(qdrant_client=QdrantClient(":memory:"), embeddings=embeddings)
+    for source, pages in (("a.pdf", 3), ("b.pdf", 1)):
+        database.ingestion.run("notes", [
+            Document(page_content=f"Page {page} of {source}.", metadata={"source": source, "page": page})
+            for page in range(pages)
+        ], doc_id=source, file_hash=source)
+    return database
+
+
+def query_embeddings(database):
+    """Number of query embeddings requested from the database's embeddings so far."""
+    return database.embeddings.hits + database.embeddings.misses
+
+
+class TestCollectionStats:
+    """Test suite for the collection_stats API and tool."""
+
+    def test_reports_metadata_without_embedding(self, in_memory_db):
+        """Test that the stats come from Qdrant metadata and nothing is embedded."""
+        result = in_memory_db.collection_stats("notes")
+
+        assert result["status"] == "success"
+        assert result["points_count"] == 4
+        assert result["vector_size"] == 16
+        assert result["vectors_size_bytes"] == 4 * 16 * 4
+        assert result["index_status"] == "green"
+        assert result["segments_count"] >= 1
+        assert {s["source"]: s["chunks"] for s in result["sources"]} == {"a.pdf": 3, "b.pdf": 1}
+        assert query_embeddings(in_memory_db) == 0
+
+    def test_missing_collection(self, in_memory_db):
+        """Test that an unknown collection returns the available ones."""
+        result = in_memory_db.collection_stats("missing")
+
+        assert result["error"] == "Collection 'missing' not found."
+        assert result["available_collections"] == ["notes"]
+
+    @patch('src.tools.document.get_qdrant_db')
+    def test_tool_dispatches_to_database(self, mock_get_db):
+        """Test that the collection_stats tool calls QdrantDatabase.collection_stats."""
+        from src.tools.document import collection_stats
+
+        mock_get_db.return_value.collection_stats.return_value = {"status": "success", "points_count": 4}
+        result = collection_stats.invoke({"collection_name": "notes"})
+
+        assert result["points_count"] == 4
+        mock_get_db.return_value.collection_stats.assert_called_once_with("notes")
+
+
+class TestBrowseCollection:
+    """Test suite for scroll-based browsing of a collection."""
+
+    def test_pages_through_every_chunk(self, in_memory_db):
+        """Test that following next_offset visits every chunk once without embedding."""
+        seen, offset = [], None
+        while True:
+            result = in_memory_db.browse_collection("notes", limit=3, offset=offset)
+            assert result["status"] == "success"
+            assert len(result["results"]) <= 3
+            seen.extend(chunk["page_content"] for chunk in result["results"])
+            offset = result["next_offset"]
+            if offset is None:
+                break
+
+        assert sorted(seen) == ["Page 0 of a.pdf.", "Page 0 of b.pdf.", "Page 1 of a.pdf.", "Page 2 of a.pdf."]
+        assert query_embeddings(in_memory_db) == 0
+
+    def test_filters_by_source_and_page(self, in_memory_db):
+        """Test the source and page filters."""
+        by_source = in_memory_db.browse_collection("notes", source="a.pdf")
+        by_page = in_memory_db.browse_collection("notes", source="a.pdf", page=1)
+
+        assert len(by_source["results"]) == 3
+        assert [chunk["page_content"] for chunk in by_page["results"]] == ["Page 1 of a.pdf."]
+        assert by_page["results"][0]["metadata"] == {"doc_id": "a.pdf", "source": "a.pdf", "page": 1}
+
+    def test_payload_field_selection(self, in_memory_db):
+        """Test that only the requested payload fields are returned."""
+        result = in_memory_db.browse_collection("notes", limit=1, payload_fields=["metadata.page"])
+
+        assert result["results"][0]["page_content"] == ""
+        assert set(result["results"][0]["metadata"]) == {"page"}
+
+
+class TestRetrievalOptions:
+    """Test suite for the configurable retrieval of query_collection."""
+
+    def test_results_carry_scores(self, in_memory_db):
+        """Test that results are ranked by score and limited to k."""
+        result = in_memory_db.query_collection("Page 1 of a.pdf.", "notes", k=2)
+
+        scores = [chunk["score"] for chunk in result["results"]]
+        assert len(scores) == 2
+        assert result["results"][0]["page_content"] == "Page 1 of a.pdf."
+        assert scores[0] == pytest.approx(1.0)
+        assert scores == sorted(scores, reverse=True)
+
+    def test_score_threshold_drops_weak_matches(self, in_memory_db):
+        """Test that chunks below the score threshold are not returned."""
+        result = in_memory_db.query_collection("Page 1 of a.pdf.", "notes", k=4, score_threshold=0.99)
+
+        assert [chunk["page_content"] for chunk in result["results"]] == ["Page 1 of a.pdf."]
+
+    def test_filters_by_source_and_page(self, in_memory_db):
+        """Test the source and page filters."""
+        by_source = in_memory_db.query_collection("Page 1 of a.pdf.", "notes", source="b.pdf")
+        by_page = in_memory_db.query_collection("anything", "notes", source="a.pdf", page=2)
+
+        assert [chunk["page_content"] for chunk in by_source["results"]] == ["Page 0 of b.pdf."]
+        assert [chunk["page_content"] for chunk in by_page["results"]] == ["Page 2 of a.pdf."]
+
+    def test_mmr_returns_k_distinct_chunks(self, in_memory_db):
+        """Test that MMR selects k distinct chunks from the candidates."""
+        result = in_memory_db.query_collection("Page 1 of a.pdf.", "notes", k=3, mmr=True)
+
+        contents = [chunk["page_content"] for chunk in result["results"]]
+        assert len(set(contents)) == 3
+        assert contents[0] == "Page 1 of a.pdf."
+
+    def test_metadata_field_selection(self, in_memory_db):
+        """Test that only the requested metadata keys are fetched and returned."""
+        result = in_memory_db.query_collection("Page 1 of a.pdf.", "notes", k=1, metadata_fields=["page"])
+
+        assert result["results"][0]["metadata"] == {"page": 1}
+
+    @patch('src.tools.document.get_qdrant_db')
+    def test_tool_passes_only_given_options(self, mock_get_db):
+        """Test that the tool forwards the options a call sets and leaves the rest to the defaults."""
+        document_query.invoke({"query": "refunds", "collection_name": "notes", "k": 2, "source": "a.pdf"})
+
+        mock_get_db.return_value.query_collection.assert_called_once_with("refunds", "notes", k=2, source="a.pdf")
+
+    @patch('src.tools.document.get_qdrant_db')
+    def test_tool_passes_metadata_fields(self, mock_get_db):
+        """Test that the tool accepts the metadata keys to return."""
+        document_query.invoke({"query": "refunds", "page": 0, "metadata_fields": ["source", "page"]})
+
+        mock_get_db.return_value.query_collection.assert_called_once_with(
+            "refunds", None, page=0, metadata_fields=["source", "page"]
+        )
+
+    def test_tool_schema_describes_every_argument(self):
+        """Test that each tool argument is described in the schema sent to the model."""
+        properties = document_query.tool_call_schema.model_json_schema()["properties"]
+
+        assert set(properties) == {"query", "collection_name", "k", "score_threshold", "mmr",
+                                   "source", "page", "metadata_fields"}
+        assert all(field.get("description") for field in properties.values())
@@ -0,0 +1,111 @@
+import pytest
+import asyncio
+from unittest.mock import MagicMock, AsyncMock
+from src.tools.embedding_cache import CachedEmbeddings, normalize_text
+
+
+def make_embeddings():
+    """Create a mock embeddings object returning a vector derived from the text length."""
+    embeddings = MagicMock()
+    embeddings.model = "test-model"
+    embeddings.embed_query.side_effect = lambda text: [float(len(text)), 1.0]
+    embeddings.embed_documents.side_effect = lambda texts: [[float(len(t)), 0.0] for t in texts]
+    embeddings.aembed_query = AsyncMock(side_effect=lambda text: [float(len(text)), 1.0])
+    return embeddings
+
+
+def test_normalize_text():
+    """Test that whitespace differences map to the same cache key."""
+    assert normalize_text("  Test   query\n") == "Test query"
+
+
+def test_repeated_query_is_served_from_cache():
+    """Test that the same query is only embedded once."""
+    inner = make_embeddings()
+    cache = CachedEmbeddings(inner)
+
+    first = cache.embed_query("Test query")
+    second = cache.embed_query("Test  query ")
+
+    assert first == second
+    inner.embed_query.assert_called_once()
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["model"] == "test-model"
+
+
+def test_async_query_shares_the_cache():
+    """Test that the async path reads entries written by the sync path."""
+    inner = make_embeddings()
+    cache = CachedEmbeddings(inner)
+
+    cache.embed_query("Show me a sample of this document")
+    asyncio.run(cache.aembed_query("Show me a sample of this document"))
+
+    inner.aembed_query.assert_not_called()
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    inner = make_embeddings()
+    cache = CachedEmbeddings(inner, max_size=2)
+
+    cache.embed_query("a")
+    cache.embed_query("bb")
+    cache.embed_query("a")
+    cache.embed_query("ccc")
+    cache.embed_query("bb")
+
+    assert inner.embed_query.call_count == 4
+    assert cache.stats()["size"] == 2
+
+
+def test_documents_bypass_cache_by_default():
+    """Test that document embeddings are not cached unless requested."""
+    inner = make_embeddings()
+    cache = CachedEmbeddings(inner)
+
+    cache.embed_documents(["one", "two"])
+    cache.embed_documents(["one", "two"])
+
+    assert inner.embed_documents.call_count == 2
+
+
+def test_documents_only_embed_misses():
+    """Test that only uncached documents are sent to the wrapped embeddings."""
+    inner = make_embeddings()
+    cache = CachedEmbeddings(inner, cache_documents=True)
+
+    cache.embed_documents(["one", "two"])
+    vectors = cache.embed_documents(["two", "three", "three"])
+
+    assert vectors == [[3.0, 0.0], [5.0, 0.0], [5.0, 0.0]]
+    inner.embed_documents.assert_called_with(["three"])
+
+
+def test_query_and_document_keys_are_separate():
+    """Test that a query and a document with the same text do not share an entry."""
+    inner = make_embeddings()
+    cache = CachedEmbeddings(inner, cache_documents=True)
+
+    cache.embed_documents(["same text"])
+    cache.embed_query("same text")
+
+    inner.embed_query.assert_called_once()
+
+
+def test_persistent_tier(tmp_path):
+    """Test that vectors survive a new cache instance through the SQLite tier."""
+    path = str(tmp_path / "embeddings.sqlite")
+    cache = CachedEmbeddings(make_embeddings(), persist_path=path)
+    cache.embed_query("Test query")
+    cache.store.close()
+
+    inner = make_embeddings()
+    reopened = CachedEmbeddings(inner, persist_path=path)
+    vector = reopened.embed_query("Test query")
+
+    assert vector == pytest.approx([10.0, 1.0])
+    inner.embed_query.assert_not_called()
+    assert reopened.stats()["disk_hits"] == 1
@@ -0,0 +1,88 @@
+import json
+
+from langchain_core.messages import ToolMessage
+
+from src.graphs.formatters import FORMATTERS, ToolResultFormatter
+
+WEATHER_RESULT = {
+    "location": "London",
+    "country": "GB",
+    "weather": "overcast clouds",
+    "temperature": 15.5,
+    "feels_like": 14.9,
+    "humidity": 71,
+    "wind_speed": 3.6,
+    "timestamp": 1682084645,
+}
+
+
+def tool_message(name, result, status="success"):
+    return ToolMessage(json.dumps(result), name=name, tool_call_id=f"call_{name}", status=status)
+
+
+def all_templates():
+    """A formatter with every template enabled, including the opt-in weather one."""
+    return ToolResultFormatter(tools=list(FORMATTERS))
+
+
+class TestToolResultFormatter:
+    """Tests for the template fast path after the tools step."""
+
+    def test_weather_is_not_on_the_fast_path_by_default(self):
+        assert ToolResultFormatter().format([tool_message("weather_tool", WEATHER_RESULT)]) is None
+
+    def test_formats_weather(self):
+        text = all_templates().format([tool_message("weather_tool", WEATHER_RESULT)])
+
+        assert text == (
+            "Current weather in London, GB: overcast clouds, 15.5°C (feels like 14.9°C), "
+            "humidity 71%, wind 3.6 m/s."
+        )
+
+    def test_formats_several_results(self):
+        text = all_templates().format([
+            tool_message("weather_tool", WEATHER_RESULT),
+            tool_message("list_collections", {"status": "success", "collections": ["manuals", "reports"]}),
+        ])
+
+        assert text.splitlines()[1] == "Available document collections: manuals, reports."
+
+    def test_formats_collection_stats(self):
+        result = {
+            "status": "success", "collection": "manuals", "points_count": 120, "vector_size": 1024,
+            "index_status": "green", "segments_count": 2, "sources": [{"source": "a.pdf", "chunks": 120}],
+        }
+
+        text = ToolResultFormatter().format([tool_message("collection_stats", result)])
+
+        assert text == (
+            "Collection manuals holds 120 chunks (1024-dimensional vectors, index green, 2 segments). "
+            "Sources: a.pdf (120 chunks)."
+        )
+
+    def test_error_results_fall_back_to_llm(self):
+        formatter = all_templates()
+
+        assert formatter.format([tool_message("weather_tool", {"error": "Failed to fetch weather data"})]) is None
+        assert formatter.format([tool_message("weather_tool", WEATHER_RESULT, status="error")]) is None
+
+    def test_unformatted_tool_falls_back_to_llm(self):
+        messages = [
+            tool_message("weather_tool", WEATHER_RESULT),
+            tool_message("document_query", {"status": "success", "results": []}),
+        ]
+
+        assert all_templates().format(messages) is None
+
+    def test_fast_path_is_configurable_per_tool(self):
+        formatter = ToolResultFormatter(tools=["list_collections"])
+
+        assert formatter.format([tool_message("weather_tool", WEATHER_RESULT)]) is None
+
+        formatter.register("weather_tool", lambda result: f"{result['temperature']}°C")
+        assert formatter.format([tool_message("weather_tool", WEATHER_RESULT)]) == "15.5°C"
+
+    def test_unparseable_output_falls_back_to_llm(self):
+        message = ToolMessage("not json", name="weather_tool", tool_call_id="c1")
+
+        assert all_templates().format([message]) is None
@@ -0,0 +1,113 @@
+import asyncio
+
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from src.graphs.history import AgentState, HistoryManager
+
+
+def tool_turn(i):
+    return [
+        HumanMessage(f"weather in city {i}?", id=f"h{i}"),
+        AIMessage("", tool_calls=[{"name": "weather_tool", "args": {"location": f"city {i}"}, "id": f"c{i}"}], id=f"a{i}"),
+        ToolMessage("sunny", tool_call_id=f"c{i}", id=f"t{i}"),
+        AIMessage(f"It is sunny in city {i}.", id=f"r{i}"),
+    ]
+
+
+def summarizer(*responses):
+    return FakeListChatModel(responses=list(responses) or ["summary"])
+
+
+class TestHistoryManager:
+    """Tests for history windowing and rolling summaries."""
+
+    def test_split_turns(self):
+        messages = tool_turn(1) + tool_turn(2)
+
+        turns = HistoryManager.split_turns(messages)
+
+        assert [len(turn) for turn in turns] == [4, 4]
+
+    def test_drops_tool_exchanges_of_completed_turns(self):
+        manager = HistoryManager(summarizer(), keep_turns=4, max_turns=8, token_budget=10_000)
+        messages = tool_turn(1) + tool_turn(2)[:3]
+
+        folded, remove = manager.plan(messages)
+
+        assert folded == []
+        assert [m.id for m in remove] == ["a1", "t1"]
+
+    def test_folds_old_turns_beyond_max_turns(self):
+        manager = HistoryManager(summarizer("user asked about cities 0-2"), keep_turns=2, max_turns=4, token_budget=10_000)
+        messages = [m for i in range(5) for m in tool_turn(i)]
+
+        update = manager.update({"messages": messages})
+
+        removed = {m.id for m in update["messages"]}
+        assert update["summary"] == "user asked about cities 0-2"
+        assert {"h0", "r0", "h2", "r2"} <= removed
+        assert not {"h3", "r3", "h4", "a4", "t4"} & removed
+
+    def test_token_budget_triggers_folding(self):
+        manager = HistoryManager(summarizer(), keep_turns=2, max_turns=100, token_budget=50)
+        messages = [HumanMessage("x " * 200, id="h0"), AIMessage("ok", id="r0"), HumanMessage("hi", id="h1")]
+
+        folded, _ = manager.plan(messages)
+
+        assert [m.id for m in folded] == ["h0", "r0"]
+
+    def test_summary_is_incremental(self):
+        llm = summarizer("new summary")
+        manager = HistoryManager(llm, keep_turns=1, max_turns=1, token_budget=10_000)
+        messages = tool_turn(7) + [HumanMessage("next", id="h8")]
+
+        request = manager._summary_request("old summary", manager.plan(messages)[0])
+
+        assert "old summary" in request[0].content
+        assert "city 7" in request[0].content
+        assert "tool:" not in request[0].content
+
+    def test_with_summary_merges_system_message(self):
+        state = {"messages": [], "summary": "talked about Paris"}
+
+        prompt = HistoryManager.with_summary(state, [SystemMessage("instructions"), HumanMessage("hi")])
+
+        assert len(prompt) == 2
+        assert "instructions" in prompt[0].text()
+        assert "talked about Paris" in prompt[0].text()
+
+    def test_async_update(self):
+        manager = HistoryManager(summarizer("async summary"), keep_turns=1, max_turns=1, token_budget=10_000)
+        messages = tool_turn(1) + [HumanMessage("next", id="h2")]
+
+        update = asyncio.run(manager.aupdate({"messages": messages}))
+
+        assert update["summary"] == "async summary"
+
+
+def test_prompt_stays_bounded_over_long_session():
+    """The history stays within keep/max turns across many turns of a checkpointed graph."""
+    manager = HistoryManager(summarizer(*["summary"] * 100), keep_turns=2, max_turns=4, token_budget=10_000)
+    prompt_sizes = []
+
+    def respond(state):
+        prompt_sizes.append(len(manager.with_summary(state, state["messages"])))
+        return {"messages": [AIMessage("ok")]}
+
+    builder = StateGraph(AgentState)
+    builder.add_node("manage_history", manager.update)
+    builder.add_node("respond", respond)
+    builder.add_edge(START, "manage_history")
+    builder.add_edge("manage_history", "respond")
+    builder.add_edge("respond", END)
+    graph = builder.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "long"}}
+
+    for i in range(30):
+        graph.invoke({"messages": [HumanMessage(f"message {i}")]}, config)
+
+    assert max(prompt_sizes) <= 2 * 4 + 2
+    assert graph.get_state(config).values["summary"] == "summary"
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from src.tools.http_client import RETRY_STATUSES, CircuitBreaker, CircuitOpenError, create_session
+
+
+class TestCircuitBreaker:
+    """Tests for the circuit breaker guarding upstream HTTP services."""
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == "closed"
+
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == "closed"
+
+    def test_half_open_allows_single_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_trial_reopens_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+        for _ in range(3):
+            breaker.record_failure()
+        time.sleep(0.06)
+
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+
+    def test_released_trial_lets_next_call_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        breaker.before_call()
+        breaker.release()
+
+        breaker.before_call()
+        assert breaker.state == "half-open"
+
+    def test_client_errors_do_not_count_as_failures(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_status(404)
+        assert breaker.state == "closed"
+
+        breaker.record_status(503)
+        assert breaker.state == "open"
+
+
+def test_session_pools_connections_and_retries():
+    """Test the pool size and retry policy of the shared session."""
+    session = create_session(pool_size=4, max_retries=2, retry_backoff=0.1)
+    adapter = session.get_adapter("https://api.openweathermap.org")
+
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 2
+    assert set(RETRY_STATUSES) <= set(adapter.max_retries.status_forcelist)
+    assert adapter.max_retries.backoff_jitter == 0.1
+
+
+def test_session_caps_retry_after():
+    """Test that the sync retry policy caps Retry-After and ignores unparseable values."""
+    from unittest.mock import MagicMock
+    from src.tools.http_client import HTTP_MAX_RETRY_DELAY
+
+    retry = create_session().get_adapter("https://api.openweathermap.org").max_retries
+
+    assert retry.get_retry_after(MagicMock(headers={"Retry-After": "86400"})) == HTTP_MAX_RETRY_DELAY
+    assert retry.get_retry_after(MagicMock(headers={"Retry-After": "later"})) is None
+    # Copies made for each retry keep the cap
+    assert retry.increment(method="GET", url="/").get_retry_after(MagicMock(headers={"Retry-After": "86400"})) == HTTP_MAX_RETRY_DELAY
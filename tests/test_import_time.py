@@ -0,0 +1,59 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = [
+    "qdrant_client",
+    "langchain_qdrant",
+    "langchain_cohere",
+    "langchain_voyageai",
+    "langchain_anthropic",
+    "langchain_community",
+    "pypdf",
+]
+
+ENV = {
+    "ANTHROPIC_API_KEY": "test",
+    "OPENWEATHER_API_KEY": "test",
+    "COHERE_API_KEY": "test",
+    "QDRANT_URL": "http://localhost:6333",
+    "QDRANT_API_KEY": "test",
+    "LANGSMITH_API_KEY": "test",
+    "LANGSMITH_TRACING": "false",
+}
+
+
+def imported_after(statement):
+    """Run statement in a fresh interpreter and return the heavy modules it imported."""
+    code = (
+        f"import json, sys\n{statement}\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True, env={**os.environ, **ENV},
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestImportTime:
+    """Regression guard: the heavy client libraries load with the first agent, not on import."""
+
+    @pytest.mark.parametrize("module", ["src.tools", "src.graphs.agent_flow", "src.tools.document"])
+    def test_import_is_light(self, module):
+        """Test that importing the module loads none of the heavy client libraries."""
+        assert imported_after(f"import {module}") == []
+
+    def test_get_tools_loads_document_tools(self):
+        """Test that the document tools are still available through get_tools."""
+        imported = imported_after(
+            "from src.tools import get_tools\n"
+            "assert [t.name for t in get_tools()][1:] == "
+            "['document_query', 'list_collections', 'create_document_collection', 'collection_stats']\n"
+            "from src.tools import document_query"
+        )
+        assert imported == []
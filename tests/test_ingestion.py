@@ -0,0 +1,282 @@
+import os
+import threading
+import pytest
+from unittest.mock import MagicMock
+from langchain_core.documents import Document
+from qdrant_client import QdrantClient
+from src.tools.ingestion import IngestionPipeline
+
+
+class FakeEmbeddings:
+    """Deterministic embeddings counting how many batches were embedded."""
+
+    def __init__(self, fail_times=0):
+        self.calls = 0
+        self.fail_times = fail_times
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.calls <= self.fail_times:
+            raise ConnectionError("temporary failure")
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+
+def make_pages(count, words_per_page=300):
+    """Create pages of filler text with PyPDFLoader-like metadata."""
+    return [
+        Document(page_content=" ".join(f"word{i}" for i in range(words_per_page)),
+                 metadata={"source": "manual.pdf", "page": page})
+        for page in range(count)
+    ]
+
+
+class LockedClient:
+    """Serializes calls to a local Qdrant client, which unlike a server is not thread-safe."""
+
+    def __init__(self, client):
+        self._client = client
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def locked(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+        return locked
+
+
+@pytest.fixture
+def client():
+    """An in-memory Qdrant instance."""
+    return LockedClient(QdrantClient(":memory:"))
+
+
+def test_split_respects_chunk_size():
+    """Test that pages are split into chunks no larger than the chunk size."""
+    pipeline = IngestionPipeline(MagicMock(), FakeEmbeddings(), chunk_size=200, chunk_overlap=20)
+    chunks = list(pipeline.split(make_pages(2)))
+
+    assert len(chunks) > 2
+    assert all(len(chunk.page_content) <= 200 for chunk in chunks)
+    assert chunks[0].metadata["page"] == 0
+    assert chunks[-1].metadata["page"] == 1
+
+
+def test_run_creates_collection_and_upserts_batches(client):
+    """Test that every chunk ends up in Qdrant and the stats are reported."""
+    embeddings = FakeEmbeddings()
+    pipeline = IngestionPipeline(client, embeddings, chunk_size=200, chunk_overlap=0,
+                                 batch_size=5, max_workers=3)
+    progress = []
+
+    stats = pipeline.run("manuals", make_pages(4), progress_callback=progress.append)
+
+    assert stats["pages"] == 4
+    assert stats["chunks"] == client.count("manuals").count
+    assert stats["batches"] == embeddings.calls
+    assert stats["chunks_per_sec"] > 0
+    assert progress[-1]["chunks"] == stats["chunks"]
+
+    point = client.scroll("manuals", limit=1)[0][0]
+    assert point.payload["metadata"]["source"] == "manual.pdf"
+    assert point.payload["page_content"]
+
+
+def test_run_appends_to_existing_collection(client):
+    """Test that a second run reuses the existing collection."""
+    pipeline = IngestionPipeline(client, FakeEmbeddings(), chunk_size=200, chunk_overlap=0)
+    first = pipeline.run("manuals", make_pages(1))
+    second = pipeline.run("manuals", make_pages(1))
+
+    assert client.count("manuals").count == first["chunks"] + second["chunks"]
+
+
+def test_embedding_failures_are_retried(client):
+    """Test that transient embedding errors are retried with backoff."""
+    embeddings = FakeEmbeddings(fail_times=2)
+    pipeline = IngestionPipeline(client, embeddings, batch_size=100, max_workers=1,
+                                 retry_backoff=0.0)
+
+    stats = pipeline.run("manuals", make_pages(1, words_per_page=20))
+
+    assert stats["chunks"] == 1
+    assert embeddings.calls == 3
+
+
+def test_run_raises_after_retries_are_exhausted(client):
+    """Test that a persistent failure is surfaced to the caller."""
+    pipeline = IngestionPipeline(client, FakeEmbeddings(fail_times=10), max_retries=2,
+                                 retry_backoff=0.0)
+
+    with pytest.raises(ConnectionError):
+        pipeline.run("manuals", make_pages(1, words_per_page=20))
+
+
+def test_in_flight_window_bounds_page_reads(client):
+    """Test that pages are not read ahead of the in-flight window."""
+    release = threading.Event()
+    pulled = []
+
+    class BlockingEmbeddings(FakeEmbeddings):
+        def embed_documents(self, texts):
+            release.wait(timeout=5)
+            return super().embed_documents(texts)
+
+    def page_stream():
+        for page in make_pages(10, words_per_page=20):
+            pulled.append(page)
+            yield page
+
+    pipeline = IngestionPipeline(client, BlockingEmbeddings(), batch_size=1, max_workers=2,
+                                 max_in_flight=2)
+    runner = threading.Thread(target=pipeline.run, args=("manuals", page_stream()))
+    runner.start()
+    runner.join(timeout=0.3)
+
+    # Two batches in flight plus the one waiting for a free slot
+    assert len(pulled) == 3
+
+    release.set()
+    runner.join(timeout=5)
+    assert len(pulled) == 10
+    assert client.count("manuals").count == 10
+
+
+def test_ingest_files_parses_in_processes(client, make_pdf, tmp_path):
+    """Test that several PDFs are ingested into one collection and reported per file."""
+    from src.tools.ingestion import find_pdf_files
+
+    make_pdf("docs/a.pdf", ["Alpha page one", "Alpha page two"])
+    make_pdf("docs/nested/b.pdf", ["Beta page one"])
+    (tmp_path / "docs" / "notes.txt").write_text("not a pdf")
+    completed = {}
+
+    pipeline = IngestionPipeline(client, FakeEmbeddings(), batch_size=1)
+    files = find_pdf_files(str(tmp_path / "docs"))
+    stats = pipeline.ingest_files("manuals", files, processes=2,
+                                  on_file_complete=completed.__setitem__)
+
+    assert [os.path.basename(path) for path in files] == ["a.pdf", "b.pdf"]
+    assert stats["files"] == 2
+    assert stats["pages"] == 3
+    assert client.count("manuals").count == 3
+    assert sorted(completed.values()) == [1, 2]
+
+    # A second run over the same files finds nothing to embed
+    again = pipeline.ingest_files("manuals", files, processes=2)
+    assert again["unchanged_files"] == 2
+    assert again["chunks"] == 0
+    assert client.count("manuals").count == 3
+
+
+def test_ingest_files_reports_unparseable_files(client, tmp_path):
+    """Test that a broken PDF is reported as failed without stopping the run."""
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    pipeline = IngestionPipeline(client, FakeEmbeddings())
+
+    stats = pipeline.ingest_files("manuals", [str(broken)], processes=1)
+
+    assert stats["files"] == 0
+    assert stats["failed"][0]["file"] == str(broken)
+
+
+def test_manifest_tracks_unchanged_files(make_pdf, tmp_path):
+    """Test that the manifest survives reloads and notices modified files."""
+    from src.tools.ingestion import IngestionManifest
+
+    path = make_pdf("a.pdf", ["Alpha"])
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+    assert not manifest.is_done(path)
+
+    manifest.mark_done(path, 1)
+    assert IngestionManifest(str(tmp_path / "manifest.json")).is_done(path)
+
+    make_pdf("a.pdf", ["Alpha revised with more text"])
+    assert not manifest.is_done(path)
+
+
+def test_unchanged_document_is_skipped(client):
+    """Test that re-ingesting the same file content embeds nothing and reads no pages."""
+    embeddings = FakeEmbeddings()
+    pipeline = IngestionPipeline(client, embeddings, chunk_size=200, chunk_overlap=0)
+    first = pipeline.run("manuals", make_pages(2), doc_id="manual.pdf", file_hash="v1")
+    calls = embeddings.calls
+
+    second = pipeline.run("manuals", iter(()), doc_id="manual.pdf", file_hash="v1")
+
+    assert second["unchanged"]
+    assert second["skipped_chunks"] == first["chunks"]
+    assert embeddings.calls == calls
+    assert client.count("manuals").count == first["chunks"]
+
+
+def test_revised_document_only_upserts_changed_chunks(client):
+    """Test that only new chunks are embedded and removed chunks are deleted."""
+    embeddings = FakeEmbeddings()
+    pipeline = IngestionPipeline(client, embeddings, chunk_size=1000, chunk_overlap=0, batch_size=100)
+    original = [Document(page_content=f"Section {i} original text", metadata={"page": i}) for i in range(3)]
+    pipeline.run("manuals", original, doc_id="manual.pdf", file_hash="v1")
+
+    revised = [original[0], original[1], Document(page_content="Section 2 revised text", metadata={"page": 2})]
+    stats = pipeline.run("manuals", revised, doc_id="manual.pdf", file_hash="v2")
+
+    assert stats["chunks"] == 1
+    assert stats["skipped_chunks"] == 2
+    assert stats["deleted_chunks"] == 1
+    contents = sorted(point.payload["page_content"] for point in client.scroll("manuals", limit=10)[0])
+    assert contents == ["Section 0 original text", "Section 1 original text", "Section 2 revised text"]
+
+    # Every stored chunk now belongs to the new revision
+    state = pipeline.document_state("manuals", "manual.pdf")
+    assert state["file_hashes"] == {"v2"}
+
+
+def test_revision_that_shifts_pages_updates_retained_chunks(client):
+    """Test that retained chunks get the page of the new revision when a page is inserted before them."""
+    embeddings = FakeEmbeddings()
+    pipeline = IngestionPipeline(client, embeddings, chunk_size=1000, chunk_overlap=0, batch_size=100)
+    original = [Document(page_content=f"Section {i} text", metadata={"page": i}) for i in range(3)]
+    pipeline.run("manuals", original, doc_id="manual.pdf", file_hash="v1")
+
+    revised = [Document(page_content="New cover page", metadata={"page": 0})] + [
+        Document(page_content=f"Section {i} text", metadata={"page": i + 1}) for i in range(3)
+    ]
+    stats = pipeline.run("manuals", revised, doc_id="manual.pdf", file_hash="v2")
+
+    assert stats["chunks"] == 1
+    assert stats["skipped_chunks"] == 3
+    assert stats["updated_chunks"] == 3
+    pages = {point.payload["page_content"]: point.payload["metadata"]["page"]
+             for point in client.scroll("manuals", limit=10)[0]}
+    assert pages == {"New cover page": 0, "Section 0 text": 1, "Section 1 text": 2, "Section 2 text": 3}
+    assert pipeline.document_state("manuals", "manual.pdf")["file_hashes"] == {"v2"}
+
+
+def test_repeated_text_is_stored_per_page(client):
+    """Test that identical text on two pages is stored twice, so both pages can be found."""
+    pipeline = IngestionPipeline(client, FakeEmbeddings(), chunk_size=1000, chunk_overlap=0)
+    pages = [Document(page_content="Safety notice", metadata={"page": page}) for page in range(2)]
+    stats = pipeline.run("manuals", pages, doc_id="manual.pdf", file_hash="v1")
+
+    assert stats["chunks"] == 2
+    stored = sorted(point.payload["metadata"]["page"] for point in client.scroll("manuals", limit=10)[0])
+    assert stored == [0, 1]
+
+    # Dropping the second copy deletes only that page's chunk
+    stats = pipeline.run("manuals", pages[:1], doc_id="manual.pdf", file_hash="v2")
+    assert stats["deleted_chunks"] == 1
+    assert [point.payload["metadata"]["page"] for point in client.scroll("manuals", limit=10)[0]] == [0]
+
+
+def test_documents_are_tracked_separately(client):
+    """Test that identical chunks in two documents are stored once per document."""
+    pipeline = IngestionPipeline(client, FakeEmbeddings())
+    page = [Document(page_content="Shared boilerplate", metadata={})]
+    pipeline.run("manuals", page, doc_id="a.pdf", file_hash="a1")
+    pipeline.run("manuals", page, doc_id="b.pdf", file_hash="b1")
+
+    assert client.count("manuals").count == 2
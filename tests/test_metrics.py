@@ -0,0 +1,120 @@
+import asyncio
+import inspect
+import json
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from src.graphs.tool_node import ConcurrentToolNode
+from src.tools.cache import TTLCache
+from src.tools.metrics import NULL_TIMER, Histogram, MetricsRegistry, metrics
+
+
+@tool
+def echo(text: str) -> str:
+    """Echo the text."""
+    return text
+
+
+class TestMetricsRegistry:
+    """Tests for the in-process metrics registry."""
+
+    def test_disabled_registry_records_nothing(self):
+        registry = MetricsRegistry(enabled=False)
+        registry.observe("node_seconds", 0.1, node="generate")
+        registry.increment("tool_calls_total", tool="echo")
+
+        assert registry.timer("node_seconds") is NULL_TIMER
+        assert registry.snapshot() == []
+
+    def test_histogram_buckets_and_quantiles(self):
+        histogram = Histogram((0.01, 0.1, 1.0))
+        for value in (0.005, 0.05, 0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        assert histogram.counts == [1, 2, 1, 1]
+        assert histogram.count == 5
+        assert histogram.quantile(0.5) == 0.1
+        assert histogram.quantile(0.99) == float("inf")
+
+    def test_buckets_follow_the_metric_unit(self):
+        registry = MetricsRegistry(enabled=True)
+        registry.observe("llm_input_tokens", 1200, node="generate")
+        registry.observe("tool_result_bytes", 300, tool="echo")
+
+        assert registry.histogram("llm_input_tokens", node="generate").quantile(0.5) == 2500
+        assert registry.histogram("tool_result_bytes", tool="echo").quantile(0.5) == 500
+
+    def test_timed_keeps_the_signature_of_sync_and_async_functions(self):
+        registry = MetricsRegistry(enabled=True)
+
+        @registry.timed("node_seconds", node="sync")
+        def node(state, config=None):
+            return state
+
+        @registry.timed("node_seconds", node="async")
+        async def anode(state, config=None):
+            return state
+
+        assert node(1) == 1
+        assert asyncio.run(anode(2)) == 2
+        assert "config" in inspect.signature(node).parameters
+        assert asyncio.iscoroutinefunction(anode)
+        assert registry.histogram("node_seconds", node="sync").count == 1
+        assert registry.histogram("node_seconds", node="async").count == 1
+
+    def test_prometheus_export(self):
+        registry = MetricsRegistry(enabled=True)
+        registry.observe("node_seconds", 0.02, node="generate")
+        registry.increment("cache_lookups_total", cache="weather", result="hit")
+
+        text = registry.to_prometheus()
+
+        assert "# TYPE node_seconds histogram" in text
+        assert 'node_seconds_bucket{node="generate",le="0.025"} 1' in text
+        assert 'node_seconds_bucket{node="generate",le="+Inf"} 1' in text
+        assert 'node_seconds_count{node="generate"} 1' in text
+        assert 'cache_lookups_total{cache="weather",result="hit"} 1' in text
+
+    def test_jsonl_export(self, tmp_path):
+        registry = MetricsRegistry(enabled=True)
+        registry.observe("tool_seconds", 0.2, tool="echo")
+        registry.increment("tool_calls_total", tool="echo", status="success")
+        path = tmp_path / "metrics" / "run.jsonl"
+
+        registry.write_jsonl(str(path))
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+
+        assert [record["name"] for record in records] == ["tool_seconds", "tool_calls_total"]
+        assert records[0]["labels"] == {"tool": "echo"}
+        assert records[1]["value"] == 1
+
+
+class TestInstrumentedComponents:
+    """Tests for the metrics recorded by the instrumented hot path."""
+
+    def setup_method(self):
+        metrics.enabled = True
+        metrics.clear()
+
+    def teardown_method(self):
+        metrics.enabled = False
+        metrics.clear()
+
+    def test_named_cache_counts_lookups(self):
+        cache = TTLCache(ttl=60, name="test")
+        cache.get_or_load("key", lambda: 1)
+        cache.get_or_load("key", lambda: 1)
+
+        assert metrics.counter("cache_lookups_total", cache="test", result="miss") == 1
+        assert metrics.counter("cache_lookups_total", cache="test", result="hit") == 1
+
+    def test_tool_node_records_time_and_payload(self):
+        node = ConcurrentToolNode([echo])
+        state = {"messages": [AIMessage("", tool_calls=[{"name": "echo", "args": {"text": "hello"}, "id": "1"}])]}
+
+        node.invoke(state)
+
+        assert metrics.histogram("tool_seconds", tool="echo").count == 1
+        assert metrics.histogram("tool_result_bytes", tool="echo").sum == 5
+        assert metrics.counter("tool_calls_total", tool="echo", status="success") == 1
@@ -0,0 +1,68 @@
+import logging
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.graphs.prompt_cache import CACHE_CONTROL, PromptCacheStats, mark_history, system_prompt
+
+
+class TestPromptCache:
+    """Tests for prompt cache breakpoints and usage accounting."""
+
+    def test_system_prompt_marks_static_instructions(self):
+        message = system_prompt("instructions")
+
+        assert message.content == [{"type": "text", "text": "instructions", "cache_control": CACHE_CONTROL}]
+
+    def test_system_prompt_without_caching(self):
+        assert system_prompt("instructions", enabled=False).content == "instructions"
+
+    def test_mark_history_marks_last_message_before_current_turn(self):
+        messages = [HumanMessage("hi"), AIMessage("hello"), HumanMessage("weather in Paris?")]
+
+        marked = mark_history(messages)
+
+        assert marked[1].content[-1]["cache_control"] == CACHE_CONTROL
+        assert marked[2] is messages[2]
+        assert messages[1].content == "hello"
+
+    def test_mark_history_skips_tool_calls(self):
+        tool_call = AIMessage("", tool_calls=[{"name": "weather_tool", "args": {}, "id": "c1"}])
+        messages = [HumanMessage("hi"), tool_call, HumanMessage("again")]
+
+        marked = mark_history(messages)
+
+        assert marked[0].content[-1]["cache_control"] == CACHE_CONTROL
+        assert marked[1] is tool_call
+
+    def test_mark_history_first_turn_is_unchanged(self):
+        messages = [HumanMessage("hi")]
+
+        assert mark_history(messages) == messages
+
+    def test_stats_record_cache_usage(self):
+        stats = PromptCacheStats()
+        response = AIMessage(
+            "ok",
+            usage_metadata={
+                "input_tokens": 1200,
+                "output_tokens": 10,
+                "total_tokens": 1210,
+                "input_token_details": {"cache_read": 1000, "cache_creation": 0},
+            },
+        )
+
+        stats.record("generate", response)
+        stats.record("generate", AIMessage("no usage"))
+
+        assert stats.stats()["cache_read_tokens"] == 1000
+        assert stats.stats()["hit_rate"] == 1000 / 1200
+
+    def test_stats_log_instead_of_printing(self, capsys, caplog):
+        stats = PromptCacheStats()
+        response = AIMessage("ok", usage_metadata={"input_tokens": 100, "output_tokens": 5, "total_tokens": 105})
+
+        with caplog.at_level(logging.DEBUG, logger="src.graphs.prompt_cache"):
+            stats.record("generate", response)
+
+        assert capsys.readouterr().out == ""
+        assert "Prompt cache (generate): read 0 tokens" in caplog.text
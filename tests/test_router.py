@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.graphs import router as router_module
+from src.graphs.router import NO_TOOL, KeywordClassifier, ModelRouter, called_route
+from src.graphs.tool_registry import ToolRegistry
+from src.tools import weather_tool
+from src.tools.metrics import MetricsRegistry
+
+
+class FakeToolModel(FakeMessagesListChatModel):
+    """Fake chat model that ignores bound tools and replays its responses."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def weather_call(location="London"):
+    return AIMessage("", tool_calls=[{"name": "weather_tool", "args": {"location": location}, "id": "call_1"}])
+
+
+def make_router(*responses, confidence=0.75):
+    registry = ToolRegistry(FakeToolModel(responses=list(responses)))
+    registry.register("default", [weather_tool])
+    return ModelRouter(registry, confidence=confidence)
+
+
+class TestKeywordClassifier:
+    """Tests for predicting the tool a question needs."""
+
+    @pytest.mark.parametrize("question, route", [
+        ("What's the weather like in Paris?", "weather_tool"),
+        ("Is it going to rain in Tokyo tomorrow?", "weather_tool"),
+        ("Which collections are available?", "list_collections"),
+        ("How big is the contracts collection?", "collection_stats"),
+        ("Create a collection from report.pdf", "create_document_collection"),
+        ("What does the report say about revenue? [Collection: reports]", "document_query"),
+        ("Hello!", NO_TOOL),
+    ])
+    def test_predicts_route(self, question, route):
+        decision = KeywordClassifier().classify(question)
+
+        assert decision.route == route
+        assert decision.confidence >= 0.75
+
+    @pytest.mark.parametrize("question, route", [
+        ("What's the weather like in Paris? [Collection: reports]", "weather_tool"),
+        ("Hello! [Collection: reports]", NO_TOOL),
+    ])
+    def test_collection_tag_is_ignored(self, question, route):
+        decision = KeywordClassifier().classify(question)
+
+        assert decision.route == route
+        assert decision.confidence == 1.0
+
+    def test_unmatched_question_has_no_confidence(self):
+        assert KeywordClassifier().classify("And in Berlin?") == (None, 0.0)
+
+    def test_mixed_question_has_low_confidence(self):
+        decision = KeywordClassifier().classify("Compare the weather with what the report predicted")
+
+        assert decision.confidence == 0.5
+
+
+class TestModelRouter:
+    """Tests for routing tool selection to the small model."""
+
+    def test_keeps_response_on_predicted_route(self):
+        router = make_router(weather_call())
+        messages = [HumanMessage("What's the weather in London?")]
+
+        response = router.route("What's the weather in London?", messages)
+
+        assert called_route(response) == "weather_tool"
+        assert router.stats() == {"routed": 1, "escalated": 0, "routed_rate": 1.0}
+
+    def test_escalates_low_confidence_without_calling_the_model(self):
+        router = make_router()
+
+        assert router.route("And in Berlin?", [HumanMessage("And in Berlin?")]) is None
+        assert router.stats()["escalated"] == 1
+
+    def test_escalates_when_the_model_disagrees(self):
+        router = make_router(AIMessage("It is probably sunny."))
+
+        assert router.route("What's the weather in London?", [HumanMessage("hi")]) is None
+        assert router.stats() == {"routed": 0, "escalated": 1, "routed_rate": 0.0}
+
+    def test_escalation_is_counted_not_printed(self, monkeypatch, capsys):
+        registry = MetricsRegistry(enabled=True)
+        monkeypatch.setattr(router_module, "metrics", registry)
+        router = make_router(AIMessage("It is probably sunny."))
+
+        router.route("What's the weather in London?", [HumanMessage("hi")])
+
+        assert capsys.readouterr().out == ""
+        assert registry.counter("router_escalations_total") == 1
+
+    def test_async_route(self):
+        router = make_router(AIMessage("Hello! How can I help?"))
+
+        response = asyncio.run(router.aroute("Hello", [HumanMessage("Hello")]))
+
+        assert response.content == "Hello! How can I help?"
+
+    def test_called_route(self):
+        both = AIMessage("", tool_calls=[
+            {"name": "weather_tool", "args": {}, "id": "1"},
+            {"name": "document_query", "args": {}, "id": "2"},
+        ])
+
+        assert called_route(AIMessage("hi")) == NO_TOOL
+        assert called_route(both) == "document_query+weather_tool"
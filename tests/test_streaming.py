@@ -0,0 +1,83 @@
+import asyncio
+
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from src.graphs.streaming import AnswerFilter, astream_text, chunk_text, stream_text
+
+
+def build_graph():
+    summarizer = GenericFakeChatModel(messages=iter([AIMessage("internal summary")]))
+    answerer = GenericFakeChatModel(messages=iter([AIMessage("It is sunny in Paris")] * 2))
+
+    def manage_history(state: MessagesState, config):
+        summarizer.invoke(state["messages"], config)
+        return {"messages": []}
+
+    def generate(state: MessagesState, config):
+        return {"messages": [answerer.invoke(state["messages"], config)]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("manage_history", manage_history)
+    builder.add_node("generate", generate)
+    builder.add_edge(START, "manage_history")
+    builder.add_edge("manage_history", "generate")
+    builder.add_edge("generate", END)
+    return builder.compile()
+
+
+class TestStreaming:
+    """Tests for token-level streaming of the answer."""
+
+    def test_chunk_text_skips_tool_call_blocks(self):
+        chunk = AIMessageChunk(content=[
+            {"type": "text", "text": "Let me check. ", "index": 0},
+            {"type": "tool_use", "name": "weather_tool", "input": {}, "index": 1},
+            {"type": "input_json_delta", "partial_json": '{"loc', "index": 1},
+        ])
+
+        assert chunk_text(chunk) == "Let me check. "
+
+    def test_chunk_text_skips_tool_call_chunks(self):
+        chunk = AIMessageChunk(content="", tool_call_chunks=[{"name": "weather_tool", "args": "", "id": "c1", "index": 0}])
+
+        assert chunk_text(chunk) == ""
+
+    def test_tool_call_preamble_is_not_streamed(self):
+        answer = AnswerFilter()
+        routing = {"langgraph_node": "query_or_respond"}
+        generating = {"langgraph_node": "generate"}
+        stream = [
+            (AIMessageChunk(content="Let me ", id="run-1"), routing),
+            (AIMessageChunk(content="check.", id="run-1"), routing),
+            (AIMessageChunk(content="", id="run-1", tool_call_chunks=[
+                {"name": "weather_tool", "args": "", "id": "c1", "index": 0}
+            ]), routing),
+            (AIMessageChunk(content="It is ", id="run-2"), generating),
+            (AIMessageChunk(content="sunny", id="run-2"), generating),
+        ]
+
+        text = "".join(answer.feed(chunk, metadata) for chunk, metadata in stream) + answer.flush()
+
+        assert text == "It is sunny"
+
+    def test_direct_answer_is_released_when_complete(self):
+        answer = AnswerFilter()
+        routing = {"langgraph_node": "query_or_respond"}
+
+        assert answer.feed(AIMessageChunk(content="Hello", id="run-1"), routing) == ""
+        assert answer.feed(AIMessageChunk(content=" there", id="run-1"), routing) == ""
+        assert answer.flush() == "Hello there"
+
+    def test_streams_answer_tokens_only(self):
+        tokens = list(stream_text(build_graph(), {"messages": [HumanMessage("weather?")]}))
+
+        assert len(tokens) > 1
+        assert "".join(tokens) == "It is sunny in Paris"
+
+    def test_async_stream(self):
+        async def collect():
+            return [token async for token in astream_text(build_graph(), {"messages": [HumanMessage("weather?")]})]
+
+        assert "".join(asyncio.run(collect())) == "It is sunny in Paris"
@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+
+from src.graphs.tool_node import ConcurrentToolNode, default_timeouts, parse_timeouts
+from src.tools.http_client import HTTP_RETRY_BUDGET
+
+
+def slow_echo(text: str) -> str:
+    """Echo the text after a short delay."""
+    time.sleep(0.2)
+    return text
+
+
+async def aslow_echo(text: str) -> str:
+    """Echo the text after a short delay."""
+    await asyncio.sleep(0.2)
+    return text
+
+
+def hang(text: str) -> str:
+    """Take far longer than the timeout."""
+    time.sleep(1)
+    return text
+
+
+async def ahang(text: str) -> str:
+    """Take far longer than the timeout."""
+    await asyncio.sleep(1)
+    return text
+
+
+def fail(text: str) -> str:
+    """Always raise."""
+    raise RuntimeError("boom")
+
+
+echo_tool = StructuredTool.from_function(func=slow_echo, coroutine=aslow_echo, name="echo")
+hang_tool = StructuredTool.from_function(func=hang, coroutine=ahang, name="hang")
+fail_tool = StructuredTool.from_function(func=fail, name="fail")
+
+
+def make_state(*calls):
+    tool_calls = [
+        {"name": name, "args": {"text": text}, "id": f"call_{i}", "type": "tool_call"}
+        for i, (name, text) in enumerate(calls)
+    ]
+    return {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
+
+
+class TestConcurrentToolNode:
+    """Tests for the concurrent tool execution node."""
+
+    def test_calls_run_concurrently_and_keep_order(self):
+        node = ConcurrentToolNode([echo_tool])
+        state = make_state(*[("echo", f"city {i}") for i in range(4)])
+
+        start = time.monotonic()
+        result = node.invoke(state)
+        elapsed = time.monotonic() - start
+
+        assert [m.content for m in result["messages"]] == [f"city {i}" for i in range(4)]
+        assert [m.tool_call_id for m in result["messages"]] == [f"call_{i}" for i in range(4)]
+        assert elapsed < 0.6
+
+    def test_concurrency_is_bounded(self):
+        node = ConcurrentToolNode([echo_tool], max_concurrency=2)
+        state = make_state(*[("echo", str(i)) for i in range(4)])
+
+        start = time.monotonic()
+        node.invoke(state)
+
+        assert time.monotonic() - start >= 0.4
+
+    def test_per_tool_timeout(self):
+        node = ConcurrentToolNode([echo_tool, hang_tool], timeouts={"hang": 0.3})
+        result = node.invoke(make_state(("hang", "a"), ("echo", "b")))
+
+        timed_out, ok = result["messages"]
+        assert timed_out.status == "error"
+        assert "timed out" in timed_out.content
+        assert ok.content == "b"
+
+    def test_tool_without_timeout_is_awaited(self):
+        node = ConcurrentToolNode([hang_tool], timeout=0.3, timeouts={"hang": None})
+
+        assert node.invoke(make_state(("hang", "a")))["messages"][0].content == "a"
+        assert asyncio.run(node.ainvoke(make_state(("hang", "b"))))["messages"][0].content == "b"
+
+    def test_default_timeouts(self):
+        timeouts = ConcurrentToolNode([echo_tool]).timeouts
+
+        assert timeouts == default_timeouts()
+        assert timeouts["create_document_collection"] is None
+        assert timeouts["weather_tool"] > HTTP_RETRY_BUDGET
+
+    def test_parse_timeouts(self):
+        assert parse_timeouts(" weather_tool=60, create_document_collection=0,") == {
+            "weather_tool": 60.0, "create_document_collection": None,
+        }
+        assert parse_timeouts("") == {}
+
+    def test_errors_and_unknown_tools_become_error_messages(self):
+        node = ConcurrentToolNode([fail_tool])
+        result = node.invoke(make_state(("fail", "a"), ("missing", "b")))
+
+        assert all(m.status == "error" for m in result["messages"])
+        assert "boom" in result["messages"][0].content
+        assert "not a valid tool" in result["messages"][1].content
+
+    def test_async_calls_run_concurrently_and_keep_order(self):
+        node = ConcurrentToolNode([echo_tool, hang_tool], timeouts={"hang": 0.3})
+        state = make_state(("echo", "a"), ("hang", "b"), ("echo", "c"))
+
+        start = time.monotonic()
+        result = asyncio.run(node.ainvoke(state))
+        elapsed = time.monotonic() - start
+
+        assert [m.content for m in result["messages"]][::2] == ["a", "c"]
+        assert result["messages"][1].status == "error"
+        assert elapsed < 0.6
@@ -0,0 +1,62 @@
+from unittest.mock import patch
+
+import pytest
+from langchain_anthropic import ChatAnthropic
+
+from src.graphs.tool_registry import ToolRegistry
+from src.tools import weather_tool
+from src.tools.document import document_query
+
+
+@pytest.fixture
+def llm():
+    return ChatAnthropic(model="claude-3-7-sonnet-latest", api_key="test")
+
+
+class TestToolRegistry:
+    """Tests for binding tool sets to the LLM once."""
+
+    def test_register_binds_once(self, llm):
+        registry = ToolRegistry(llm)
+        with patch.object(ChatAnthropic, "bind_tools", wraps=llm.bind_tools) as bind_tools:
+            registry.register("weather", [weather_tool])
+            for _ in range(5):
+                registry.active.llm
+
+        bind_tools.assert_called_once()
+
+    def test_schemas_are_serialized_up_front(self, llm):
+        tool_set = ToolRegistry(llm).register("all", [weather_tool, document_query])
+
+        assert [schema["name"] for schema in tool_set.schemas] == ["weather_tool", "document_query"]
+        assert "location" in tool_set.schemas[0]["input_schema"]["properties"]
+
+    def test_first_registered_set_is_active(self, llm):
+        registry = ToolRegistry(llm)
+        registry.register("weather", [weather_tool])
+        registry.register("documents", [document_query])
+
+        assert registry.active.name == "weather"
+        assert registry.names() == ["weather", "documents"]
+
+    def test_activate_switches_tool_set(self, llm):
+        registry = ToolRegistry(llm)
+        registry.register("weather", [weather_tool])
+        registry.register("documents", [document_query])
+
+        registry.activate("documents")
+
+        assert registry.active.tools == [document_query]
+
+    def test_unknown_tool_set(self, llm):
+        with pytest.raises(KeyError):
+            ToolRegistry(llm).activate("missing")
+
+    def test_cache_control_marks_last_tool(self, llm):
+        tool_set = ToolRegistry(llm).register(
+            "all", [weather_tool, document_query], cache_control={"type": "ephemeral"}
+        )
+
+        assert "cache_control" not in tool_set.schemas[0]
+        assert tool_set.schemas[-1]["cache_control"] == {"type": "ephemeral"}
+        assert tool_set.llm.kwargs["tools"] == tool_set.schemas
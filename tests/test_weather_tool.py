@@ -1,8 +1,9 @@
 import pytest
 import os
+import time
 import json
 from unittest.mock import patch, MagicMock
-from src.tools.weather import weather_tool
+from src.tools.weather import weather_tool, weather_cache
 
 # Sample response data for mocking
 SAMPLE_WEATHER_RESPONSE = {
@@ -34,18 +35,29 @@ SAMPLE_WEATHER_RESPONSE = {
     "cod": 200
 }
 
+
+@pytest.fixture(autouse=True)
+def clear_weather_cache():
+    """Each test starts with an empty weather cache."""
+    weather_cache.clear()
+    yield
+    weather_cache.clear()
+
+
 def test_weather_tool_func():
     """Test that the weather_tool function has the correct attributes from the decorator."""
     assert hasattr(weather_tool, "name")
     assert weather_tool.name == "weather_tool"
     assert "location" in weather_tool.args
 
-@patch('src.tools.weather.requests.get')
+
+@patch('src.tools.weather.weather_session.get')
 def test_weather_tool_successful_call(mock_get):
     """Test the weather_tool with a successful API call."""
     # Configure the mock to return a successful response
     mock_response = MagicMock()
     mock_response.json.return_value = SAMPLE_WEATHER_RESPONSE
+    mock_response.status_code = 200
     mock_response.raise_for_status.return_value = None
     mock_get.return_value = mock_response
     
@@ -68,7 +80,8 @@ def test_weather_tool_successful_call(mock_get):
     assert kwargs["params"]["appid"] == os.getenv("OPENWEATHER_API_KEY")
     assert kwargs["params"]["units"] == "metric"
 
-@patch('src.tools.weather.requests.get')
+
+@patch('src.tools.weather.weather_session.get')
 def test_weather_tool_api_error(mock_get):
     """Test the weather_tool when the API returns an error."""
     # Configure the mock to raise a request exception
@@ -81,12 +94,14 @@ def test_weather_tool_api_error(mock_get):
     assert "error" in result
     assert "API connection error" in result["error"]
 
-@patch('src.tools.weather.requests.get')
+
+@patch('src.tools.weather.weather_session.get')
 def test_weather_tool_parse_error(mock_get):
     """Test the weather_tool when the response cannot be parsed correctly."""
     # Configure the mock to return an invalid response
     mock_response = MagicMock()
     mock_response.json.return_value = {"cod": 200}  # Missing required fields
+    mock_response.status_code = 200
     mock_response.raise_for_status.return_value = None
     mock_get.return_value = mock_response
     
@@ -95,4 +110,141 @@ def test_weather_tool_parse_error(mock_get):
     
     # Assertions
     assert "error" in result
-    assert "parse" in result["error"].lower() 
\ No newline at end of file
+    assert "parse" in result["error"].lower() 
+
+
+def test_weather_tool_async_call():
+    """Test the async implementation of weather_tool against a mocked HTTP transport."""
+    import asyncio
+    import httpx
+    from src.tools import weather
+
+    def handler(request):
+        assert request.url.params["q"] == "London"
+        return httpx.Response(200, json=SAMPLE_WEATHER_RESPONSE)
+
+    client_factory = weather.LoopLocal(lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    with patch.object(weather, "async_http_client", client_factory):
+        result = asyncio.run(weather_tool.ainvoke("London"))
+
+    assert result["location"] == "London"
+    assert result["temperature"] == 15.5
+
+
+def test_weather_tool_async_http_error():
+    """Test that the async implementation reports HTTP errors like the sync one."""
+    import asyncio
+    import httpx
+    from src.tools import weather
+
+    client_factory = weather.LoopLocal(
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(404)))
+    )
+    with patch.object(weather, "async_http_client", client_factory):
+        result = asyncio.run(weather_tool.ainvoke("NonExistentCity"))
+
+    assert "error" in result
+    assert "Failed to fetch weather data" in result["error"]
+
+
+@patch('src.tools.weather.weather_session.get')
+def test_weather_tool_uses_timeouts(mock_get):
+    """Test that the sync implementation never waits on the API without a timeout."""
+    from src.tools.http_client import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+
+    mock_get.return_value = MagicMock(status_code=200, json=MagicMock(return_value=SAMPLE_WEATHER_RESPONSE))
+    weather_tool.invoke("London")
+
+    assert mock_get.call_args.kwargs["timeout"] == (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+@patch('src.tools.weather.weather_session.get')
+def test_weather_tool_fails_fast_when_circuit_open(mock_get):
+    """Test that repeated upstream failures open the circuit and skip further requests."""
+    import requests
+    from src.tools import weather
+    from src.tools.http_client import CircuitBreaker
+
+    mock_get.side_effect = requests.exceptions.ConnectionError("connection refused")
+    with patch.object(weather, "weather_breaker", CircuitBreaker(failure_threshold=2, reset_timeout=60)):
+        weather_tool.invoke("London")
+        weather_tool.invoke("London")
+        result = weather_tool.invoke("London")
+
+    assert mock_get.call_count == 2
+    assert "unavailable" in result["error"]
+
+
+def test_weather_tool_async_retries_server_errors():
+    """Test that the async implementation retries 5xx responses before giving up."""
+    import asyncio
+    import httpx
+    from src.tools import weather
+
+    responses = [httpx.Response(503, headers={"Retry-After": "0"}), httpx.Response(200, json=SAMPLE_WEATHER_RESPONSE)]
+    client_factory = weather.LoopLocal(
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(lambda request: responses.pop(0)))
+    )
+    with patch.object(weather, "async_http_client", client_factory):
+        result = asyncio.run(weather_tool.ainvoke("London"))
+
+    assert result["location"] == "London"
+    assert responses == []
+
+
+def test_cancelled_half_open_trial_releases_circuit():
+    """Test that a trial call cancelled by a timeout does not leave the circuit stuck open."""
+    import asyncio
+    import httpx
+    from src.tools import weather
+    from src.tools.http_client import CircuitBreaker
+
+    async def hang(request):
+        await asyncio.sleep(10)
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    client_factory = weather.LoopLocal(lambda: httpx.AsyncClient(transport=httpx.MockTransport(hang)))
+    with patch.object(weather, "weather_breaker", breaker), patch.object(weather, "async_http_client", client_factory):
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(asyncio.wait_for(weather._arequest_weather("London"), 0.05))
+
+    # The next call is let through as a new trial
+    breaker.before_call()
+
+
+def test_retry_after_is_capped_and_parses_dates():
+    """Test that Retry-After never exceeds the longest backoff and accepts HTTP dates."""
+    from email.utils import formatdate
+    from src.tools.http_client import HTTP_MAX_RETRY_DELAY, retry_after_seconds
+
+    assert retry_after_seconds("2") == 2.0
+    assert retry_after_seconds("3600") == HTTP_MAX_RETRY_DELAY
+    assert 0 < retry_after_seconds(formatdate(time.time() + 2, usegmt=True)) <= 2
+    assert retry_after_seconds(formatdate(time.time() - 60, usegmt=True)) == 0.0
+    assert retry_after_seconds("soon") is None
+    assert retry_after_seconds(None) is None
+
+
+@patch('src.tools.weather.weather_session.get')
+def test_weather_tool_caches_by_normalized_location(mock_get):
+    """Test that repeat lookups, in any spelling of the location, hit the cache."""
+    mock_get.return_value = MagicMock(status_code=200, json=MagicMock(return_value=SAMPLE_WEATHER_RESPONSE))
+
+    first = weather_tool.invoke("London, GB")
+    second = weather_tool.invoke("  london ,gb ")
+
+    assert first == second
+    mock_get.assert_called_once()
+    assert weather_cache.stats()["hits"] == 1
+
+
+@patch('src.tools.weather.weather_session.get')
+def test_weather_tool_does_not_cache_errors(mock_get):
+    """Test that failed lookups are retried on the next call."""
+    mock_get.side_effect = Exception("API connection error")
+
+    weather_tool.invoke("London")
+    weather_tool.invoke("London")
+
+    assert mock_get.call_count == 2